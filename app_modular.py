@@ -3,16 +3,27 @@ Main Streamlit application entry point.
 """
 
 import streamlit as st
-from config.settings import DEMO_MODE
+from config.settings import DEMO_MODE, METRICS_EXPORT_PATH, METRICS_HTTP_PORT, OCR_WARMUP_ENABLED
 from ui import (
     get_custom_css,
     render_medical_profile_sidebar,
     render_scanner_interface,
+    render_ocr_readiness,
+    render_metrics_panel,
+    render_scan_history,
+    init_session_state,
+    get_scan_engine,
+    scan_label_text,
+    reopen_scan,
     render_status_card,
+    render_status_card_streaming,
     render_empty_results_placeholder,
     render_scanned_text_debug
 )
-from core import extract_text_from_image, analyze_safety
+from core import get_ocr_cache, start_ocr_warmup
+from core.history import image_hash
+from core.pipeline import is_ocr_failure, unreadable_label_result
+from core.metrics import export_metrics, span, start_metrics_server
 
 # PAGE CONFIG - Must be first Streamlit command
 st.set_page_config(
@@ -28,17 +39,23 @@ st.markdown(get_custom_css(), unsafe_allow_html=True)
 
 # INITIALIZE SESSION STATE
 
-if 'ocr_reader' not in st.session_state:
-    st.session_state.ocr_reader = None
-if 'analysis_result' not in st.session_state:
-    st.session_state.analysis_result = None
-if 'scanned_text' not in st.session_state:
-    st.session_state.scanned_text = None
+init_session_state()
+
+# Load the OCR model in the background on the first page load (idempotent),
+# so it is usually ready before anyone presses Analyze
+if OCR_WARMUP_ENABLED:
+    start_ocr_warmup()
 
 
 # SIDEBAR - Medical Profile Input
 
 user_profile = render_medical_profile_sidebar()
+render_scan_history(user_profile)
+render_metrics_panel()
+
+# Local /metrics endpoint (idempotent across reruns)
+if METRICS_HTTP_PORT:
+    start_metrics_server(METRICS_HTTP_PORT)
 
 
 # MAIN CONTENT AREA
@@ -63,35 +80,56 @@ if DEMO_MODE:
 # Create two columns for layout
 col1, col2 = st.columns([1, 1])
 
-with col1:
-    image = render_scanner_interface()
-    
-    if image is not None and st.button("🔍 Analyze Product", type="primary", use_container_width=True):
-        # Step 1: Extract text
-        extracted_text = extract_text_from_image(image)
-        st.session_state.scanned_text = extracted_text
-        
-        # Step 2: Analyze with AI
-        if extracted_text and not extracted_text.startswith("["):
-            with st.spinner("🧠 AI analyzing for safety concerns..."):
-                result = analyze_safety(user_profile, extracted_text)
-                st.session_state.analysis_result = result
-        else:
-            st.session_state.analysis_result = {
-                "status": "CAUTION",
-                "summary": "Could not read text from image clearly.",
-                "details": ["OCR extraction failed or returned empty"],
-                "recommendation": "Please try taking a clearer photo with better lighting.",
-                "compounding_suggested": False,
-                "compounding_note": ""
-            }
-
+# Results area is created up front so streamed results render in place
 with col2:
     st.markdown("### 📊 Safety Analysis Results")
+    results_area = st.container()
+
+streamed_this_run = False
+
+with col1:
+    render_ocr_readiness()
+    scanned = render_scanner_interface()
     
+    if scanned is not None and st.button("🔍 Analyze Product", type="primary", use_container_width=True):
+        image, image_bytes = scanned
+        engine = get_scan_engine()
+        with span('scan.total'):
+            # Same photo scanned before with this profile: show the stored result
+            # (hashed as uploaded, so the image is only decoded by preprocessing)
+            digest = image_hash(image_bytes) if engine.history is not None else None
+            if not reopen_scan(engine, digest, user_profile):
+                # Step 1: Extract text
+                extracted_text = scan_label_text(engine, image)
+                
+                # Step 2: Analyze with AI
+                if not is_ocr_failure(extracted_text):
+                    if engine.config.streaming:
+                        with results_area:
+                            result = render_status_card_streaming(
+                                engine.analyze_stream(user_profile, extracted_text)
+                            )
+                        streamed_this_run = True
+                    else:
+                        result = engine.analyze(user_profile, extracted_text)
+                    st.session_state.analysis_result = result
+                else:
+                    st.session_state.analysis_result = unreadable_label_result(extracted_text)
+                
+                # Step 3: Record it (written to the history in the background)
+                engine.remember(digest, user_profile, extracted_text,
+                                st.session_state.ocr_timings, st.session_state.analysis_result)
+        export_metrics(METRICS_EXPORT_PATH)
+
+with results_area:
     if st.session_state.analysis_result is not None:
-        render_status_card(st.session_state.analysis_result)
-        render_scanned_text_debug(st.session_state.scanned_text)
+        if not streamed_this_run:
+            render_status_card(st.session_state.analysis_result)
+        render_scanned_text_debug(
+            st.session_state.scanned_text,
+            st.session_state.ocr_timings,
+            get_ocr_cache().stats()
+        )
     else:
         render_empty_results_placeholder()
 
@@ -0,0 +1,242 @@
+"""
+Headless batch scanner: OCR + safety analysis for a folder of label images.
+
+Runs the same core pipeline as the Streamlit app without importing
+Streamlit. One JSON line per image is written to stdout as soon as that
+image finishes (in completion order); a summary goes to stderr at the end.
+
+Usage:
+    python batch_scan.py labels/ --profile profile.json
+    python batch_scan.py "scans/*.jpg" --profile profile.json --concurrency 4 --checkpoint done.jsonl
+    python batch_scan.py labels/ --profile profile.json --service http://127.0.0.1:8600
+
+The profile file is JSON with "prescriptions", "allergies" and "conditions"
+keys, each a comma-separated string or a list of strings. With --checkpoint,
+every successful result is also appended to that file and images already
+recorded there (same path, size and modification time) are skipped on the
+next run. Scans whose analysis fell back to the offline rules (Gemini
+unavailable) count as failed and are retried.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Set, TextIO
+
+from PIL import Image
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp', '.tif', '.tiff')
+PROFILE_KEYS = ('prescriptions', 'allergies', 'conditions')
+
+
+def find_images(inputs: Iterable[str]) -> List[str]:
+    """
+    Expand directories (recursively) and glob patterns into image paths.
+    """
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.extend(os.path.join(root, name) for name in files
+                             if name.lower().endswith(IMAGE_EXTENSIONS))
+        else:
+            matches = glob.glob(item, recursive=True) or ([item] if os.path.isfile(item) else [])
+            paths.extend(path for path in matches if os.path.isfile(path))
+    seen = set()
+    return [path for path in sorted(paths) if not (path in seen or seen.add(path))]
+
+
+def load_profile(path: str) -> Dict[str, str]:
+    """
+    Read a medical profile JSON file into the dict analyze_safety expects.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    profile = {}
+    for key in PROFILE_KEYS:
+        value = data.get(key, '')
+        profile[key] = ', '.join(value) if isinstance(value, list) else str(value or '')
+    return profile
+
+
+def image_key(path: str) -> str:
+    """
+    Checkpoint key: path plus size and mtime, so edited images are rescanned.
+    """
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def load_checkpoint(path: Optional[str]) -> Set[str]:
+    """
+    Keys of images already completed in an earlier run.
+    """
+    done = set()
+    if not path or not os.path.exists(path):
+        return done
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Partial line from an interrupted run
+            if record.get('key') and not record.get('error'):
+                done.add(record['key'])
+    return done
+
+
+def scan_image(engine, path: str, profile: Dict[str, str], include_text: bool = False) -> Dict:
+    """
+    OCR and analyze one image.
+
+    Returns:
+        JSON-serializable record (error set instead of raising)
+    """
+    from core.ai_analyzer import SOURCE_FALLBACK, SOURCE_OFFLINE
+    from core.pipeline import is_ocr_failure
+
+    record = {'image': path, 'key': None}
+    start = time.perf_counter()
+    try:
+        record['key'] = image_key(path)
+        with Image.open(path) as image:
+            # Left undecoded: preprocessing decodes JPEGs at reduced size
+            text, timings = engine.ocr(image)
+        record['timings_ms'] = {f"ocr.{stage}": round(ms, 2) for stage, ms in timings.items()}
+        if is_ocr_failure(text):
+            record['error'] = text.strip('[]') or "No text detected"
+        else:
+            analysis_start = time.perf_counter()
+            result = engine.analyze(profile, text)
+            record['timings_ms']['analysis'] = round((time.perf_counter() - analysis_start) * 1000, 2)
+            for key in ('status', 'summary', 'details', 'recommendation', 'source'):
+                record[key] = result.get(key)
+            if result.get('status') == 'ERROR':
+                record['error'] = result.get('summary')
+            elif result.get('source') in (SOURCE_FALLBACK, SOURCE_OFFLINE):
+                # A placeholder CAUTION, not an analysis: report it and retry it next run
+                record['error'] = f"Analysis unavailable ({result.get('source')}): {result.get('summary')}"
+                record['analysis_unavailable'] = True
+        if include_text:
+            record['text'] = text
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['seconds'] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def run_batch(paths: List[str], profile: Dict[str, str], concurrency: int = 1,
+              checkpoint: Optional[str] = None, include_text: bool = False,
+              out: TextIO = sys.stdout, reader=None) -> Dict:
+    """
+    Scan images concurrently, streaming one JSON line per image to out.
+
+    Args:
+        paths: Image paths
+        profile: Medical profile dict
+        concurrency: Images in flight at once (OCR runs on as many reader replicas as are free)
+        checkpoint: JSONL file of completed images to skip and append to (failed ones are not written)
+        include_text: Add the OCR text to each record
+        out: Stream for result lines
+        reader: OCR reader to use instead of loading EasyOCR (or using SCAN_SERVICE_URL)
+
+    Returns:
+        Summary dict (counts, throughput, latency percentiles)
+    """
+    from core.ocr_engine import load_ocr_reader, thread_safe_reader
+    from core.pipeline import ScanEngine
+
+    done = load_checkpoint(checkpoint)
+    pending = []
+    for path in paths:
+        try:
+            if image_key(path) in done:
+                continue
+        except OSError:
+            pass  # Gone or unreadable since it was listed: scan_image reports it
+        pending.append(path)
+    summary = {'images': len(paths), 'skipped': len(paths) - len(pending), 'processed': 0,
+               'failed': 0, 'analysis_unavailable': 0, 'statuses': {}}
+
+    engine = ScanEngine()
+    if pending and (reader is not None or engine.service is None):
+        loaded = reader if reader is not None else load_ocr_reader()
+        engine.reader = thread_safe_reader(loaded)
+
+    checkpoint_file = open(checkpoint, 'a', encoding='utf-8') if checkpoint else None
+    latencies = []
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            futures = [executor.submit(scan_image, engine, path, profile, include_text)
+                       for path in pending]
+            for future in as_completed(futures):
+                record = future.result()
+                line = json.dumps(record, ensure_ascii=False)
+                out.write(line + '\n')
+                out.flush()
+                if checkpoint_file and not record.get('error'):
+                    checkpoint_file.write(line + '\n')
+                    checkpoint_file.flush()
+
+                summary['processed'] += 1
+                latencies.append(record['seconds'])
+                if record.get('error'):
+                    summary['failed'] += 1
+                    summary['analysis_unavailable'] += bool(record.get('analysis_unavailable'))
+                else:
+                    status = record.get('status') or 'UNKNOWN'
+                    summary['statuses'][status] = summary['statuses'].get(status, 0) + 1
+    finally:
+        if checkpoint_file:
+            checkpoint_file.close()
+
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    summary['elapsed_seconds'] = round(elapsed, 3)
+    summary['images_per_second'] = round(summary['processed'] / elapsed, 3) if elapsed > 0 else 0.0
+    summary['p50_seconds'] = latencies[len(latencies) // 2] if latencies else 0.0
+    summary['p95_seconds'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Scan label images for medication safety conflicts.")
+    parser.add_argument('inputs', nargs='+', help="Image files, directories or glob patterns")
+    parser.add_argument('--profile', required=True, help="Medical profile JSON file")
+    parser.add_argument('--concurrency', type=int, default=2, help="Images processed at once (default: 2)")
+    parser.add_argument('--checkpoint', default=None, help="JSONL file used to resume interrupted runs")
+    parser.add_argument('--include-text', action='store_true', help="Include OCR text in each result")
+    parser.add_argument('--service', default=None,
+                        help="Scan service URL (http://host:port or unix:///path.sock); defaults to SCAN_SERVICE_URL")
+    args = parser.parse_args(argv)
+
+    if args.service:
+        from core.service_client import configure_service
+        configure_service(args.service)
+
+    paths = find_images(args.inputs)
+    if not paths:
+        print("No images found.", file=sys.stderr)
+        return 2
+
+    summary = run_batch(paths, load_profile(args.profile), args.concurrency,
+                        args.checkpoint, args.include_text)
+
+    statuses = ', '.join(f"{status} {count}" for status, count in sorted(summary['statuses'].items()))
+    unavailable = (f" ({summary['analysis_unavailable']} without a Gemini analysis)"
+                   if summary['analysis_unavailable'] else "")
+    print(f"{summary['processed']} scanned, {summary['skipped']} skipped (checkpoint), "
+          f"{summary['failed']} failed{unavailable} in {summary['elapsed_seconds']:.1f}s "
+          f"({summary['images_per_second']:.2f} images/s, p50 {summary['p50_seconds']:.2f}s, "
+          f"p95 {summary['p95_seconds']:.2f}s)" + (f" - {statuses}" if statuses else ""),
+          file=sys.stderr)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,4 @@
+"""
+Offline benchmarks for Contra-Scan. Run from the repository root, e.g.
+`python -m benchmarks.bench_gemini_client`.
+"""
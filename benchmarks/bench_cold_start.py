@@ -0,0 +1,105 @@
+"""
+Cold start: time from process start to the first successful scan.
+
+Each scenario runs in a fresh Python process, so imports, model load and
+first-inference costs are all paid again:
+
+    lazy    the reader is loaded when the first scan arrives (old behaviour)
+    warmup  start_ocr_warmup() runs at startup; the first scan arrives after
+            --arrive-after seconds (a user opening the page and framing a photo)
+
+Reported per scenario: import time of core, reader load, dummy inference,
+the first user's wait (scan request -> OCR text) and the cold-start time
+recorded by the warm-up status.
+
+Uses EasyOCR when its models are cached, otherwise a stub reader whose
+construction sleeps --stub-load-seconds (standing in for model load).
+
+Usage:
+    python -m benchmarks.bench_cold_start --arrive-after 2
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+def child(scenario: str, arrive_after: float, backend: str, stub_load_seconds: float) -> dict:
+    process_start = time.perf_counter()
+    import core.ocr_engine as ocr_engine
+    from core.pipeline import ScanEngine
+    from core.warmup import get_warmup_status, start_ocr_warmup
+    from .synthetic_labels import find_fonts, make_spec, render_label
+    imports_seconds = time.perf_counter() - process_start
+
+    image, truth = render_label(make_spec(7, find_fonts()))
+    if backend == 'stub':
+        from .stub_ocr import StubOCRReader
+        ocr_engine._create_reader = lambda: StubOCRReader(seconds_per_megapixel=0.5,
+                                                          load_seconds=stub_load_seconds, text=truth)
+
+    if scenario == 'warmup':
+        start_ocr_warmup()
+    time.sleep(arrive_after)
+
+    request = time.perf_counter()
+    text, _ = ScanEngine().ocr(image)
+    wait_seconds = time.perf_counter() - request
+    status = get_warmup_status().snapshot()
+    return {
+        'scenario': scenario,
+        'ok': not text.startswith('['),
+        'imports_seconds': imports_seconds,
+        'first_user_wait_seconds': wait_seconds,
+        'process_to_first_scan_seconds': time.perf_counter() - process_start,
+        'load_seconds': status['load_seconds'],
+        'inference_seconds': status['inference_seconds'],
+        'cold_start_seconds': status['cold_start_seconds']
+    }
+
+
+def pick_backend() -> str:
+    try:
+        import easyocr  # noqa: F401
+        models = os.path.join(os.path.expanduser('~'), '.EasyOCR', 'model')
+        return 'easyocr' if os.path.isdir(models) and os.listdir(models) else 'stub'
+    except ImportError:
+        return 'stub'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--arrive-after', type=float, default=2.0)
+    parser.add_argument('--stub-load-seconds', type=float, default=4.0)
+    parser.add_argument('--child', choices=('lazy', 'warmup'), help=argparse.SUPPRESS)
+    parser.add_argument('--backend', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child, args.arrive_after, args.backend, args.stub_load_seconds)))
+        return
+
+    backend = pick_backend()
+    print(f"OCR backend {backend}, first user arrives {args.arrive_after:.1f}s after start")
+    print(f"{'scenario':8s} {'imports':>8s} {'load':>7s} {'warm inf':>9s} {'user wait':>10s} {'cold start':>11s}")
+    for scenario in ('lazy', 'warmup'):
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_cold_start', '--child', scenario, '--backend', backend,
+             '--arrive-after', str(args.arrive_after), '--stub-load-seconds', str(args.stub_load_seconds)],
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        row = json.loads(output)
+
+        def fmt(value):
+            return f"{value:.2f}s" if value is not None else '-'
+
+        print(f"{scenario:8s} {fmt(row['imports_seconds']):>8s} {fmt(row['load_seconds']):>7s} "
+              f"{fmt(row['inference_seconds']):>9s} {fmt(row['first_user_wait_seconds']):>10s} "
+              f"{fmt(row['cold_start_seconds']):>11s}" + ('' if row['ok'] else '  (scan failed)'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Per-call latency of a fresh genai.Client per scan vs the shared pooled client.
+
+Both paths hit a local stub server (benchmarks/stub_gemini.py), so the numbers
+isolate client construction and connection setup. Against the real endpoint
+each fresh client also pays a TLS handshake, so savings there are larger.
+
+Usage:
+    python -m benchmarks.bench_gemini_client --calls 200
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from .stub_gemini import StubGeminiServer
+
+
+def _summarize(label, samples_ms):
+    samples = sorted(samples_ms)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{label:<22} mean {statistics.mean(samples):7.2f} ms   "
+          f"p50 {statistics.median(samples):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--calls', type=int, default=100)
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help="Simulated server-side generation latency")
+    args = parser.parse_args()
+
+    with StubGeminiServer(latency_seconds=args.latency_ms / 1000) as stub:
+        os.environ['GEMINI_API_KEY'] = 'stub-key'
+        os.environ['GEMINI_BASE_URL'] = stub.base_url
+
+        from google import genai
+        from google.genai import types
+        from config.settings import GEMINI_MODEL, GEMINI_CONFIG
+        from core.gemini_client import generate_content, reset_gemini_client
+
+        prompt = "USER PROFILE: ...\nPRODUCT TEXT: ..."
+
+        # Previous behaviour: construct a client for every scan
+        fresh = []
+        for _ in range(args.calls):
+            start = time.perf_counter()
+            client = genai.Client(api_key='stub-key', http_options=types.HttpOptions(base_url=stub.base_url))
+            client.models.generate_content(model=GEMINI_MODEL, contents=prompt, config=GEMINI_CONFIG)
+            fresh.append((time.perf_counter() - start) * 1000)
+            client.close()
+        fresh_connections = stub.connections
+
+        # Shared client with keep-alive pool
+        reset_gemini_client()
+        pooled = []
+        for _ in range(args.calls):
+            start = time.perf_counter()
+            generate_content(prompt)
+            pooled.append((time.perf_counter() - start) * 1000)
+        pooled_connections = stub.connections - fresh_connections
+
+        print(f"{args.calls} calls, stub latency {args.latency_ms:.0f} ms")
+        _summarize(f"fresh client ({fresh_connections} conn)", fresh)
+        _summarize(f"pooled client ({pooled_connections} conn)", pooled)
+        saved = statistics.mean(fresh) - statistics.mean(pooled)
+        print(f"saved per call: {saved:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Scan history: cost on the request path, write batching and lookup latency.
+
+Fills a temporary history with --rows synthetic scans and reports:
+
+    record      time record() adds to a request (queueing only)
+    writes      rows/s committed by the background writer, in batches of
+                --batch-size vs one transaction per row
+    lookups     find_by_image / find_by_text / recent latency at that size
+    reopen      a full ScanEngine.scan (stub OCR, demo analysis) vs the same
+                photo reopened from the history
+
+Usage:
+    python -m benchmarks.bench_history --rows 50000
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from core.ai_analyzer import SOURCE_DEMO, SOURCE_GEMINI
+from core.cache import make_cache_key
+from core.history import HistoryEntry, ScanHistory, current_model, image_hash
+from core.pipeline import ScanEngine
+
+from .stub_ocr import StubOCRReader
+from .synthetic_labels import find_fonts, make_spec, render_label
+
+PROFILES = [{'prescriptions': f"Drug{i}", 'allergies': '', 'conditions': ''} for i in range(20)]
+# Recorded by the current model, so lookups may reuse it
+RESULT = {'status': 'SAFE', 'summary': 'No interactions found', 'details': [], 'recommendation': '',
+          'source': SOURCE_DEMO if current_model() == SOURCE_DEMO else SOURCE_GEMINI}
+
+
+def make_entry(index: int) -> HistoryEntry:
+    text = f"Drug Facts\nActive ingredient: Compound {index} 10 mg\nInactive ingredients: starch"
+    return HistoryEntry.for_scan(make_cache_key(index), PROFILES[index % len(PROFILES)], text, RESULT,
+                                 {'preprocess': 12.0, 'readtext': 850.0})
+
+
+def fill(path: str, rows: int, batch_size: int):
+    history = ScanHistory(path, batch_size=batch_size, flush_interval_seconds=0.05, max_pending=rows)
+    entries = [make_entry(index) for index in range(rows)]
+    record_us = []
+    start = time.perf_counter()
+    for entry in entries:
+        call = time.perf_counter()
+        history.record(entry)
+        record_us.append((time.perf_counter() - call) * 1e6)
+    history.flush(timeout=600)
+    wall = time.perf_counter() - start
+    return history, entries, record_us, wall
+
+
+def timed_ms(func, repeat: int = 200) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        unbatched_rows = min(args.rows, 2000)
+        unbatched, _, _, unbatched_wall = fill(os.path.join(tmp, 'unbatched.db'), unbatched_rows, 1)
+        unbatched.close()
+        history, entries, record_us, wall = fill(os.path.join(tmp, 'history.db'), args.rows, args.batch_size)
+        print(f"record: p50 {statistics.median(record_us):.1f} us, max {max(record_us):.0f} us on the request path")
+        print(f"writes: {args.rows / wall:,.0f} rows/s in batches of {args.batch_size}, "
+              f"{unbatched_rows / unbatched_wall:,.0f} rows/s one per transaction")
+
+        probe = entries[len(entries) // 2]
+        profile = PROFILES[(len(entries) // 2) % len(PROFILES)]
+        hits = history.stats()['hits']
+        print(f"lookups at {args.rows:,} rows: "
+              f"by image {timed_ms(lambda: history.find_by_image(probe.image_hash, profile)):.3f} ms, "
+              f"by text {timed_ms(lambda: history.find_by_text(probe.ocr_text, profile)):.3f} ms, "
+              f"recent(20) {timed_ms(lambda: history.recent(profile, '')):.3f} ms "
+              f"({history.stats()['hits'] - hits} of 400 found)")
+
+        spec = make_spec(3, find_fonts())
+        image, _ = render_label(spec)
+        reader = StubOCRReader(seconds_per_megapixel=1.5, text=probe.ocr_text)
+        engine = ScanEngine(reader=reader, history=history)
+        user = {'prescriptions': 'Warfarin', 'allergies': '', 'conditions': ''}
+        first = engine.scan(image, user)
+        history.flush()
+        again = engine.scan(image, user)
+        print(f"reopen: full scan {first.total_ms:.0f} ms ({image.width}x{image.height}), "
+              f"same photo again {again.total_ms:.1f} ms (reopened={again.reopened}, "
+              f"hashing {timed_ms(lambda: image_hash(image), 20):.1f} ms)")
+        history.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Prompt size with and without label section extraction.
+
+Runs every label in benchmarks/data/label_texts.json through
+_build_user_prompt with the section extractor off and on, and reports the
+estimated prompt tokens, the reduction, which sections were found and whether
+every recognized ingredient and profile entry survived the cut.
+
+Usage:
+    python -m benchmarks.bench_label_sections --budget 300
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'data', 'label_texts.json')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--budget', type=int, default=None,
+                        help="Token budget (defaults to LABEL_TEXT_TOKEN_BUDGET)")
+    parser.add_argument('--corpus', default=CORPUS_PATH)
+    args = parser.parse_args()
+
+    from config.settings import LABEL_TEXT_TOKEN_BUDGET
+    from core import ai_analyzer
+    from core.label_sections import estimate_tokens, extract_label_sections
+    from core.lexicon import get_lexicon
+
+    budget = LABEL_TEXT_TOKEN_BUDGET if args.budget is None else args.budget
+    with open(args.corpus, 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+
+    lexicon = get_lexicon()
+    rows, reductions, extract_ms = [], [], []
+    for label in corpus:
+        profile, text = label['profile'], label['text']
+        matches = lexicon.match_text(text)
+        profile_terms = [t for entries in ai_analyzer.normalize_profile(profile).values() for t in entries]
+
+        full = extract_label_sections(text, token_budget=0, matches=matches)
+        start = time.perf_counter()
+        trimmed = extract_label_sections(text, token_budget=budget, priority_terms=profile_terms,
+                                         matches=matches)
+        extract_ms.append((time.perf_counter() - start) * 1000)
+
+        prompt, used = ai_analyzer._build_user_prompt(profile, text)
+        overhead = estimate_tokens(prompt) - used.tokens  # Profile block and instructions
+        before, after = full.tokens + overhead, trimmed.tokens + overhead
+
+        kept_text = trimmed.text.lower()
+        terms = {m.term for m in matches}
+        lost = sorted(t for t in terms if t not in kept_text)
+        lost += sorted(t for t in profile_terms if t in text.lower() and t not in kept_text)
+        reductions.append(1 - after / before)
+        rows.append((label['name'], before, after, ', '.join(trimmed.sections), lost))
+
+    print(f"label token budget {budget}, {len(corpus)} labels (prompt tokens incl. profile block)")
+    print(f"{'label':26s} {'before':>7s} {'after':>7s} {'saved':>6s}  sections / lost terms")
+    for (name, before, after, sections, lost), reduction in zip(rows, reductions):
+        print(f"{name:26s} {before:7d} {after:7d} {reduction:6.0%}  {sections}"
+              + (f"  LOST: {lost}" if lost else ""))
+    total_before = sum(row[1] for row in rows)
+    total_after = sum(row[2] for row in rows)
+    print(f"total {total_before} -> {total_after} tokens ({1 - total_after / total_before:.0%} smaller), "
+          f"mean per label {statistics.mean(reductions):.0%}, "
+          f"extraction p50 {statistics.median(extract_ms):.2f} ms")
+    assert not any(row[4] for row in rows), "recognized ingredients were dropped"
+
+
+if __name__ == '__main__':
+    main()
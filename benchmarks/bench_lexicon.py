@@ -0,0 +1,86 @@
+"""
+Per-token lookup latency of the ingredient lexicon at 100k+ terms.
+
+Builds a synthetic lexicon of pseudo drug/excipient names, then looks up
+clean tokens, tokens with one or two OCR-style edits, and unknown words.
+
+Usage:
+    python -m benchmarks.bench_lexicon --terms 100000 --queries 2000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from core.lexicon import IngredientLexicon
+
+SYLLABLES = ['war', 'far', 'in', 'met', 'for', 'min', 'lis', 'ino', 'pril', 'ator', 'va', 'sta',
+             'tin', 'ibu', 'pro', 'fen', 'ace', 'ta', 'mino', 'phen', 'cel', 'lu', 'lose', 'mag',
+             'ne', 'sium', 'stea', 'rate', 'tri', 'zol', 'ol', 'am', 'ox', 'cil', 'lin', 'dex']
+
+
+def _make_term(rng):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5)))
+
+
+def _ocr_noise(term, rng, edits):
+    chars = list(term)
+    for _ in range(edits):
+        position = rng.randrange(len(chars))
+        op = rng.choice(['sub', 'del', 'ins'])
+        if op == 'sub':
+            chars[position] = rng.choice('abcdefghjkmnpqrtuvwxyz')
+        elif op == 'del' and len(chars) > 3:
+            del chars[position]
+        else:
+            chars.insert(position, rng.choice('abcdefghjkmnpqrtuvwxyz'))
+    return ''.join(chars)
+
+
+def _time_lookups(lexicon, cases):
+    samples = []
+    hits = correct = 0
+    for token, expected in cases:
+        start = time.perf_counter()
+        hit = lexicon.lookup(token)
+        samples.append((time.perf_counter() - start) * 1e6)
+        hits += hit is not None
+        correct += hit is not None and hit[0] == expected
+    samples.sort()
+    return (statistics.mean(samples), samples[int(len(samples) * 0.5)],
+            samples[int(len(samples) * 0.99)], hits, correct)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--terms', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    terms = list({_make_term(rng) for _ in range(args.terms * 2)})[:args.terms]
+
+    start = time.perf_counter()
+    lexicon = IngredientLexicon((term, term) for term in terms)
+    print(f"built {len(lexicon)} terms in {time.perf_counter() - start:.1f} s")
+
+    sample = [rng.choice(terms) for _ in range(args.queries)]
+    cases = [
+        ('exact', [(t, t) for t in sample]),
+        ('1 edit', [(_ocr_noise(t, rng, 1), t) for t in sample]),
+        ('2 edits (len>8)', [(_ocr_noise(t, rng, 2), t) for t in sample if len(t) > 8]),
+        ('unknown word', [(rng.choice(['carton', 'distributed', 'keep', 'children', 'tablets', 'daily'])
+                           + str(rng.randint(0, 99)), None) for _ in range(args.queries)]),
+    ]
+    # "resolved" counts any hit; "correct" counts hits on the term the noise was
+    # applied to (a 1-edit variant can legitimately be closer to another term)
+    print(f"{'case':<18} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} {'resolved':>9} {'correct':>8}")
+    for label, queries in cases:
+        mean, p50, p99, hits, correct = _time_lookups(lexicon, queries)
+        print(f"{label:<18} {mean:>9.1f} {p50:>9.1f} {p99:>9.1f} "
+              f"{hits / len(queries):>8.0%} {correct / len(queries):>7.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Accuracy and latency of the OCR backends on the synthetic label corpus.
+
+Every available backend (see core/ocr_backends.py) reads the same seeded
+labels after the app's preprocessing. Reported per backend: reader load
+time, readtext latency p50/p95, mean text similarity to the ground truth,
+and how often the analysis verdict (offline rules, demo mode) matches the
+verdict for the ground-truth text and for the stock 'easyocr' backend.
+
+Backends whose packages are missing are listed as skipped. The first 'onnx'
+run exports and quantizes the models, which is included in its load time.
+
+Usage:
+    python -m benchmarks.bench_ocr_backends --labels 40 --threads 4
+"""
+
+import argparse
+import difflib
+import os
+import statistics
+import time
+
+from .synthetic_labels import find_fonts, make_spec, render_label
+
+PROFILE = {'prescriptions': 'Warfarin, Sertraline', 'allergies': 'Red 40, Peanut, Gelatin', 'conditions': 'Hypertension'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--labels', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=100)
+    parser.add_argument('--threads', type=int, default=0, help="Intra-op threads (0 = runtime default)")
+    parser.add_argument('--backends', nargs='+', default=None)
+    args = parser.parse_args()
+
+    os.environ['GEMINI_API_KEY'] = ''  # Demo mode: verdicts from the local rules only
+    from config.settings import OCR_CPU_CONFIG, OCR_LANGUAGE
+    from core.ai_analyzer import analyze_safety
+    from core.image_preprocessing import preprocess_image
+    from core.ocr_backends import BACKENDS, backend_available, create_reader
+
+    config = dict(OCR_CPU_CONFIG, intra_op_threads=args.threads)
+    fonts = find_fonts()
+    corpus = []
+    for i in range(args.labels):
+        image, truth = render_label(make_spec(args.seed + i, fonts))
+        corpus.append((preprocess_image(image)[0], truth, analyze_safety(PROFILE, truth)['status']))
+
+    print(f"{args.labels} labels, intra-op threads {args.threads or 'default'}, cores {os.cpu_count()}")
+    print(f"{'backend':10s} {'load s':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'similarity':>10s} "
+          f"{'verdict=truth':>13s} {'verdict=easyocr':>15s}")
+    baseline = None
+    for backend in args.backends or BACKENDS:
+        available, reason = backend_available(backend)
+        if not available:
+            print(f"{backend:10s} skipped ({reason})")
+            continue
+        start = time.perf_counter()
+        reader = create_reader(backend, OCR_LANGUAGE, gpu=False, config=config)
+        load_seconds = time.perf_counter() - start
+        reader.readtext(corpus[0][0], detail=0, paragraph=True)  # First call allocates
+
+        latencies, similarities, verdicts = [], [], []
+        for pixels, truth, _ in corpus:
+            start = time.perf_counter()
+            text = '\n'.join(reader.readtext(pixels, detail=0, paragraph=True))
+            latencies.append((time.perf_counter() - start) * 1000)
+            similarities.append(difflib.SequenceMatcher(None, text.lower(), truth.lower()).ratio())
+            verdicts.append(analyze_safety(PROFILE, text)['status'])
+        if backend == 'easyocr':
+            baseline = verdicts
+
+        ordered = sorted(latencies)
+        truth_match = sum(v == item[2] for v, item in zip(verdicts, corpus)) / len(corpus)
+        easyocr_match = (f"{sum(v == b for v, b in zip(verdicts, baseline)) / len(corpus):.0%}"
+                         if baseline else '-')
+        print(f"{backend:10s} {load_seconds:7.1f} {statistics.median(latencies):8.0f} "
+              f"{ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]:8.0f} "
+              f"{statistics.mean(similarities):10.3f} {truth_match:13.0%} {easyocr_match:>15s}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+Recognizer micro-batching: throughput vs latency by concurrency and window.
+
+Each of --concurrency threads runs --scans scans back to back on its own
+reader replica: a detection step, then recognition of --lines text crops
+(aspect ratios 3..25, like label lines). Compute is a sleep holding one of
+--cores "cores" (a semaphore), so concurrent scans contend as on real CPUs.
+The recognizer costs --pass-ms per forward pass plus --unit-ms per crop
+height of padded width (x --batched-unit-factor in passes of several crops):
+
+    off      easyocr on CPU: one forward pass per crop, in the scan's thread
+    W ms     BatchingReader + RecognizerBatcher with a W ms window (0 = each
+             scan's own crops are batched, but not with other scans')
+
+Reported: scans/s, scan latency percentiles and crops per forward pass. The
+cost model is a stub; rerun with --pass-ms / --unit-ms measured for the real
+recognizer (or the ONNX one, which has a dynamic batch axis too).
+
+Usage:
+    python -m benchmarks.bench_ocr_batching --concurrency 1 4 16 --windows 0 10 20 30
+"""
+
+import argparse
+import itertools
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from core.ocr_batching import BatchingReader, RecognizerBatcher
+
+
+class _Cores:
+    """
+    Simulated CPU: sleeping while holding one of N cores.
+    """
+
+    def __init__(self, cores: int):
+        self._cores = threading.BoundedSemaphore(cores)
+
+    def compute(self, seconds: float) -> None:
+        with self._cores:
+            time.sleep(seconds)
+
+
+class StubRecognizer:
+    """
+    One replica's crop recognizer: a per-pass overhead and a per-width cost.
+    """
+    # Shared by all replicas: a pass may hold crops cut by another replica
+    texts = {}
+    passes = 0
+    crops_recognized = 0
+    _lock = threading.Lock()
+
+    def __init__(self, cores: _Cores, pass_ms: float, unit_ms: float, batched_unit_factor: float):
+        self.cores = cores
+        self.pass_seconds = pass_ms / 1000
+        self.unit_seconds = unit_ms / 1000
+        self.batched_unit_factor = batched_unit_factor
+
+    def crops(self, image, horizontal_list, free_list):
+        crops = []
+        for x_min, x_max, y_min, y_max in horizontal_list:
+            crop = np.zeros((8, 8 * (x_max - x_min) // (y_max - y_min)), dtype=np.uint8)
+            with StubRecognizer._lock:
+                StubRecognizer.texts[id(crop)] = f"{image[0, 0]}:{y_min}"
+            crops.append(crop)
+        return crops
+
+    def recognize(self, crops):
+        widest = max(crop.shape[1] / crop.shape[0] for crop in crops)
+        factor = self.batched_unit_factor if len(crops) > 1 else 1.0
+        self.cores.compute(self.pass_seconds + self.unit_seconds * widest * len(crops) * factor)
+        with StubRecognizer._lock:
+            StubRecognizer.passes += 1
+            StubRecognizer.crops_recognized += len(crops)
+            return [(StubRecognizer.texts.pop(id(crop)), 0.9) for crop in crops]
+
+
+class StubReader:
+    """
+    One replica: detection, and easyocr's CPU recognition (a pass per crop).
+    """
+
+    def __init__(self, cores: _Cores, detect_ms: float, recognizer: StubRecognizer, lines: int, seed: int):
+        self.cores = cores
+        self.detect_seconds = detect_ms / 1000
+        self.recognizer = recognizer
+        rng = random.Random(seed)
+        self.boxes = [[10, 10 + 20 * rng.randint(3, 25), 30 * i, 30 * i + 20] for i in range(lines)]
+
+    def detect(self, image, **kwargs):
+        self.cores.compute(self.detect_seconds)
+        return [list(self.boxes)], [[]]
+
+    def readtext(self, image, **kwargs):
+        horizontal, _ = self.detect(image)
+        crops = self.recognizer.crops(image, horizontal[0], [])
+        return [self.recognizer.recognize([crop])[0][0] for crop in crops]
+
+
+def run(label: str, args, concurrency: int, window_ms=None) -> None:
+    cores = _Cores(args.cores)
+    StubRecognizer.passes = StubRecognizer.crops_recognized = 0
+    batcher = RecognizerBatcher(window_ms=window_ms) if window_ms is not None else None
+    latencies, wrong = [], 0
+    scan_ids = itertools.count(1)
+
+    def worker(thread: int):
+        nonlocal wrong
+        recognizer = StubRecognizer(cores, args.pass_ms, args.unit_ms, args.batched_unit_factor)
+        reader = StubReader(cores, args.detect_ms, recognizer, args.lines, seed=thread)
+        expected = [y_min for _, _, y_min, _ in reader.boxes]
+        if batcher is not None:
+            reader = BatchingReader(reader, batcher, recognizer)
+        for _ in range(args.scans):
+            scan = next(scan_ids) % 256  # Tags this scan's crops
+            image = np.full((4, 4), scan, dtype=np.uint8)
+            start = time.perf_counter()
+            if batcher is not None:
+                horizontal, free = reader.detect(image)
+                texts = [text for _, text, _ in reader.recognize(image, horizontal[0], free[0])]
+            else:
+                texts = reader.readtext(image)
+            latencies.append(time.perf_counter() - start)
+            # Every crop's text must come back to the scan it was cut from, in order
+            if texts != [f"{scan}:{y_min}" for y_min in expected]:
+                wrong += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    wall = time.perf_counter() - start
+    quantiles = statistics.quantiles(latencies, n=20) if len(latencies) > 1 else latencies * 19
+    print(f"{concurrency:5d} {label:>7s} {len(latencies) / wall:8.1f} {statistics.median(latencies) * 1000:8.1f} "
+          f"{quantiles[-1] * 1000:8.1f} {StubRecognizer.crops_recognized / max(1, StubRecognizer.passes):10.1f} {wrong:6d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--windows', type=float, nargs='+', default=[0, 10, 20, 30], help="Batch windows in ms")
+    parser.add_argument('--scans', type=int, default=20, help="Scans per thread")
+    parser.add_argument('--lines', type=int, default=12, help="Text crops per scan")
+    parser.add_argument('--cores', type=int, default=4)
+    parser.add_argument('--detect-ms', type=float, default=40.0)
+    parser.add_argument('--pass-ms', type=float, default=3.0, help="Fixed cost of one recognizer pass")
+    parser.add_argument('--unit-ms', type=float, default=0.4, help="Cost per crop height of padded width")
+    parser.add_argument('--batched-unit-factor', type=float, default=0.6,
+                        help="Per-width cost in multi-crop passes relative to single-crop ones")
+    args = parser.parse_args()
+
+    print(f"{args.lines} crops per scan, {args.cores} cores, detect {args.detect_ms:.0f} ms, "
+          f"pass {args.pass_ms:.1f} ms + {args.unit_ms:.2f} ms/unit (x{args.batched_unit_factor} batched)")
+    print(f"{'conc':>5s} {'window':>7s} {'scans/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'crops/pass':>10s} {'wrong':>6s}")
+    for concurrency in args.concurrency:
+        run('off', args, concurrency)
+        for window in args.windows:
+            run(f"{window:g} ms", args, concurrency, window)
+
+
+if __name__ == '__main__':
+    main()
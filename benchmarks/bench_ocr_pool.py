@@ -0,0 +1,131 @@
+"""
+Concurrent OCR: in-process shared reader vs. the OCR process pool.
+
+Simulates C users scanning at once with a CPU-bound stub reader (busy=True,
+so it really competes for cores and the GIL like EasyOCR on CPU) and reports
+wall time, per-scan latency and pool utilization for each concurrency level.
+Then checks the overload behaviour:
+
+    backpressure  more scans than workers + queue slots; the excess is
+                  rejected at once with OCRBusyError instead of waiting
+    timeout       a job that runs past job_timeout_seconds fails with
+                  OCRTimeoutError and its worker is replaced
+
+Pass --easyocr to use real EasyOCR readers in the workers (models must be
+cached under ~/.EasyOCR). Pool speedup is bounded by os.cpu_count().
+
+Usage:
+    python -m benchmarks.bench_ocr_pool --workers 4 --concurrency 1 2 4 8
+"""
+
+import argparse
+import functools
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from core.ocr_pool import OCRBusyError, OCRPool, OCRTimeoutError
+from .stub_ocr import StubOCRReader
+
+
+def run_concurrent(readtext, images, concurrency):
+    """
+    Returns:
+        (wall seconds, per-scan latencies in ms, errors)
+    """
+    latencies, errors = [], []
+
+    def one(image):
+        start = time.perf_counter()
+        try:
+            readtext(image, detail=0, paragraph=True)
+        except Exception as e:
+            errors.append(type(e).__name__)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, images))
+    return time.perf_counter() - start, latencies, errors
+
+
+def report(label, wall, latencies, errors, extra=''):
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"  {label:10s} wall {wall:6.2f}s  {len(latencies) / wall:6.2f} scans/s  "
+          f"p50 {statistics.median(latencies):7.0f} ms  p95 {p95:7.0f} ms"
+          + (f"  errors {len(errors)}" if errors else '') + extra)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--workers', type=int, default=max(2, os.cpu_count() or 1))
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--scans', type=int, default=16, help="Scans per concurrency level")
+    parser.add_argument('--scan-ms', type=float, default=250.0, help="Stub CPU time per scan")
+    parser.add_argument('--easyocr', action='store_true')
+    args = parser.parse_args()
+
+    image = np.full((1000, 1000), 255, dtype=np.uint8)
+    seconds_per_megapixel = args.scan_ms / 1000
+    if args.easyocr:
+        from core.ocr_engine import _create_reader as factory
+        reader = factory()
+    else:
+        factory = functools.partial(StubOCRReader, seconds_per_megapixel=seconds_per_megapixel, busy=True)
+        reader = factory()
+    lock = threading.Lock()
+
+    def inline_readtext(img, **kwargs):
+        with lock:  # One shared reader, as in the app without a pool
+            return reader.readtext(img, **kwargs)
+
+    print(f"cores {os.cpu_count()}, pool workers {args.workers}, {args.scans} scans per level")
+    with OCRPool(factory, workers=args.workers, queue_size=args.scans) as pool:
+        pool.wait_ready(timeout=300)
+        for concurrency in args.concurrency:
+            print(f"concurrency {concurrency}")
+            images = [image] * args.scans
+            report('inline', *run_concurrent(inline_readtext, images, concurrency))
+            wall, latencies, errors = run_concurrent(pool.readtext, images, concurrency)
+            report('pool', wall, latencies, errors, f"  utilization since start {pool.stats()['utilization']:.0%}")
+
+    print("backpressure")
+    with OCRPool(factory, workers=1, queue_size=2) as pool:
+        pool.wait_ready(timeout=300)
+        futures, rejected = [], 0
+        start = time.perf_counter()
+        for _ in range(6):
+            try:
+                futures.append(pool.submit(image, detail=0))
+            except OCRBusyError:
+                rejected += 1
+        reject_ms = (time.perf_counter() - start) * 1000
+        stats = pool.stats()
+        for future in futures:
+            future.result()
+        print(f"  6 submitted at once to 1 worker + 2 queue slots: {len(futures)} accepted, "
+              f"{rejected} rejected in {reject_ms:.1f} ms (queue depth peaked at {stats['queue_depth']})")
+
+    print("timeout")
+    slow_factory = functools.partial(StubOCRReader, seconds_per_megapixel=30.0)
+    with OCRPool(slow_factory, workers=1, queue_size=1, job_timeout_seconds=0.5) as pool:
+        pool.wait_ready(timeout=60)
+        start = time.perf_counter()
+        try:
+            pool.readtext(image, detail=0)
+            outcome = 'completed'
+        except OCRTimeoutError:
+            outcome = 'OCRTimeoutError'
+        elapsed = time.perf_counter() - start
+        ready = pool.wait_ready(timeout=60)
+        print(f"  30 s job with 0.5 s timeout: {outcome} after {elapsed:.2f}s, "
+              f"restarts {pool.stats()['restarts']}, replacement ready {ready}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Pre-OCR quality gate: cost of the check and what it rejects.
+
+Renders synthetic labels, degrades each one (defocus, motion blur, under-
+and overexposure, label far from the camera, empty frame) and runs the
+gate on the downscaled grayscale frame preprocess_image hands to it.
+Reports the gate's time per frame, the rejection rate per variant (clean
+labels should all pass) and the problems named.
+
+Usage:
+    python -m benchmarks.bench_quality_gate --labels 30
+"""
+
+import argparse
+import statistics
+from collections import Counter
+
+import numpy as np
+from PIL import Image, ImageEnhance, ImageFilter
+
+from config.settings import OCR_PREPROCESS_CONFIG
+from core.image_preprocessing import _downscale
+from core.image_quality import assess_quality
+from .synthetic_labels import find_fonts, make_spec, render_label
+
+
+def far_away(image: Image.Image) -> Image.Image:
+    small = np.asarray(image.resize((image.width // 6, image.height // 6)))
+    return Image.fromarray(np.pad(small, ((image.height // 3,) * 2, (image.width // 3,) * 2), constant_values=120))
+
+
+VARIANTS = {
+    'clean': lambda image: image,
+    'defocus': lambda image: image.filter(ImageFilter.GaussianBlur(4)),
+    'motion': lambda image: image.filter(ImageFilter.BoxBlur(6)),
+    'dark': lambda image: ImageEnhance.Brightness(image).enhance(0.15),
+    'washed out': lambda image: Image.fromarray((np.asarray(image) * 0.2 + 200).astype(np.uint8)),
+    'far away': far_away,
+    'empty': lambda image: Image.new('L', image.size, 128)
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--labels', type=int, default=30)
+    args = parser.parse_args()
+
+    fonts = find_fonts()
+    frames = []
+    for seed in range(args.labels):
+        image, _ = render_label(make_spec(seed, fonts))
+        frames.append(_downscale(image.convert('L'), OCR_PREPROCESS_CONFIG['max_long_edge']))
+
+    print(f"{args.labels} labels per variant")
+    print(f"{'variant':11s} {'rejected':>9s} {'gate ms':>8s}  problems")
+    for name, degrade in VARIANTS.items():
+        reports = [assess_quality(degrade(frame)) for frame in frames]
+        problems = Counter(problem for report in reports for problem in report.problems)
+        rejected = sum(not report.ok for report in reports)
+        print(f"{name:11s} {rejected / len(reports):9.0%} {statistics.median(r.elapsed_ms for r in reports):8.2f}  "
+              + ', '.join(f"{problem} {count}" for problem, count in problems.most_common()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+In-process reader pool: concurrent readtext without races.
+
+--threads threads each run --calls readtext calls against a stub reader
+that is not thread-safe: it counts a race whenever two calls overlap on the
+same instance. Its inference either sleeps (native code that releases the
+GIL, as torch kernels do) or burns CPU in Python (--busy):
+
+    shared   one reader called from every thread (load_ocr_reader before the pool)
+    locked   one reader behind LockedReader (serialized)
+    pool     ReaderPool with --replicas replicas
+
+Reported: throughput, races, readtext latency percentiles and the time
+spent waiting for a replica. A final run injects a failing replica and a
+reload() mid-way to show replicas being discarded and rebuilt.
+
+Usage:
+    python -m benchmarks.bench_reader_pool --threads 8 --replicas 4
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from core.ocr_engine import LockedReader
+from core.reader_pool import ReaderPool, plan_replicas
+
+
+class RaceDetectingReader:
+    """
+    Stub reader that notices overlapping calls (EasyOCR would corrupt state).
+    """
+    races = 0
+    _count_lock = threading.Lock()
+
+    def __init__(self, seconds: float, busy: bool, fail_on_call: int = 0):
+        self.seconds = seconds
+        self.busy = busy
+        self.fail_on_call = fail_on_call
+        self.calls = 0
+        self._in_use = False
+
+    def readtext(self, image, **kwargs):
+        if self._in_use:
+            with RaceDetectingReader._count_lock:
+                RaceDetectingReader.races += 1
+        self._in_use = True
+        try:
+            self.calls += 1
+            if self.calls == self.fail_on_call:
+                raise RuntimeError("injected inference failure")
+            if self.busy:
+                deadline = time.thread_time() + self.seconds
+                while time.thread_time() < deadline:
+                    pass
+            else:
+                time.sleep(self.seconds)
+            return ['INGREDIENTS: water']
+        finally:
+            self._in_use = False
+
+
+def run(name: str, reader, threads: int, calls: int, pool=None) -> None:
+    RaceDetectingReader.races = 0
+    image = np.zeros((32, 32), dtype=np.uint8)
+    latencies = []
+
+    def worker(_):
+        for _ in range(calls):
+            start = time.perf_counter()
+            try:
+                reader.readtext(image)
+            except RuntimeError:
+                pass
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, range(threads)))
+    wall = time.perf_counter() - start
+    quantiles = statistics.quantiles(latencies, n=20)
+    waits = f"{pool.stats()['waits']:6d}" if pool is not None else f"{'-':>6s}"
+    print(f"{name:8s} {len(latencies) / wall:9.1f} {RaceDetectingReader.races:6d} "
+          f"{statistics.median(latencies) * 1000:8.1f} {quantiles[-1] * 1000:8.1f} {waits}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--replicas', type=int, default=4)
+    parser.add_argument('--calls', type=int, default=25, help="readtext calls per thread")
+    parser.add_argument('--inference-ms', type=float, default=40.0)
+    parser.add_argument('--busy', action='store_true', help="Burn CPU in Python instead of sleeping")
+    args = parser.parse_args()
+
+    seconds = args.inference_ms / 1000
+
+    def factory():
+        return RaceDetectingReader(seconds, args.busy)
+
+    print("planned replicas for a 1500 MB budget at 450 MB each: "
+          + ', '.join(f"{cores} cores -> {plan_replicas(1500, 450, cores)}" for cores in (1, 2, 4, 16)))
+    print(f"{args.threads} threads x {args.calls} calls, {args.inference_ms:.0f} ms "
+          f"{'CPU-bound' if args.busy else 'GIL-releasing'} inference")
+    print(f"{'mode':8s} {'calls/s':>9s} {'races':>6s} {'p50 ms':>8s} {'p95 ms':>8s} {'waits':>6s}")
+    run('shared', factory(), args.threads, args.calls)
+    run('locked', LockedReader(factory()), args.threads, args.calls)
+    pool = ReaderPool(factory, replicas=args.replicas).start()
+    run('pool', pool, args.threads, args.calls, pool)
+
+    # A replica failing once is discarded; reload() retires the rest mid-run
+    built = []
+
+    def flaky_factory():
+        built.append(RaceDetectingReader(seconds, args.busy, fail_on_call=3 if not built else 0))
+        return built[-1]
+
+    pool = ReaderPool(flaky_factory, replicas=args.replicas).start()
+    timer = threading.Timer(args.calls * seconds / 2, pool.reload)
+    timer.start()
+    run('failover', pool, args.threads, args.calls, pool)
+    timer.join()
+    stats = pool.stats()
+    print(f"failover: {stats['built']} replicas built, {stats['failed']} discarded after a failure, "
+          f"{stats['retired']} retired by reload (now version {stats['version']}, {stats['replicas']} held)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Resilience scenarios for analyze_safety against a fault-injecting stub.
+
+Each scenario reconfigures the Gemini resilience policy, scripts faults on the
+local stub server and checks the outcome:
+
+    transient  503/429 replies are retried and the scan still reaches Gemini
+    hang       a request that never answers is cut off at the attempt deadline
+    tail       occasional slow replies, with and without hedged requests
+    outage     every request fails; the breaker opens and scans are answered
+               by the local rules without touching the API
+    garbage    a non-JSON reply is reported as a parse failure, not retried
+
+Usage:
+    python -m benchmarks.bench_resilience --tail-calls 200
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from .stub_gemini import StubGeminiServer
+
+PROFILE = {'prescriptions': 'Metformin', 'allergies': '', 'conditions': ''}
+LABEL = "Drug Facts\nActive ingredient: Loratadine 10 mg\nInactive ingredients: corn starch"
+
+BASE_POLICY = {
+    'attempt_timeout_seconds': 1.0,
+    'max_attempts': 3,
+    'backoff_base_seconds': 0.05,
+    'backoff_max_seconds': 0.2,
+    'hedge_enabled': False,
+    'hedge_min_delay_seconds': 0.15,
+    'hedge_percentile': 0.95,
+    'breaker_failure_threshold': 3,
+    'breaker_reset_seconds': 60.0
+}
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_scans(analyze_safety, count, tag):
+    latencies, sources = [], {}
+    for i in range(count):
+        start = time.perf_counter()
+        # Distinct text per call so the analysis cache never answers
+        result = analyze_safety(PROFILE, f"{LABEL}\nLot {tag}-{i}")
+        latencies.append((time.perf_counter() - start) * 1000)
+        sources[result['source']] = sources.get(result['source'], 0) + 1
+    return latencies, sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--latency-ms', type=float, default=40.0)
+    parser.add_argument('--tail-calls', type=int, default=200)
+    parser.add_argument('--slow-rate', type=float, default=0.05)
+    parser.add_argument('--slow-ms', type=float, default=1500.0)
+    args = parser.parse_args()
+
+    with StubGeminiServer(latency_seconds=args.latency_ms / 1000, hang_seconds=5.0, seed=7) as stub:
+        os.environ['GEMINI_API_KEY'] = 'stub-key'
+        os.environ['GEMINI_BASE_URL'] = stub.base_url
+
+        from core.ai_analyzer import analyze_safety, get_gemini_caller
+
+        caller = get_gemini_caller()
+        run_scans(analyze_safety, 1, 'warmup')  # Client construction and imports
+
+        # ── transient ───────────────────────────────────────────────────
+        caller.configure(BASE_POLICY)
+        stub.faults = ['error', 'rate_limit']
+        latencies, sources = run_scans(analyze_safety, 1, 'transient')
+        stats = caller.snapshot()
+        print(f"transient  {latencies[0]:7.1f} ms  sources={sources}  retries={stats['retries']}")
+        assert sources == {'gemini': 1} and stats['retries'] == 2, stats
+
+        # ── hang ────────────────────────────────────────────────────────
+        caller.configure(BASE_POLICY)
+        stub.faults = ['hang']
+        latencies, sources = run_scans(analyze_safety, 1, 'hang')
+        stats = caller.snapshot()
+        print(f"hang       {latencies[0]:7.1f} ms  sources={sources}  retries={stats['retries']} "
+              f"(deadline {BASE_POLICY['attempt_timeout_seconds'] * 1000:.0f} ms, stub hangs 5000 ms)")
+        assert sources == {'gemini': 1} and latencies[0] < 2500, latencies
+
+        # ── tail ────────────────────────────────────────────────────────
+        stub.fault_rates = {'slow': args.slow_rate}
+        stub.slow_seconds = args.slow_ms / 1000
+        policy = dict(BASE_POLICY, attempt_timeout_seconds=5.0)
+        for hedge in (False, True):
+            caller.configure(dict(policy, hedge_enabled=hedge))
+            latencies, sources = run_scans(analyze_safety, args.tail_calls, f'tail-{hedge}')
+            stats = caller.snapshot()
+            print(f"tail       hedge={'on ' if hedge else 'off'}  p50 {statistics.median(latencies):7.1f}  "
+                  f"p95 {percentile(latencies, 0.95):7.1f}  p99 {percentile(latencies, 0.99):7.1f} ms  "
+                  f"hedges={stats['hedges']} won={stats['hedge_wins']}")
+            assert sources == {'gemini': args.tail_calls}, sources
+        stub.fault_rates = {}
+
+        # ── outage ──────────────────────────────────────────────────────
+        caller.configure(BASE_POLICY)
+        stub.fault_rates = {'error': 1.0}
+        requests_before = stub.requests
+        latencies, sources = run_scans(analyze_safety, 10, 'outage')
+        stats = caller.snapshot()
+        threshold = BASE_POLICY['breaker_failure_threshold']
+        sent = stub.requests - requests_before
+        print(f"outage     sources={sources}  breaker={stats['breaker_state']}  API requests={sent}  "
+              f"p50 before open {statistics.median(latencies[:threshold]):6.1f} ms  "
+              f"after {statistics.median(latencies[threshold:]):5.1f} ms")
+        assert sources == {'offline_rules': 10} and stats['breaker_state'] == 'open', stats
+        assert sent == threshold * BASE_POLICY['max_attempts'], sent
+        stub.fault_rates = {}
+
+        # ── garbage ─────────────────────────────────────────────────────
+        caller.configure(BASE_POLICY)
+        stub.faults = ['garbage']
+        latencies, sources = run_scans(analyze_safety, 1, 'garbage')
+        stats = caller.snapshot()
+        print(f"garbage    {latencies[0]:7.1f} ms  sources={sources}  retries={stats['retries']}")
+        assert sources == {'fallback': 1} and stats['retries'] == 0, stats
+
+
+if __name__ == '__main__':
+    main()
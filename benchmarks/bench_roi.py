@@ -0,0 +1,115 @@
+"""
+Region-of-interest OCR vs. full-label recognition.
+
+For each synthetic label (unrotated, so the stub knows the line boxes) the
+same detected boxes go through the two modes below, once for the plain
+back panel and once for a busy package: the back panel plus a front
+panel column of brand name, claims, directions and barcode digits.
+
+    full   every box recognized (plain readtext)
+    roi    RegionReader: header probes, then only the ingredient / warning /
+           allergen panels
+
+Reported: recognizer work (crop width in box heights, proportional to CPU
+time), stub wall time, the share of labels that fell back to full
+recognition, and whether the rule-engine verdict and triggered rules from
+the ROI text match those from the full text for every profile.
+
+EasyOCR is not required; the layout stub charges --ms-per-unit per unit of
+recognizer work.
+
+Usage:
+    python -m benchmarks.bench_roi --labels 60
+"""
+
+import argparse
+import dataclasses
+import random
+import statistics
+import time
+
+from core.ocr_regions import RegionReader
+from core.rule_engine import get_rule_engine
+from .run_suite import PROFILES
+from .stub_ocr import LayoutStubReader
+from .synthetic_labels import MARKETING, label_layout, make_spec
+
+FRONT_PANEL = ['Net Wt 12 oz (340 g)', 'Clinically Studied Formula', 'Please Recycle This Carton',
+               'Directions: take 1 tablet every 4 to 6 hours with water', 'Satisfaction guaranteed or your money back',
+               'Visit us online for coupons and recipes', '0 12345 67890 5', 'Product of USA']
+
+
+def verdict(profile, text):
+    result = get_rule_engine().evaluate(profile, text)
+    return result['status'], sorted(rule['id'] for rule in result['triggered_rules'])
+
+
+def busy_layout(seed, size, boxes):
+    """
+    Add a front panel to the right of the back panel's line boxes.
+    """
+    rng = random.Random(seed)
+    line_height = boxes[1][1][2] - boxes[0][1][2] if len(boxes) > 1 else 40
+    font_height = boxes[0][1][3] - boxes[0][1][2]
+    x = size[0] + line_height
+    lines = [('ACME', 3.0)] + [(line, 1.0) for line in rng.sample(MARKETING, 4) + rng.sample(FRONT_PANEL, 6)]
+    y, front = line_height, []
+    for text, scale in lines:
+        height = int(font_height * scale)
+        front.append((text, (x, x + int(len(text) * height * 0.55), y, y + height)))
+        y += int(line_height * scale)
+    return boxes + front
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--labels', type=int, default=60)
+    parser.add_argument('--ms-per-unit', type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{args.labels} labels, {args.ms_per_unit} ms per unit of recognizer work")
+    for busy in (False, True):
+        print('busy package' if busy else 'back panel only')
+        run(args, busy)
+
+
+def run(args, busy):
+    rows = {'full': {'units': [], 'seconds': []}, 'roi': {'units': [], 'seconds': []}}
+    fallbacks, mismatches, checks = 0, [], 0
+    for seed in range(args.labels):
+        spec = dataclasses.replace(make_spec(seed), rotation=0.0)
+        size, boxes = label_layout(spec)
+        if busy:
+            boxes = busy_layout(seed, size, boxes)
+        image = None  # The stub reads the layout, not pixels
+
+        full_reader = LayoutStubReader(boxes, seconds_per_unit=args.ms_per_unit / 1000)
+        start = time.perf_counter()
+        full_text = '\n'.join(full_reader.readtext(image, detail=0))
+        rows['full']['seconds'].append(time.perf_counter() - start)
+        rows['full']['units'].append(full_reader.units)
+
+        roi_stub = LayoutStubReader(boxes, seconds_per_unit=args.ms_per_unit / 1000)
+        start = time.perf_counter()
+        result = RegionReader(roi_stub).read_regions(image)
+        rows['roi']['seconds'].append(time.perf_counter() - start)
+        rows['roi']['units'].append(roi_stub.units)
+        fallbacks += result.fallback
+
+        for profile in PROFILES:
+            checks += 1
+            if verdict(profile, full_text) != verdict(profile, result.text):
+                mismatches.append((seed, spec.kind, profile['allergies']))
+
+    print(f"  {'mode':5s} {'work/label':>11s} {'ms/label':>9s}")
+    for mode, row in rows.items():
+        print(f"  {mode:5s} {statistics.mean(row['units']):11.1f} {statistics.mean(row['seconds']) * 1000:9.1f}")
+    saved = 1 - sum(rows['roi']['units']) / sum(rows['full']['units'])
+    print(f"  recognizer work saved {saved:.0%}, fallbacks {fallbacks}/{args.labels}, "
+          f"verdicts identical {checks - len(mismatches)}/{checks}")
+    for seed, kind, allergies in mismatches[:10]:
+        print(f"    mismatch: seed {seed} ({kind}), allergies {allergies!r}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Microbenchmark: compiled Aho-Corasick rule engine vs per-rule substring scans.
+
+Generates synthetic rule sets with thousands of rules and a realistic label,
+then times the naive `any(term in text for term in terms)` loop used before
+against RuleEngine.match, which scans the label once.
+
+Usage:
+    python -m benchmarks.bench_rule_engine --rules 1000 5000 20000
+"""
+
+import argparse
+import random
+import string
+import time
+
+from core.rule_engine import Rule, RuleEngine
+
+LABEL = (
+    "DRUG FACTS Active ingredient (in each tablet): Ibuprofen 200 mg. "
+    "Inactive ingredients: carnauba wax, colloidal silicon dioxide, corn starch, "
+    "croscarmellose sodium, FD&C red 40 aluminum lake, hypromellose, iron oxide, "
+    "lactose monohydrate, magnesium stearate, microcrystalline cellulose, "
+    "polyethylene glycol, polysorbate 80, titanium dioxide. Contains: soy lecithin. "
+) * 4
+
+
+def _random_term(rng):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12)))
+
+
+def _build_rules(count, rng):
+    rules = []
+    for i in range(count):
+        rules.append(Rule(
+            id=f"rule-{i}",
+            category='allergen',
+            status=rng.choice(['CAUTION', 'DANGER']),
+            profile_field='allergies',
+            profile_terms=['synthetic'],
+            label_terms=[_random_term(rng) for _ in range(5)],
+            summary="Rule {match}",
+            details=[],
+            recommendation="",
+        ))
+    # A few rules that actually fire on the label
+    for term in ('ibuprofen', 'red 40', 'lactose', 'soy'):
+        rules.append(Rule(
+            id=f"rule-{term}", category='allergen', status='DANGER', profile_field='allergies',
+            profile_terms=['synthetic'], label_terms=[term], summary="{match}", details=[], recommendation=""
+        ))
+    return rules
+
+
+def _naive(rules, text):
+    text_lower = text.lower()
+    return [rule.id for rule in rules if any(term in text_lower for term in rule.label_terms)]
+
+
+def _time(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rules', type=int, nargs='+', default=[100, 1000, 5000, 20000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    profile = {'allergies': 'synthetic'}
+    print(f"label: {len(LABEL)} chars")
+    print(f"{'rules':>7} {'compile ms':>11} {'naive ms':>10} {'engine ms':>10} {'speedup':>8} {'fired':>6}")
+    for count in args.rules:
+        rules = _build_rules(count, rng)
+        start = time.perf_counter()
+        engine = RuleEngine(rules, default_response={})
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        naive_ms, naive_hits = _time(lambda: _naive(rules, LABEL), args.repeat)
+        engine_ms, matches = _time(lambda: engine.match(profile, LABEL), args.repeat)
+        print(f"{count:>7} {compile_ms:>11.1f} {naive_ms:>10.3f} {engine_ms:>10.3f} "
+              f"{naive_ms / engine_ms:>7.1f}x {len(matches):>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+Scan service: concurrent scans in the UI process vs. in scan_service.py.
+
+Both modes run --users concurrent OCR requests through ScanEngine (distinct
+synthetic labels, so the OCR cache never hits) against a stub reader that
+burns --cpu-per-megapixel of CPU per megapixel, like EasyOCR on CPU:
+
+    in-process  the reader lives in this process (what the app does today)
+    service     a child process runs core.service on a Unix socket with the
+                same reader; this process only shrinks images and waits
+
+Meanwhile a "UI thread" repeatedly runs a small pure-Python task (about what
+a Streamlit rerun of the page costs) and records how long each one takes;
+p95 of that is the UI responsiveness under load. Afterwards the service's
+endpoints (/healthz, /readyz, /ocr, /analyze?stream=1) are smoke-tested.
+
+Usage:
+    python -m benchmarks.bench_service --users 8
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .synthetic_labels import find_fonts, make_spec, render_label
+
+
+def stub_reader(cpu_per_megapixel: float):
+    from .stub_ocr import StubOCRReader
+    return StubOCRReader(seconds_per_megapixel=cpu_per_megapixel, busy=True, text='INGREDIENTS: water')
+
+
+def serve(socket_path: str, cpu_per_megapixel: float) -> None:
+    import core.ocr_engine as ocr_engine
+    from core.service import serve as run_service
+    ocr_engine._create_reader = lambda: stub_reader(cpu_per_megapixel)
+    run_service(socket_path=socket_path)
+
+
+def ui_task() -> float:
+    start = time.perf_counter()
+    sum(i * i for i in range(20000))
+    return (time.perf_counter() - start) * 1000
+
+
+def run_load(images, users: int):
+    """
+    Returns:
+        (scan wall seconds, per-scan seconds, UI task ms samples)
+    """
+    from core.pipeline import ScanEngine
+    engine = ScanEngine()
+    ui_samples, done = [], threading.Event()
+
+    def ui_loop():
+        while not done.is_set():
+            ui_samples.append(ui_task())
+            time.sleep(0.005)
+
+    def scan(image):
+        start = time.perf_counter()
+        text, _ = engine.ocr(image)
+        assert not text.startswith('['), text
+        return time.perf_counter() - start
+
+    ui = threading.Thread(target=ui_loop, daemon=True)
+    ui.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        latencies = list(executor.map(scan, images))
+    wall = time.perf_counter() - start
+    done.set()
+    ui.join()
+    return wall, latencies, ui_samples
+
+
+def smoke_test(client, image) -> None:
+    assert client.health()['status'] == 'ok'
+    ready, snapshot = client.ready()
+    print(f"  /healthz ok, /readyz {'200' if ready else '503'} ({snapshot['state']})")
+    text, timings = client.ocr(image)
+    print(f"  /ocr -> {text!r} in {timings['service_roundtrip']:.1f} ms")
+    profile = {'prescriptions': 'warfarin', 'allergies': 'peanuts', 'conditions': ''}
+    items = list(client.analyze_stream(profile, 'INGREDIENTS: peanuts, sugar'))
+    print(f"  /analyze?stream=1 -> {len(items)} lines, final status {items[-1].get('status')!r}")
+
+
+def print_row(mode: str, wall: float, latencies, ui_samples, baseline: float) -> None:
+    ui_p95 = statistics.quantiles(ui_samples, n=20)[-1] if len(ui_samples) > 1 else float('nan')
+    print(f"{mode:11s} {len(latencies) / wall:8.2f} {statistics.median(latencies):8.2f}s "
+          f"{max(latencies):8.2f}s {ui_p95:9.1f} ms ({ui_p95 / baseline:.1f}x idle)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--cpu-per-megapixel', type=float, default=0.5)
+    parser.add_argument('--serve', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.cpu_per_megapixel)
+        return
+
+    fonts = find_fonts()
+    images = [render_label(make_spec(seed, fonts))[0] for seed in range(2 * args.users)]
+    baseline = statistics.median(ui_task() for _ in range(50))
+    print(f"{len(images)} scans, {args.users} concurrent, stub OCR {args.cpu_per_megapixel}s CPU/MP; "
+          f"idle UI task {baseline:.1f} ms")
+    print(f"{'mode':11s} {'scans/s':>8s} {'p50':>9s} {'max':>9s} {'UI task p95':>12s}")
+
+    import core.ocr_engine as ocr_engine
+    from core.service_client import ServiceUnavailableError, configure_service, get_service_client
+    from core.warmup import get_warmup_status, start_ocr_warmup
+
+    ocr_engine._create_reader = lambda: stub_reader(args.cpu_per_megapixel)
+    ocr_engine.load_ocr_reader()
+    print_row('in-process', *run_load(images, args.users), baseline)
+
+    socket_path = os.path.join(tempfile.mkdtemp(), 'scan.sock')
+    child = subprocess.Popen([sys.executable, '-m', 'benchmarks.bench_service', '--serve', socket_path,
+                              '--cpu-per-megapixel', str(args.cpu_per_megapixel)])
+    try:
+        configure_service(f"unix://{socket_path}")
+        client = get_service_client()
+        for _ in range(100):
+            try:
+                client.health()
+                break
+            except ServiceUnavailableError:
+                time.sleep(0.1)
+        start_ocr_warmup()  # Polls /readyz now that a service is configured
+        while get_warmup_status().state not in ('ready', 'failed'):
+            time.sleep(0.05)
+        print_row('service', *run_load(images, args.users), baseline)
+        print("service smoke test:")
+        smoke_test(client, images[0])
+    finally:
+        child.terminate()
+        child.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Single flight: hundreds of simultaneous scans of the same label.
+
+--users threads are released at once (a promo sends everyone to scan one
+product), each running a full ScanEngine.scan of the same photo with the
+same profile. The OCR reader is a stub sleeping like EasyOCR, serialized as
+in the app; analysis goes to the local Gemini stub server. Each mode starts
+with empty result caches:
+
+    off  every scan runs its own readtext and Gemini call
+    on   identical in-flight requests wait on one shared computation
+
+Reported: readtext calls, Gemini requests, coalesced counts, wall time and
+per-scan latency percentiles; every scan must return the same verdict.
+
+Usage:
+    python -m benchmarks.bench_singleflight --users 300
+"""
+
+import argparse
+import os
+import statistics
+import threading
+import time
+from collections import Counter
+
+from .stub_gemini import StubGeminiServer
+from .stub_ocr import StubOCRReader
+from .synthetic_labels import find_fonts, make_spec, render_label
+
+PROFILE = {'prescriptions': 'Metformin', 'allergies': '', 'conditions': ''}
+LABEL = "Drug Facts\nActive ingredient: Loratadine 10 mg\nInactive ingredients: corn starch"
+
+
+def run(image, users: int, readtext_seconds: float, enabled: bool, stub: StubGeminiServer):
+    from core.ai_analyzer import _analysis_flights, get_analysis_cache
+    from core.ocr_engine import LockedReader, _ocr_flights, get_ocr_cache
+    from core.pipeline import ScanEngine
+
+    for group in (_ocr_flights, _analysis_flights):
+        group.enabled = enabled
+    get_ocr_cache().clear()
+    get_analysis_cache().clear()
+    before = {group.name: group.stats()['coalesced'] for group in (_ocr_flights, _analysis_flights)}
+    requests_before = stub.requests
+
+    pixels = image.width * image.height / 1e6
+    reader = StubOCRReader(seconds_per_megapixel=readtext_seconds / pixels, text=LABEL)
+    engine = ScanEngine(reader=LockedReader(reader))
+    barrier = threading.Barrier(users + 1)
+    latencies, verdicts = [], []
+
+    def user():
+        barrier.wait()
+        start = time.perf_counter()
+        result = engine.scan(image, PROFILE)
+        latencies.append(time.perf_counter() - start)
+        verdicts.append(f"{result.analysis.get('status')} ({result.analysis.get('source')})")
+
+    threads = [threading.Thread(target=user) for _ in range(users)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    coalesced = {group.name: group.stats()['coalesced'] - before[group.name]
+                 for group in (_ocr_flights, _analysis_flights)}
+    quantiles = statistics.quantiles(latencies, n=20)
+    print(f"{'on' if enabled else 'off':4s} {reader.calls:9d} {stub.requests - requests_before:7d} "
+          f"{coalesced['ocr']:9d} {coalesced['analysis']:9d} {wall:7.2f}s "
+          f"{statistics.median(latencies):7.2f}s {quantiles[-1]:7.2f}s  {dict(Counter(verdicts))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--users', type=int, default=300)
+    parser.add_argument('--readtext-ms', type=float, default=50.0, help="Stub OCR time per call")
+    parser.add_argument('--latency-ms', type=float, default=400.0, help="Stub Gemini response time")
+    parser.add_argument('--width', type=int, default=900, help="Label photo width in pixels")
+    args = parser.parse_args()
+
+    with StubGeminiServer(latency_seconds=args.latency_ms / 1000) as stub:
+        os.environ['GEMINI_API_KEY'] = 'stub-key'
+        os.environ['GEMINI_BASE_URL'] = stub.base_url
+
+        spec = make_spec(3, find_fonts())
+        spec.width = args.width
+        image, _ = render_label(spec)
+        print(f"{args.users} simultaneous scans of one {image.width}x{image.height} label; readtext {args.readtext_ms:.0f} ms (serialized), "
+              f"Gemini {args.latency_ms:.0f} ms")
+        print(f"{'mode':4s} {'readtext':>9s} {'gemini':>7s} {'ocr coal':>9s} {'llm coal':>9s} "
+              f"{'wall':>8s} {'p50':>8s} {'p95':>8s}  verdicts")
+        for enabled in (True, False):
+            run(image, args.users, args.readtext_ms / 1000, enabled, stub)
+
+
+if __name__ == '__main__':
+    main()
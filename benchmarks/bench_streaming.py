@@ -0,0 +1,62 @@
+"""
+Time-to-first-verdict: blocking analyze_safety vs analyze_safety_stream.
+
+Both run against the local stub server, which emits the analysis JSON in
+chunks with a per-chunk generation delay. For the blocking call the verdict is
+only known once the whole response has arrived; the streaming call surfaces
+"status" as soon as its value is complete.
+
+Usage:
+    python -m benchmarks.bench_streaming --calls 20 --chunk-delay-ms 60
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from .stub_gemini import StubGeminiServer
+
+PROFILE = {'prescriptions': 'Metformin', 'allergies': '', 'conditions': ''}
+LABEL = "Drug Facts\nActive ingredient: Loratadine 10 mg\nInactive ingredients: corn starch"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--calls', type=int, default=20)
+    parser.add_argument('--latency-ms', type=float, default=150.0, help="Delay before the first chunk")
+    parser.add_argument('--chunk-delay-ms', type=float, default=60.0, help="Generation delay per chunk")
+    parser.add_argument('--chunks', type=int, default=12)
+    args = parser.parse_args()
+
+    with StubGeminiServer(latency_seconds=args.latency_ms / 1000,
+                          chunk_delay_seconds=args.chunk_delay_ms / 1000,
+                          stream_chunks=args.chunks) as stub:
+        os.environ['GEMINI_API_KEY'] = 'stub-key'
+        os.environ['GEMINI_BASE_URL'] = stub.base_url
+
+        from core.ai_analyzer import analyze_safety, analyze_safety_stream, get_analysis_cache
+
+        blocking, first_verdict, stream_total = [], [], []
+        for _ in range(args.calls):
+            get_analysis_cache().clear()
+            start = time.perf_counter()
+            result = analyze_safety(PROFILE, LABEL)
+            blocking.append((time.perf_counter() - start) * 1000)
+            assert result['source'] == 'gemini', result
+
+            get_analysis_cache().clear()
+            for result in analyze_safety_stream(PROFILE, LABEL):
+                pass
+            first_verdict.append(result['stream_metrics']['first_verdict_ms'])
+            stream_total.append(result['stream_metrics']['total_ms'])
+
+        print(f"{args.calls} calls, {args.chunks} chunks x {args.chunk_delay_ms:.0f} ms "
+              f"after {args.latency_ms:.0f} ms")
+        print(f"blocking   time to verdict  p50 {statistics.median(blocking):7.1f} ms")
+        print(f"streaming  time to verdict  p50 {statistics.median(first_verdict):7.1f} ms")
+        print(f"streaming  complete result  p50 {statistics.median(stream_total):7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
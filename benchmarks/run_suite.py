@@ -0,0 +1,169 @@
+"""
+End-to-end offline benchmark: synthetic labels -> OCR -> analysis.
+
+Renders a seeded corpus of synthetic labels (see synthetic_labels.py), runs
+each through the core ScanEngine (OCR + analyze_safety) against the local
+Gemini stub, and writes throughput, per-stage p50/p95/p99 (from the metrics
+registry), peak RSS and verdict/source counts to a JSON file. Pass an earlier
+result file as --baseline to print per-stage deltas.
+
+OCR uses EasyOCR when it is installed and its models are already cached
+(~/.EasyOCR, no downloads happen offline); otherwise a stub reader that
+returns the ground truth after a pixel-proportional delay. The backend used
+is recorded in the output. No network or GPU is needed either way.
+
+Usage:
+    python -m benchmarks.run_suite --labels 60 --out benchmarks/results/run.json
+    python -m benchmarks.run_suite --baseline benchmarks/results/run.json
+"""
+
+import argparse
+import difflib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from .stub_gemini import StubGeminiServer
+from .stub_ocr import StubOCRReader
+from .synthetic_labels import find_fonts, make_spec, render_label
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+PROFILES = [
+    {'prescriptions': 'Warfarin', 'allergies': 'Red 40', 'conditions': 'Hypertension'},
+    {'prescriptions': 'Metformin, Lisinopril', 'allergies': 'Peanut', 'conditions': 'Diabetes'},
+    {'prescriptions': '', 'allergies': 'Milk, Shellfish', 'conditions': ''},
+    {'prescriptions': 'Sertraline', 'allergies': 'Gelatin', 'conditions': 'Pregnancy'}
+]
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+def pick_ocr_backend(requested: str):
+    """
+    Return (backend name, reader or None to let the engine load EasyOCR).
+    """
+    if requested in ('auto', 'easyocr'):
+        try:
+            import easyocr  # noqa: F401
+            models = os.path.join(os.path.expanduser('~'), '.EasyOCR', 'model')
+            if os.path.isdir(models) and os.listdir(models):
+                return 'easyocr', None
+        except ImportError:
+            pass
+        if requested == 'easyocr':
+            raise SystemExit("EasyOCR or its cached models are not available")
+    return 'stub', StubOCRReader()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--labels', type=int, default=60)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ocr', choices=('auto', 'easyocr', 'stub'), default='auto')
+    parser.add_argument('--gemini-latency-ms', type=float, default=300.0)
+    parser.add_argument('--gemini-chunk-delay-ms', type=float, default=20.0)
+    parser.add_argument('--out', default=None, help="Result JSON path (default: benchmarks/results/<time>.json)")
+    parser.add_argument('--baseline', default=None, help="Earlier result JSON to compare against")
+    args = parser.parse_args()
+
+    fonts = find_fonts()
+    start = time.perf_counter()
+    corpus = [render_label(make_spec(args.seed + i, fonts)) for i in range(args.labels)]
+    render_seconds = time.perf_counter() - start
+
+    with StubGeminiServer(latency_seconds=args.gemini_latency_ms / 1000,
+                          chunk_delay_seconds=args.gemini_chunk_delay_ms / 1000) as stub:
+        os.environ['GEMINI_API_KEY'] = 'stub-key'
+        os.environ['GEMINI_BASE_URL'] = stub.base_url
+
+        from core.metrics import get_metrics
+        from core.pipeline import ScanEngine
+
+        registry = get_metrics()
+        registry.enabled = True
+        registry.reset()
+
+        backend, reader = pick_ocr_backend(args.ocr)
+        engine = ScanEngine(reader=reader)
+
+        statuses, sources, similarities = {}, {}, []
+        wall_start = time.perf_counter()
+        for i, (image, truth) in enumerate(corpus):
+            scan_start = time.perf_counter()
+            if reader is not None:
+                reader.expect(truth)
+            scan = engine.scan(image, PROFILES[i % len(PROFILES)])
+            text, result = scan.text, scan.analysis
+            registry.observe('scan.total', time.perf_counter() - scan_start)
+
+            similarities.append(difflib.SequenceMatcher(None, text.lower(), truth.lower()).ratio())
+            statuses[result['status']] = statuses.get(result['status'], 0) + 1
+            sources[result['source']] = sources.get(result['source'], 0) + 1
+        wall_seconds = time.perf_counter() - wall_start
+
+    stages = {row.pop('stage'): {key: round(value, 3) for key, value in row.items()}
+              for row in registry.stage_summary()}
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'ocr_backend': backend,
+            'args': vars(args)
+        },
+        'labels': args.labels,
+        'render_seconds': round(render_seconds, 3),
+        'wall_seconds': round(wall_seconds, 3),
+        'throughput_labels_per_second': round(args.labels / wall_seconds, 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'ocr_text_similarity_mean': round(sum(similarities) / len(similarities), 4),
+        'statuses': statuses,
+        'sources': sources,
+        'stages': stages
+    }
+
+    out = args.out or os.path.join(RESULTS_DIR, datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{args.labels} labels, OCR backend {backend}: {report['throughput_labels_per_second']:.2f} labels/s, "
+          f"peak RSS {report['peak_rss_mb']:.0f} MB, OCR similarity {report['ocr_text_similarity_mean']:.3f}")
+    print(f"verdicts {statuses}  sources {sources}")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('stages', {})
+    print(f"{'stage':28s} {'n':>5s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}" + ("  p50 vs baseline" if baseline else ""))
+    for stage, row in stages.items():
+        line = f"{stage:28s} {row['count']:5.0f} {row['p50_ms']:9.2f} {row['p95_ms']:9.2f} {row['p99_ms']:9.2f}"
+        if stage in baseline and baseline[stage]['p50_ms']:
+            line += f"  {row['p50_ms'] / baseline[stage]['p50_ms'] - 1:+7.1%}"
+        print(line)
+    print(f"results written to {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""
+Local stub of the Gemini generateContent REST endpoint.
+
+Answers `POST /{api_version}/models/{model}:generateContent` with a canned
+analysis JSON after a configurable delay, and `:streamGenerateContent?alt=sse`
+with the same JSON split into server-sent-event chunks, so client code can be
+exercised with no network access. Point the app at it with GEMINI_BASE_URL.
+
+Timing model: `latency_seconds` before the first byte, then
+`chunk_delay_seconds` per generated chunk (the blocking endpoint waits for
+all chunks before replying, as the real API does).
+
+Fault injection: `faults` is a script of fault kinds consumed one per request
+(None for a normal reply); once it runs out, `fault_rates` maps kinds to the
+probability of injecting them at random. Kinds:
+    error       503 UNAVAILABLE
+    rate_limit  429 RESOURCE_EXHAUSTED
+    slow        normal reply after an extra `slow_seconds`
+    hang        no reply for `hang_seconds`
+    garbage     200 with prose instead of JSON
+"""
+
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+DEFAULT_ANALYSIS = {
+    "status": "SAFE",
+    "summary": "No conflicts detected between this product and your medical profile.",
+    "details": ["No known allergens matching your profile"],
+    "recommendation": "This product appears safe based on your profile.",
+    "compounding_suggested": False,
+    "compounding_note": ""
+}
+GARBAGE_TEXT = "I'm sorry, I can't analyze this label right now."
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    """
+    Ignore clients that hang up early (timed-out or losing hedged requests).
+    """
+
+    def handle_error(self, request, client_address):
+        import sys
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+class StubGeminiServer:
+    """
+    Threaded HTTP/1.1 server that mimics Gemini's response latency and payload.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency_seconds: float = 0.0,
+                 analysis: Optional[Dict] = None, chunk_delay_seconds: float = 0.0,
+                 stream_chunks: int = 8, faults: Optional[List[Optional[str]]] = None,
+                 fault_rates: Optional[Dict[str, float]] = None, slow_seconds: float = 1.0,
+                 hang_seconds: float = 30.0, seed: Optional[int] = None):
+        self.latency_seconds = latency_seconds
+        self.chunk_delay_seconds = chunk_delay_seconds
+        self.stream_chunks = stream_chunks
+        self.analysis = analysis or DEFAULT_ANALYSIS
+        self.faults = list(faults or [])
+        self.fault_rates = dict(fault_rates or {})
+        self.slow_seconds = slow_seconds
+        self.hang_seconds = hang_seconds
+        self.injected = {}
+        self._random = random.Random(seed)
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = _QuietHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'StubGeminiServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def response_body(self, text: Optional[str] = None, final: bool = True) -> Dict:
+        full_text = json.dumps(self.analysis)
+        body = {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": full_text if text is None else text}]},
+                "index": 0
+            }],
+            "modelVersion": "stub"
+        }
+        if final:
+            body["candidates"][0]["finishReason"] = "STOP"
+            body["usageMetadata"] = {
+                "promptTokenCount": 400,
+                "candidatesTokenCount": len(full_text) // 4,
+                "totalTokenCount": 400 + len(full_text) // 4
+            }
+        return body
+
+    def next_fault(self) -> Optional[str]:
+        """
+        Pick the fault (if any) for the next request and count it.
+        """
+        with self._lock:
+            if self.faults:
+                fault = self.faults.pop(0)
+            else:
+                fault, roll = None, self._random.random()
+                for kind, rate in self.fault_rates.items():
+                    if roll < rate:
+                        fault = kind
+                        break
+                    roll -= rate
+            if fault:
+                self.injected[fault] = self.injected.get(fault, 0) + 1
+            return fault
+
+    def stream_pieces(self) -> List[str]:
+        text = json.dumps(self.analysis)
+        size = max(1, -(-len(text) // self.stream_chunks))
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, like the real endpoint
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; avoid Nagle stalls
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                self.rfile.read(length)
+                with stub._lock:
+                    stub.requests += 1
+                fault = stub.next_fault()
+                if fault == 'error':
+                    self._send_error(503, 'UNAVAILABLE', "The model is overloaded.")
+                    return
+                if fault == 'rate_limit':
+                    self._send_error(429, 'RESOURCE_EXHAUSTED', "Quota exceeded.")
+                    return
+                if fault == 'hang':
+                    time.sleep(stub.hang_seconds)
+                elif fault == 'slow':
+                    time.sleep(stub.slow_seconds)
+                if stub.latency_seconds:
+                    time.sleep(stub.latency_seconds)
+                if fault == 'garbage':
+                    if 'streamGenerateContent' in self.path:
+                        self._send_stream([GARBAGE_TEXT])
+                    else:
+                        self._send_json(200, stub.response_body(GARBAGE_TEXT))
+                    return
+                if 'streamGenerateContent' in self.path:
+                    self._send_stream(stub.stream_pieces())
+                    return
+                time.sleep(stub.chunk_delay_seconds * stub.stream_chunks)
+                self._send_json(200, stub.response_body())
+
+            def _send_stream(self, pieces: List[str]) -> None:
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for i, piece in enumerate(pieces):
+                    time.sleep(stub.chunk_delay_seconds)
+                    event = stub.response_body(piece, final=i == len(pieces) - 1)
+                    data = f"data: {json.dumps(event)}\r\n\r\n".encode('utf-8')
+                    self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _send_error(self, code: int, status: str, message: str) -> None:
+                self._send_json(code, {"error": {"code": code, "message": message, "status": status}})
+
+            def _send_json(self, code: int, body: Dict) -> None:
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,89 @@
+"""
+Stand-in for easyocr.Reader when EasyOCR or its models are unavailable.
+
+readtext returns the ground-truth text queued with expect(), after a delay
+proportional to the image's pixel count (roughly what CPU EasyOCR costs), so
+the rest of the pipeline can be timed offline. With busy=True the delay is
+that much CPU time (burned, not slept), so contending scans slow each other
+down as they would on real cores.
+"""
+
+import threading
+import time
+from typing import List
+
+import numpy as np
+
+
+class StubOCRReader:
+    """
+    Minimal easyocr.Reader look-alike for benchmarks.
+    """
+
+    def __init__(self, seconds_per_megapixel: float = 1.5, busy: bool = False, load_seconds: float = 0.0,
+                 text: str = ''):
+        time.sleep(load_seconds)  # Model download/load
+        self.text = text  # Returned when expect() was not called on the calling thread
+        self.seconds_per_megapixel = seconds_per_megapixel
+        self.busy = busy
+        self.calls = 0
+        self._local = threading.local()
+
+    def expect(self, text: str) -> None:
+        """
+        Set the text the next readtext call (on this thread) returns.
+        """
+        self._local.text = text
+
+    def readtext(self, image: np.ndarray, detail: int = 0, paragraph: bool = True, **kwargs) -> List[str]:
+        self.calls += 1
+        delay = image.shape[0] * image.shape[1] / 1e6 * self.seconds_per_megapixel
+        if self.busy:
+            deadline = time.thread_time() + delay
+            while time.thread_time() < deadline:
+                np.dot(np.ones((64, 64)), np.ones((64, 64)))
+        else:
+            time.sleep(delay)
+        text = getattr(self._local, 'text', self.text)
+        return [line for line in text.split('\n') if line]
+
+
+class LayoutStubReader:
+    """
+    easyocr.Reader look-alike that knows where each text line is.
+
+    detect returns the line boxes of a synthetic label (see
+    synthetic_labels.label_layout); recognize returns the characters under
+    each crop, taking seconds_per_unit per box-height of crop width (the
+    recognizer's cost grows with crop width). readtext recognizes everything.
+    """
+
+    def __init__(self, boxes, seconds_per_unit: float = 0.002):
+        self.boxes = [(text, tuple(bounds)) for text, bounds in boxes]
+        self.seconds_per_unit = seconds_per_unit
+        self.units = 0.0
+
+    def detect(self, image: np.ndarray, **kwargs):
+        return [[list(bounds) for _, bounds in self.boxes]], [[]]
+
+    def recognize(self, image: np.ndarray, horizontal_list=None, free_list=None, detail: int = 1,
+                  paragraph: bool = False, **kwargs):
+        results = []
+        for x_min, x_max, y_min, y_max in horizontal_list or []:
+            text, (box_x_min, box_x_max, box_y_min, box_y_max) = min(
+                self.boxes, key=lambda item: abs(item[1][0] - x_min) + abs(item[1][2] - y_min))
+            start = round(len(text) * max(0, x_min - box_x_min) / max(1, box_x_max - box_x_min))
+            end = round(len(text) * min(1.0, (x_max - box_x_min) / max(1, box_x_max - box_x_min)))
+            units = (x_max - x_min) / max(1, y_max - y_min)
+            self.units += units
+            time.sleep(units * self.seconds_per_unit)
+            corners = [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+            results.append((corners, text[start:end], 0.9))
+        return results if detail else [text for _, text, _ in results]
+
+    def readtext(self, image: np.ndarray, detail: int = 1, paragraph: bool = False, **kwargs):
+        horizontal, _ = self.detect(image)
+        results = self.recognize(image, horizontal_list=horizontal[0], detail=1)
+        if detail == 0:
+            return [text for _, text, _ in results]
+        return results
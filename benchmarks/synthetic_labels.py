@@ -0,0 +1,194 @@
+"""
+Synthetic medication, supplement and food label images rendered with PIL.
+
+Each label gets a seeded mix of marketing lines, a section layout matching
+its kind ("Drug Facts" / "Supplement Facts" / "INGREDIENTS:") and an
+ingredient list drawn partly from the knowledge base so analyses have
+something to find. Size, font, font size, sensor noise, blur and rotation
+vary per label; the ground-truth text is returned alongside the image.
+"""
+
+import os
+import random
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+KINDS = ('drug', 'supplement', 'food')
+
+ACTIVES = ['Loratadine 10 mg', 'Acetaminophen 500 mg', 'Ibuprofen 200 mg', 'Aspirin 325 mg',
+           'Diphenhydramine HCl 25 mg', 'Cetirizine HCl 10 mg', 'Pseudoephedrine HCl 30 mg',
+           'Dextromethorphan HBr 15 mg', 'Guaifenesin 400 mg', 'Naproxen sodium 220 mg']
+SUPPLEMENTS = ['Vitamin C 500 mg', 'Vitamin K 120 mcg', 'St. John\'s Wort 300 mg', 'Ginkgo biloba 60 mg',
+               'Fish oil 1000 mg', 'Magnesium 250 mg', 'Melatonin 5 mg', 'Garlic extract 500 mg',
+               'Potassium 99 mg', 'Iron 18 mg', 'Calcium 600 mg', 'Turmeric 500 mg']
+EXCIPIENTS = ['corn starch', 'lactose monohydrate', 'magnesium stearate', 'microcrystalline cellulose',
+              'FD&C Red No. 40', 'FD&C Yellow No. 5', 'gelatin', 'titanium dioxide', 'povidone',
+              'croscarmellose sodium', 'silicon dioxide', 'stearic acid', 'soy lecithin', 'carnauba wax']
+FOOD_INGREDIENTS = ['whole grain oats', 'sugar', 'peanuts', 'almonds', 'milk powder', 'whey', 'eggs',
+                    'wheat flour', 'soy lecithin', 'canola oil', 'honey', 'salt', 'natural flavor',
+                    'shrimp extract', 'cocoa', 'rice flour', 'brown sugar syrup', 'sesame seeds']
+WARNINGS = ['Do not use if you are allergic to any of the ingredients.',
+            'Ask a doctor before use if you have high blood pressure or kidney disease.',
+            'Ask a doctor or pharmacist before use if you are taking a blood thinner.',
+            'Keep out of reach of children.',
+            'If pregnant or breast-feeding, ask a health professional before use.']
+MARKETING = ['NEW! Fast Acting Relief', 'Doctor Recommended Brand', 'Original Prescription Strength',
+             'Gluten Free - Non GMO', 'Trusted Since 1975', 'Made with Real Ingredients',
+             'Great Taste Guaranteed', 'Compare to National Brand', 'Family Size Value Pack']
+FOOTERS = ['Distributed by Acme Health LLC, Columbus, OH 43215', 'www.acmehealth.com 1-800-555-0142',
+           'LOT 4F2291A EXP 09/2027', 'Store at 20-25C. Protect from moisture.']
+
+_FONT_DIRS = ('/usr/share/fonts', '/usr/local/share/fonts', '/Library/Fonts', 'C:\\Windows\\Fonts')
+
+
+@dataclass
+class LabelSpec:
+    """
+    Parameters for one synthetic label.
+    """
+    seed: int
+    kind: str = 'drug'
+    width: int = 900
+    font_size: int = 26
+    font_path: Optional[str] = None
+    noise: float = 0.0        # Gaussian sensor noise sigma (0-255 scale)
+    blur: float = 0.0         # Gaussian blur radius
+    rotation: float = 0.0     # Degrees
+    ingredients: List[str] = field(default_factory=list)
+
+
+def find_fonts() -> List[str]:
+    """
+    TrueType fonts available on this machine (may be empty).
+    """
+    fonts = []
+    for directory in _FONT_DIRS:
+        for root, _, files in os.walk(directory):
+            fonts.extend(os.path.join(root, name) for name in files if name.lower().endswith('.ttf'))
+    return sorted(fonts)
+
+
+def label_lines(spec: LabelSpec) -> List[str]:
+    """
+    Ground-truth text lines for a label.
+    """
+    rng = random.Random(spec.seed)
+    lines = rng.sample(MARKETING, 2)
+    if spec.kind == 'drug':
+        lines += ['Drug Facts', 'Active ingredient (in each tablet)']
+        lines += [item for item in spec.ingredients if item in ACTIVES]
+        lines += ['Warnings'] + rng.sample(WARNINGS, 3)
+        lines += ['Inactive ingredients ' + ', '.join(item for item in spec.ingredients if item in EXCIPIENTS)]
+    elif spec.kind == 'supplement':
+        lines += ['Supplement Facts', 'Serving Size 1 Capsule']
+        lines += [item for item in spec.ingredients if item in SUPPLEMENTS]
+        lines += ['Other ingredients: ' + ', '.join(item for item in spec.ingredients if item in EXCIPIENTS)]
+        lines += ['Warning: ' + rng.choice(WARNINGS)]
+    else:
+        lines += ['Nutrition Facts', 'Serving size 1 bar (40g) Calories 190']
+        lines += ['INGREDIENTS: ' + ', '.join(spec.ingredients).upper()]
+        allergens = [item for item in spec.ingredients
+                     if item in ('peanuts', 'almonds', 'milk powder', 'whey', 'eggs', 'wheat flour', 'shrimp extract')]
+        if allergens:
+            lines.append('CONTAINS: ' + ', '.join(allergens).upper())
+    lines += rng.sample(FOOTERS, 2)
+    return lines
+
+
+def make_spec(seed: int, fonts: Optional[List[str]] = None) -> LabelSpec:
+    """
+    Draw a random label spec (deterministic for a given seed).
+    """
+    rng = random.Random(seed)
+    kind = KINDS[seed % len(KINDS)]
+    if kind == 'drug':
+        ingredients = rng.sample(ACTIVES, rng.randint(1, 2)) + rng.sample(EXCIPIENTS, rng.randint(3, 7))
+    elif kind == 'supplement':
+        ingredients = rng.sample(SUPPLEMENTS, rng.randint(2, 6)) + rng.sample(EXCIPIENTS, rng.randint(2, 4))
+    else:
+        ingredients = rng.sample(FOOD_INGREDIENTS, rng.randint(5, 10))
+    return LabelSpec(
+        seed=seed,
+        kind=kind,
+        width=rng.choice([640, 900, 1200, 1600, 2400]),
+        font_size=rng.choice([18, 22, 26, 32, 40]),
+        font_path=rng.choice(fonts) if fonts else None,
+        noise=rng.choice([0.0, 0.0, 4.0, 10.0]),
+        blur=rng.choice([0.0, 0.0, 0.6, 1.2]),
+        rotation=rng.choice([0.0, 0.0, -3.0, 2.0, 5.0]),
+        ingredients=ingredients
+    )
+
+
+def label_layout(spec: LabelSpec) -> Tuple[Tuple[int, int], List[Tuple[str, Tuple[int, int, int, int]]]]:
+    """
+    Where each wrapped text line is drawn, before rotation.
+
+    Returns:
+        ((width, height), [(line, (x_min, x_max, y_min, y_max)), ...])
+    """
+    scale = spec.width / 900
+    size = max(10, int(spec.font_size * scale))
+    font = _font(spec, size)
+    margin = int(40 * scale)
+    wrapped = []
+    for line in label_lines(spec):
+        wrapped.extend(_wrap(line, font, spec.width - 2 * margin))
+    line_height = int(size * 1.45)
+    height = 2 * margin + line_height * len(wrapped)
+    boxes = []
+    for index, line in enumerate(wrapped):
+        y = margin + index * line_height
+        boxes.append((line, (margin, margin + int(font.getlength(line)), y, y + size)))
+    return (spec.width, height), boxes
+
+
+def render_label(spec: LabelSpec) -> Tuple[Image.Image, str]:
+    """
+    Render a label image.
+
+    Returns:
+        (RGB image, ground-truth text with one line per label line)
+    """
+    scale = spec.width / 900
+    (width, height), boxes = label_layout(spec)
+    font = _font(spec, max(10, int(spec.font_size * scale)))
+    image = Image.new('RGB', (width, height), (250, 248, 240))
+    draw = ImageDraw.Draw(image)
+    for line, (x_min, _, y_min, _) in boxes:
+        draw.text((x_min, y_min), line, fill=(20, 20, 30), font=font)
+    wrapped = [line for line, _ in boxes]
+
+    if spec.rotation:
+        image = image.rotate(spec.rotation, resample=Image.BICUBIC, expand=True, fillcolor=(200, 200, 200))
+    if spec.blur:
+        image = image.filter(ImageFilter.GaussianBlur(spec.blur * scale))
+    if spec.noise:
+        rng = np.random.default_rng(spec.seed)
+        pixels = np.asarray(image, dtype=np.float32)
+        pixels += rng.normal(0, spec.noise, pixels.shape)
+        image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    return image, '\n'.join(wrapped)
+
+
+def _font(spec: LabelSpec, size: int):
+    if spec.font_path:
+        return ImageFont.truetype(spec.font_path, size)
+    return ImageFont.load_default(size=size)
+
+
+def _wrap(line: str, font, max_width: int) -> List[str]:
+    words, lines, current = line.split(), [], ''
+    for word in words:
+        candidate = f"{current} {word}".strip()
+        if current and font.getlength(candidate) > max_width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return lines
@@ -14,6 +14,27 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 DEMO_MODE = not GEMINI_API_KEY
 GEMINI_MODEL = "gemini-2.5-flash"
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "")  # Override endpoint, e.g. a local stub server
+
+# Keyword rules used for demo-mode analysis (see core/rule_engine.py)
+DEMO_RULES_PATH = os.path.join(os.path.dirname(__file__), "rules.json")
+
+# Local interaction/allergen knowledge base checked before Gemini (see core/knowledge_base.py)
+KNOWLEDGE_BASE_PATH = os.path.join(os.path.dirname(__file__), "knowledge_base.json")
+LOCAL_TRIAGE_ENABLED = True  # Return confident local DANGER verdicts without calling Gemini
+
+# OCR-tolerant ingredient matching (see core/lexicon.py)
+LEXICON_MIN_CONFIDENCE = 0.8  # 1 - edit_distance / length required for a fuzzy hit
+LEXICON_EXTRA_PATH = os.getenv("LEXICON_PATH", "")  # Optional TSV of extra "<canonical_id>\t<term>" lines
+# Word list (one per line) of real words never fuzzy-matched to a term ("lactase" is not "lactose")
+LEXICON_DICTIONARY_PATH = os.getenv(
+    "LEXICON_DICTIONARY_PATH", "/usr/share/dict/words" if os.path.exists("/usr/share/dict/words") else ""
+)
+
+# Label text sent to Gemini is cut down to the relevant sections (ingredients,
+# warnings, ...) when it exceeds this many estimated tokens (see core/label_sections.py).
+# Ingredient and warning sections are always sent whole, even beyond it. 0 sends the full OCR text.
+LABEL_TEXT_TOKEN_BUDGET = 300
 
 # ══════════════════════════════════════════════════════════════════════════════
 # UI THEME COLORS
@@ -31,9 +52,99 @@ COLORS = {
 # OCR SETTINGS
 # ══════════════════════════════════════════════════════════════════════════════
 OCR_LANGUAGE = ['en']
-OCR_GPU_ENABLED = True
+OCR_GPU_ENABLED = os.getenv("OCR_GPU", "true").lower() == "true"  # Falls back to CPU when CUDA is absent
 OCR_VERBOSE = False
 
+# Inference backend (see core/ocr_backends.py):
+#   'easyocr'  stock PyTorch readtext (on CPU EasyOCR already int8-quantizes
+#              the recognizer's LSTM/Linear layers; the CRAFT detector stays fp32)
+#   'onnx'     detector and recognizer exported once to ONNX and run under
+#              ONNX Runtime, recognizer int8-quantized; CPU only
+OCR_BACKEND = os.getenv("OCR_BACKEND", "easyocr")
+OCR_CPU_CONFIG = {
+    'intra_op_threads': int(os.getenv("OCR_THREADS", "0")),  # 0 = OMP_NUM_THREADS, else runtime default
+    'inter_op_threads': 1,
+    'onnx_model_dir': os.getenv("OCR_ONNX_DIR", os.path.join(os.path.expanduser("~"), ".EasyOCR", "onnx")),
+    'onnx_quantize_recognizer': True,
+    'onnx_opset': 17
+}
+
+# Normalization applied before reader.readtext (see core/image_preprocessing.py)
+OCR_PREPROCESS_CONFIG = {
+    'max_long_edge': 1600,    # Downscale so the longest side is at most this (None disables)
+    'grayscale': True,
+    'contrast_cutoff': 1.0,   # Percent of histogram clipped by autocontrast (None disables)
+    'deskew': False,          # Projection-profile deskew, adds tens of ms per scan
+    'deskew_max_angle': 10.0,
+    'deskew_step': 1.0
+}
+
+# Quality gate run on each frame before OCR (see core/image_quality.py);
+# rejected frames get retake advice instead of a slow, failing OCR pass
+OCR_QUALITY_GATE = {
+    'enabled': os.getenv("OCR_QUALITY_GATE", "true").lower() == "true",
+    'analysis_long_edge': 640,       # Scores are computed on a copy this size
+    'min_blur_score': 300.0,         # Contrast-normalized Laplacian variance (sharp print: thousands)
+    'min_p95': 60,                   # Brightest 5% darker than this -> too dark
+    'max_p1': 190,                   # Darkest 1% brighter than this -> washed out
+    'min_spread': 40,                # 1st-99th percentile range below this -> no contrast
+    'tile_size': 16,
+    'edge_fraction': 0.25,           # Tile has text if an edge exceeds this share of the range
+    'min_text_area': 0.05,           # Tiles with text, as a share of the frame
+    'default_ocr_cpu_seconds': 3.0   # Assumed OCR cost per frame until one has been measured
+}
+
+# OCR result cache keyed by normalized image bytes + OCR settings (see core/cache.py)
+OCR_CACHE_MAX_ENTRIES = 512
+OCR_CACHE_MAX_BYTES = 8 * 1024 * 1024
+OCR_CACHE_DISK_DIR = os.getenv("OCR_CACHE_DIR", "")  # Empty disables the disk tier
+OCR_CACHE_DISK_MAX_BYTES = 256 * 1024 * 1024
+
+# Region-of-interest OCR (see core/ocr_regions.py): detect all text boxes,
+# probe each box's first few characters for section headers, and run the
+# full recognizer only on the ingredient / warnings / allergen panels
+OCR_ROI = {
+    'enabled': os.getenv("OCR_ROI", "false").lower() == "true",
+    'probe_aspect': 6.0,    # Probe width in box heights (~10 characters)
+    'probe_overlap': 3.0,   # The rest of a long box is read from this far back into the probe
+    'max_line_gap': 3.0     # A vertical gap this many line heights ends a panel
+}
+
+# Load the OCR reader (and run one dummy inference) in a background thread as
+# soon as the app starts, instead of on the first "Analyze Product" click
+OCR_WARMUP_ENABLED = os.getenv("OCR_WARMUP", "true").lower() == "true"
+
+# Out-of-process OCR (see core/ocr_pool.py). 0 workers runs readtext in the
+# calling thread; N > 0 starts N worker processes, each loading its own reader.
+OCR_POOL = {
+    'workers': int(os.getenv("OCR_POOL_WORKERS", "0")),
+    'queue_size': int(os.getenv("OCR_POOL_QUEUE_SIZE", "8")),  # Waiting jobs before "busy" is returned
+    'queue_timeout_seconds': 30.0,   # Max wait for a free worker
+    'job_timeout_seconds': 60.0,     # A worker running longer is killed and replaced
+    'torch_threads': 0,              # Intra-op threads per worker (0 = cores // workers)
+    'start_method': 'spawn'          # Fork is unsafe once torch has started threads
+}
+
+# In-process reader replicas (see core/reader_pool.py), used when OCR_POOL is off.
+# A reader is not safe to call from two threads at once, so each scan checks a
+# replica out; up to min(cores, memory budget / replica size) replicas are built.
+OCR_READERS = {
+    'replicas': int(os.getenv("OCR_READERS", "0")),  # 0 = derive from the memory budget and cores
+    'memory_budget_mb': float(os.getenv("OCR_READERS_MEMORY_MB", "1500")),
+    'replica_memory_mb': 450.0,          # Estimate until built replicas have been measured
+    'checkout_timeout_seconds': 30.0     # Max wait for a free replica before "busy" is returned
+}
+
+# Cross-session recognizer batching (see core/ocr_batching.py), used with the
+# in-process replicas. On CPU EasyOCR recognizes one text crop per forward pass;
+# with batching on, crops from concurrent scans are recognized together.
+OCR_BATCHING = {
+    'enabled': os.getenv("OCR_BATCHING", "false").lower() == "true",
+    'window_ms': float(os.getenv("OCR_BATCHING_WINDOW_MS", "20")),  # Longest a scan waits for others to batch with
+    'max_batch_crops': 64,   # Run at once when this many crops are waiting
+    'max_pad_ratio': 2.0     # Widest / narrowest crop in one pass (each crop is padded to the widest)
+}
+
 # ══════════════════════════════════════════════════════════════════════════════
 # AI PROMPT TEMPLATES
 # ══════════════════════════════════════════════════════════════════════════════
@@ -66,7 +177,94 @@ STATUS DEFINITIONS:
 # ══════════════════════════════════════════════════════════════════════════════
 # GEMINI API CONFIGURATION
 # ══════════════════════════════════════════════════════════════════════════════
+# Structured output schema enforced on every analysis request. Property order
+# puts status first so streaming surfaces the verdict as early as possible.
+ANALYSIS_RESPONSE_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {
+        'status': {'type': 'STRING', 'enum': ['SAFE', 'CAUTION', 'DANGER']},
+        'summary': {'type': 'STRING'},
+        'details': {'type': 'ARRAY', 'items': {'type': 'STRING'}},
+        'recommendation': {'type': 'STRING'},
+        'compounding_suggested': {'type': 'BOOLEAN'},
+        'compounding_note': {'type': 'STRING'}
+    },
+    'required': ['status', 'summary', 'details', 'recommendation', 'compounding_suggested', 'compounding_note'],
+    'property_ordering': ['status', 'summary', 'details', 'recommendation', 'compounding_suggested', 'compounding_note']
+}
+
 GEMINI_CONFIG = {
     'temperature': 0.1,  # Low temperature for consistent medical advice
-    'max_output_tokens': 1000
+    'max_output_tokens': 1000,
+    'response_mime_type': 'application/json',
+    'response_schema': ANALYSIS_RESPONSE_SCHEMA
+}
+
+# Stream responses so the verdict renders before the full JSON has arrived
+GEMINI_STREAMING = True
+
+# Shared HTTP client used for every Gemini call (see core/gemini_client.py)
+GEMINI_HTTP_CONFIG = {
+    'timeout_seconds': 30.0,
+    'max_connections': 16,
+    'max_keepalive_connections': 8,
+    'keepalive_expiry_seconds': 120.0,
+    'max_concurrent_requests': 8   # In-flight cap across all sessions
+}
+
+# Memoized analyze_safety results (see core/cache.py)
+ANALYSIS_CACHE_MAX_ENTRIES = 1024
+ANALYSIS_CACHE_TTL_SECONDS = 6 * 60 * 60
+
+# Persistent scan history (see core/history.py): completed scans are kept in
+# SQLite, so a photo or label scanned before reopens without OCR or Gemini and
+# past results are listed in the sidebar. An empty path disables it.
+SCAN_HISTORY = {
+    'path': os.getenv("SCAN_HISTORY_PATH", "scan_history.db"),
+    'batch_size': 32,                # Most scans committed per write transaction
+    'flush_interval_seconds': 1.0,   # Longest a recorded scan waits to be written
+    'max_pending': 1000,             # Scans queued beyond this are not recorded
+    'reuse_max_age_days': 30.0,      # Older scans are listed but not reused by Analyze
+    'sidebar_entries': 20
+}
+
+# Identical concurrent OCR / analysis requests wait on one shared computation (see core/singleflight.py)
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT", "true").lower() == "true"
+
+# Retries, per-attempt deadlines, hedging and circuit breaker for Gemini calls
+# (see core/resilience.py). While the breaker is open, scans fall back to the
+# local rule engine instead of waiting on a failing API.
+GEMINI_RESILIENCE = {
+    'attempt_timeout_seconds': 20.0,
+    'max_attempts': 3,
+    'backoff_base_seconds': 0.5,
+    'backoff_max_seconds': 4.0,
+    'hedge_enabled': True,
+    'hedge_min_delay_seconds': 2.0,  # Never hedge sooner than this
+    'hedge_percentile': 0.95,        # ...or than the p95 of recent attempts
+    'breaker_failure_threshold': 5,  # Consecutive failed calls before opening
+    'breaker_reset_seconds': 30.0
+}
+
+# ══════════════════════════════════════════════════════════════════════════════
+# METRICS (see core/metrics.py)
+# ══════════════════════════════════════════════════════════════════════════════
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+METRICS_EXPORT_PATH = os.getenv("METRICS_EXPORT_PATH", "")  # Prometheus textfile, rewritten after scans
+METRICS_HTTP_PORT = int(os.getenv("METRICS_PORT", "0"))  # Serve /metrics on 127.0.0.1 when set
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SCAN SERVICE (see core/service.py and scan_service.py)
+# ══════════════════════════════════════════════════════════════════════════════
+# With SCAN_SERVICE_URL set (http://host:port or unix:///path/to.sock) the app
+# sends OCR and analysis to a separate scan_service.py process instead of
+# loading the models itself, so N UI replicas can share M inference workers
+SCAN_SERVICE_URL = os.getenv("SCAN_SERVICE_URL", "")
+SCAN_SERVICE = {
+    'host': os.getenv("SCAN_SERVICE_HOST", "127.0.0.1"),
+    'port': int(os.getenv("SCAN_SERVICE_PORT", "8600")),
+    'socket_path': os.getenv("SCAN_SERVICE_SOCKET", ""),  # Listen on a Unix socket instead of TCP
+    'timeout_seconds': 120.0,                 # Client-side limit for one request
+    'max_request_bytes': 32 * 1024 * 1024,    # Larger uploads are refused with 413
+    'ready_poll_seconds': 1.0                 # UI readiness polling while the service warms up
 }
@@ -2,12 +2,43 @@
 Core functionality for Contra-Scan.
 """
 
-from .ocr_engine import load_ocr_reader, extract_text_from_image
-from .ai_analyzer import analyze_safety, get_demo_response
+from .ocr_engine import load_ocr_reader, extract_text_from_image, get_ocr_cache
+from .ai_analyzer import (
+    analyze_safety,
+    analyze_safety_stream,
+    get_demo_response,
+    get_analysis_cache
+)
+from .gemini_client import get_gemini_client
+from .history import get_scan_history
+from .metrics import get_metrics
+from .pipeline import ScanConfig, ScanEngine, ScanResult
+from .resources import get_resources
+from .service_client import ServiceClient, get_service_client
+from .singleflight import get_coalescing_stats
+from .warmup import get_warmup_status, start_ocr_warmup
+from .response_parser import AnalysisResult, get_parse_stats
 
 __all__ = [
     'load_ocr_reader',
     'extract_text_from_image',
+    'get_ocr_cache',
     'analyze_safety',
-    'get_demo_response'
+    'analyze_safety_stream',
+    'get_demo_response',
+    'get_analysis_cache',
+    'get_gemini_client',
+    'get_scan_history',
+    'get_metrics',
+    'ScanConfig',
+    'ScanEngine',
+    'ScanResult',
+    'get_resources',
+    'ServiceClient',
+    'get_service_client',
+    'get_coalescing_stats',
+    'get_warmup_status',
+    'start_ocr_warmup',
+    'AnalysisResult',
+    'get_parse_stats'
 ]
@@ -2,119 +2,503 @@
 AI-powered safety analysis using Google Gemini API.
 """
 
+import hashlib
 import json
-import streamlit as st
-from typing import Dict
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
 from config.settings import (
-    GEMINI_API_KEY,
     DEMO_MODE,
     GEMINI_MODEL,
     SYSTEM_PROMPT,
-    GEMINI_CONFIG
+    GEMINI_CONFIG,
+    LOCAL_TRIAGE_ENABLED,
+    ANALYSIS_CACHE_MAX_ENTRIES,
+    ANALYSIS_CACHE_TTL_SECONDS,
+    GEMINI_RESILIENCE,
+    LABEL_TEXT_TOKEN_BUDGET
 )
+from .cache import ResultCache, make_cache_key
+from .gemini_client import generate_content, generate_content_stream
+from .json_stream import parse_partial_json
+from .knowledge_base import get_knowledge_base
+from .label_sections import LabelExtract, extract_label_sections
+from .lexicon import get_lexicon
+from .metrics import cache_samples, get_metrics, inc, span
+from .resilience import CircuitOpenError, ResilientCaller, is_retryable
+from .response_parser import VALID_STATUSES, ResponseParseError, get_parse_stats, parse_analysis_response
+from .rule_engine import get_rule_engine
+from .service_client import ServiceError, ServiceUnavailableError, get_service_client
+from .singleflight import single_flight
 
+PROFILE_FIELDS = ('prescriptions', 'allergies', 'conditions')
 
-def analyze_safety(user_profile: Dict[str, str], scanned_text: str) -> Dict:
+# Values of the "source" key recording which path produced a result
+SOURCE_DEMO = 'demo_rules'
+SOURCE_LOCAL = 'local_kb'
+SOURCE_GEMINI = 'gemini'
+SOURCE_FALLBACK = 'fallback'
+SOURCE_OFFLINE = 'offline_rules'
+
+# Bumps automatically whenever the prompt text changes
+PROMPT_VERSION = hashlib.sha256(SYSTEM_PROMPT.encode('utf-8')).hexdigest()[:16]
+
+_analysis_cache = ResultCache(
+    'analysis',
+    max_entries=ANALYSIS_CACHE_MAX_ENTRIES,
+    ttl_seconds=ANALYSIS_CACHE_TTL_SECONDS
+)
+_gemini_caller = ResilientCaller('gemini', GEMINI_RESILIENCE)
+_analysis_flights = single_flight('analysis')
+
+
+def _metric_samples():
+    samples = cache_samples(_analysis_cache.stats())
+    stats = _gemini_caller.snapshot()
+    for key in ('calls', 'attempts', 'retries', 'hedges', 'hedge_wins', 'failures', 'short_circuited'):
+        samples.append((f"gemini_{key}_total", 'counter', {}, stats[key]))
+    samples.append(('gemini_breaker_open', 'gauge', {}, int(stats['breaker_state'] != 'closed')))
+    parse_stats = get_parse_stats()
+    for outcome in ('parsed', 'repaired', 'failed'):
+        samples.append(('responses_total', 'counter', {'outcome': outcome}, parse_stats[outcome]))
+    return samples
+
+
+get_metrics().register_collector(_metric_samples)
+
+
+def analyze_safety(user_profile: Dict[str, str], scanned_text: str, client=None, service=None) -> Dict:
     """
     Use Gemini AI to analyze product safety against user's medical profile.
     
+    The local knowledge base is checked first; a confident DANGER verdict is
+    returned without calling Gemini. Gemini calls go through the retry /
+    hedging / circuit breaker policy in GEMINI_RESILIENCE; if the API stays
+    unavailable the local rule engine answers instead. The "source" key of the
+    result records which path produced it (demo_rules, local_kb, gemini,
+    offline_rules or fallback). Concurrent calls for the same normalized
+    profile and label text share one Gemini call (see core/singleflight.py).
+    
+    With a scan service configured (SCAN_SERVICE_URL) and no client given,
+    the analysis runs in the service; if it cannot be reached the local rule
+    engine answers.
+    
     Args:
         user_profile: Dict with prescriptions, allergies, conditions
         scanned_text: OCR-extracted text from product
+        client: genai.Client to use instead of the shared one
+        service: ServiceClient to use instead of the configured one
         
     Returns:
         Analysis result dict with status, summary, recommendation
     """
+    service = _analysis_service(client, service)
+    if service is not None:
+        try:
+            with span('analysis.service'):
+                return service.analyze(user_profile, scanned_text)
+        except ServiceUnavailableError as e:
+            return _offline_result(user_profile, scanned_text, e)
+        except ServiceError as e:
+            return _error_result(e)
+    with span('analysis.total'):
+        result = _analyze_safety(user_profile, scanned_text, client)
+    inc('analyses_total', source=result.get('source', 'unknown'))
+    return result
+
+
+def _analyze_safety(user_profile: Dict[str, str], scanned_text: str, client=None) -> Dict:
+    with span('analysis.local'):
+        result, cache_key = _resolve_without_llm(user_profile, scanned_text)
+    if result is not None:
+        return result
     
-    # ═══════════════════════════════════════════════════════════════════════
-    # DEMO MODE - Simulate dangerous interaction for judges
-    # ═══════════════════════════════════════════════════════════════════════
-    if DEMO_MODE:
-        return get_demo_response(user_profile, scanned_text)
+    # Identical analyses already running share that Gemini call
+    def live():
+        return _analyze_live(user_profile, scanned_text, client, cache_key)
     
+    result, _ = _analysis_flights.do(_flight_key(cache_key, client), live)
+    if result is None:
+        result = live()  # The shared call was a stream whose reader went away
+    return dict(result)
+
+
+def _analyze_live(user_profile: Dict[str, str], scanned_text: str, client, cache_key: str) -> Dict:
     # ═══════════════════════════════════════════════════════════════════════
     # LIVE MODE - Call Gemini API
     # ═══════════════════════════════════════════════════════════════════════
     try:
-        from google import genai
-        
-        client = genai.Client(api_key=GEMINI_API_KEY)
-        
         # Build user prompt
-        user_prompt = _build_user_prompt(user_profile, scanned_text)
+        with span('analysis.prompt'):
+            user_prompt, label = _build_user_prompt(user_profile, scanned_text)
         
-        # Call Gemini
-        response = client.models.generate_content(
-            model=GEMINI_MODEL,
-            contents=SYSTEM_PROMPT + "\n\n" + user_prompt,
-            config=GEMINI_CONFIG
-        )
+        # Call Gemini through the shared, pooled client under the resilience policy
+        with span('gemini.call'):
+            response = _gemini_caller.call(lambda timeout_seconds: generate_content(
+                contents=SYSTEM_PROMPT + "\n\n" + user_prompt,
+                config=GEMINI_CONFIG,
+                model=GEMINI_MODEL,
+                timeout_seconds=timeout_seconds,
+                client=client
+            ))
         
-        # Parse response
-        return _parse_gemini_response(response.text)
+        # Parse response; only well-formed results are worth remembering
+        with span('analysis.parse'):
+            result = _parse_gemini_response(response.text)
+        result['source'] = SOURCE_GEMINI
+        result['label_tokens'] = label.to_dict()
+        if _is_well_formed(result):
+            _analysis_cache.put(cache_key, dict(result))
+        return result
         
-    except json.JSONDecodeError as e:
-        return {
-            "status": "CAUTION",
-            "summary": "Analysis completed but response parsing failed.",
-            "details": [f"Raw response received but couldn't parse: {str(e)}"],
-            "recommendation": "Please try scanning again or consult a pharmacist.",
-            "compounding_suggested": False,
-            "compounding_note": ""
-        }
+    except (json.JSONDecodeError, ResponseParseError) as e:
+        return _parse_failure_result(e)
     except Exception as e:
-        return {
-            "status": "CAUTION",
-            "summary": f"Analysis error: {str(e)}",
-            "details": ["Could not complete safety analysis"],
-            "recommendation": "Please consult a pharmacist directly.",
-            "compounding_suggested": False,
-            "compounding_note": ""
-        }
+        if isinstance(e, CircuitOpenError) or is_retryable(e):
+            return _offline_result(user_profile, scanned_text, e)
+        return _error_result(e)
+
+
+def analyze_safety_stream(user_profile: Dict[str, str], scanned_text: str, client=None,
+                          service=None) -> Iterator[Dict]:
+    """
+    Streaming variant of analyze_safety.
+    
+    Yields partial result dicts (marked "streaming": True) as fields arrive
+    from Gemini; "status" only appears once its value is complete. The last
+    item is the final result, with "stream_metrics" holding
+    first_verdict_ms (time to a complete status) and total_ms.
+    
+    Streams honour the circuit breaker and fall back to the local rule engine
+    like analyze_safety, but are not retried or hedged: partial output may
+    already be on screen.
+    
+    Args:
+        user_profile: Dict with prescriptions, allergies, conditions
+        scanned_text: OCR-extracted text from product
+        client: genai.Client to use instead of the shared one
+        service: ServiceClient to use instead of the configured one (see analyze_safety)
+        
+    Yields:
+        Progressively more complete analysis result dicts
+    """
+    service = _analysis_service(client, service)
+    if service is not None:
+        yield from _remote_stream(service, user_profile, scanned_text)
+        return
+    start = time.perf_counter()
+    first_verdict_ms = None
+    
+    with span('analysis.local'):
+        result, cache_key = _resolve_without_llm(user_profile, scanned_text)
+    if result is None and not _gemini_caller.breaker.allow():
+        result = _offline_result(user_profile, scanned_text, CircuitOpenError("gemini circuit is open"))
+    flight = None
+    if result is None:
+        # Followers of an identical analysis in flight get only its final result
+        flight_key = _flight_key(cache_key, client)
+        call, leader = _analysis_flights.claim(flight_key)
+        if leader:
+            flight = (flight_key, call)
+        else:
+            shared = _analysis_flights.wait(call)
+            result = dict(shared) if shared is not None else None
+    if result is None:
+        response_text = ''
+        try:
+            with span('analysis.prompt'):
+                user_prompt, label = _build_user_prompt(user_profile, scanned_text)
+            for delta in generate_content_stream(
+                contents=SYSTEM_PROMPT + "\n\n" + user_prompt,
+                config=GEMINI_CONFIG,
+                model=GEMINI_MODEL,
+                timeout_seconds=GEMINI_RESILIENCE['attempt_timeout_seconds'],
+                client=client
+            ):
+                response_text += delta
+                partial = parse_partial_json(response_text)
+                if not isinstance(partial, dict):
+                    continue
+                if partial.get('status') not in VALID_STATUSES:
+                    partial.pop('status', None)
+                elif first_verdict_ms is None:
+                    first_verdict_ms = (time.perf_counter() - start) * 1000
+                partial['streaming'] = True
+                yield partial
+            
+            _gemini_caller.record_outcome()
+            with span('analysis.parse'):
+                result = _parse_gemini_response(response_text)
+            result['source'] = SOURCE_GEMINI
+            result['label_tokens'] = label.to_dict()
+            if _is_well_formed(result):
+                _analysis_cache.put(cache_key, dict(result))
+        except (json.JSONDecodeError, ResponseParseError) as e:
+            result = _parse_failure_result(e)
+        except Exception as e:
+            _gemini_caller.record_outcome(e)
+            if is_retryable(e):
+                result = _offline_result(user_profile, scanned_text, e)
+            else:
+                result = _error_result(e)
+        finally:
+            if flight is not None:
+                # None (stream abandoned mid-way) makes followers call Gemini themselves
+                _analysis_flights.release(*flight, value=dict(result) if result is not None else None)
+    
+    total_ms = (time.perf_counter() - start) * 1000
+    metrics = get_metrics()
+    metrics.observe('analysis.total', total_ms / 1000)
+    if first_verdict_ms is not None:
+        metrics.observe('analysis.first_verdict', first_verdict_ms / 1000)
+    inc('analyses_total', source=result.get('source', 'unknown'))
+    result['stream_metrics'] = {
+        'first_verdict_ms': first_verdict_ms if first_verdict_ms is not None else total_ms,
+        'total_ms': total_ms
+    }
+    yield result
+
+
+def _analysis_service(client, service):
+    """
+    The scan service to analyze with: the given one, else the configured one
+    unless a client was passed (explicit dependencies run locally).
+    """
+    if service is not None or client is not None:
+        return service
+    return get_service_client()
+
+
+def _remote_stream(service, user_profile: Dict[str, str], scanned_text: str) -> Iterator[Dict]:
+    result = None
+    try:
+        for result in service.analyze_stream(user_profile, scanned_text):
+            if result.get('error') and 'status' not in result:
+                raise ServiceUnavailableError(result['error'])
+            yield result
+    except ServiceUnavailableError as e:
+        if result is None or result.get('streaming'):
+            yield _offline_result(user_profile, scanned_text, e)
+    except ServiceError as e:
+        yield _error_result(e)
+
+
+def _resolve_without_llm(user_profile: Dict[str, str], scanned_text: str) -> Tuple[Optional[Dict], str]:
+    """
+    Answer from demo rules, local triage or the analysis cache if possible.
+    
+    Returns:
+        (result or None, analysis cache key for the live call)
+    """
+    
+    # ═══════════════════════════════════════════════════════════════════════
+    # DEMO MODE - Simulate dangerous interaction for judges
+    # ═══════════════════════════════════════════════════════════════════════
+    if DEMO_MODE:
+        result = get_demo_response(user_profile, scanned_text)
+        result['source'] = SOURCE_DEMO
+        return result, ''
+    
+    # ═══════════════════════════════════════════════════════════════════════
+    # LOCAL TRIAGE - Skip the LLM when the knowledge base is decisive
+    # ═══════════════════════════════════════════════════════════════════════
+    if LOCAL_TRIAGE_ENABLED:
+        # Only what the label literally says is decisive; possible misreads go to Gemini
+        triage = get_knowledge_base().triage(user_profile, scanned_text)
+        if triage.decisive:
+            result = triage.result
+            result['source'] = SOURCE_LOCAL
+            return result, ''
+    
+    # ═══════════════════════════════════════════════════════════════════════
+    # MEMOIZED LIVE RESULTS
+    # ═══════════════════════════════════════════════════════════════════════
+    cache_key = _analysis_cache_key(user_profile, scanned_text)
+    cached_result = _analysis_cache.get(cache_key)
+    if cached_result is not None:
+        return dict(cached_result), cache_key
+    return None, cache_key
 
 
-def _build_user_prompt(user_profile: Dict[str, str], scanned_text: str) -> str:
+def _parse_failure_result(error: Exception) -> Dict:
+    return {
+        "status": "CAUTION",
+        "summary": "Analysis completed but response parsing failed.",
+        "details": [f"Raw response received but couldn't parse: {str(error)}"],
+        "recommendation": "Please try scanning again or consult a pharmacist.",
+        "compounding_suggested": False,
+        "compounding_note": "",
+        "source": SOURCE_FALLBACK
+    }
+
+
+def _error_result(error: Exception) -> Dict:
+    return {
+        "status": "CAUTION",
+        "summary": f"Analysis error: {str(error)}",
+        "details": ["Could not complete safety analysis"],
+        "recommendation": "Please consult a pharmacist directly.",
+        "compounding_suggested": False,
+        "compounding_note": "",
+        "source": SOURCE_FALLBACK
+    }
+
+
+def _offline_result(user_profile: Dict[str, str], scanned_text: str, error: Exception) -> Dict:
+    """
+    Answer with the local rule engine while Gemini is unavailable.
+    
+    Rule matches are kept as-is; a rule-based SAFE is downgraded to CAUTION
+    since only the known interactions were checked.
+    """
+    result = get_demo_response(user_profile, scanned_text)
+    note = f"AI analysis unavailable ({error}); only known interactions were checked."
+    if result.get('status') == 'SAFE':
+        result['status'] = 'CAUTION'
+        result['summary'] = "No known conflicts found, but full AI analysis is temporarily unavailable."
+        result['recommendation'] = "Please scan again later or consult a pharmacist before use."
+    result['details'] = [note] + list(result.get('details', []))
+    result['source'] = SOURCE_OFFLINE
+    return result
+
+
+def get_gemini_caller() -> ResilientCaller:
+    """
+    Return the resilience wrapper used for Gemini calls (for stats and tuning).
+    """
+    return _gemini_caller
+
+
+def get_analysis_cache() -> ResultCache:
+    """
+    Return the process-wide analysis result cache (for stats display).
+    """
+    return _analysis_cache
+
+
+def normalize_profile(user_profile: Dict[str, str]) -> Dict[str, List[str]]:
+    """
+    Canonicalize a profile so equivalent entries compare equal.
+    
+    Each field is lowercased, split on commas, stripped and sorted, so
+    "Warfarin, Aspirin" and "aspirin,warfarin" normalize identically.
+    
+    Args:
+        user_profile: User's medical profile
+        
+    Returns:
+        Dict mapping each profile field to a sorted list of entries
+    """
+    normalized = {}
+    for field in PROFILE_FIELDS:
+        value = user_profile.get(field) or ''
+        normalized[field] = sorted(
+            item.strip() for item in value.lower().split(',') if item.strip()
+        )
+    return normalized
+
+
+def normalize_label_text(scanned_text: str) -> str:
+    """
+    Collapse case and whitespace differences in OCR text.
+    """
+    return ' '.join(scanned_text.lower().split())
+
+
+def _analysis_cache_key(user_profile: Dict[str, str], scanned_text: str) -> str:
+    """
+    Build the memoization key for a live analysis call.
+    """
+    return make_cache_key(
+        normalize_profile(user_profile),
+        normalize_label_text(scanned_text),
+        GEMINI_MODEL,
+        GEMINI_CONFIG,
+        PROMPT_VERSION,
+        LABEL_TEXT_TOKEN_BUDGET
+    )
+
+
+def _flight_key(cache_key: str, client) -> str:
+    """
+    Single-flight key: calls through different clients are never shared.
+    """
+    return cache_key if client is None else f"{cache_key}:{id(client)}"
+
+
+def _is_well_formed(result: Dict) -> bool:
+    """
+    Check that a parsed response has the fields the UI relies on and did
+    not need repair (repaired results may be missing content).
+    """
+    return (
+        isinstance(result, dict)
+        and not result.get('repaired', False)
+        and result.get('status') in VALID_STATUSES
+        and isinstance(result.get('summary'), str)
+        and isinstance(result.get('details', []), list)
+        and isinstance(result.get('recommendation'), str)
+    )
+
+
+def _build_user_prompt(user_profile: Dict[str, str], scanned_text: str) -> Tuple[str, LabelExtract]:
     """
     Build the user-specific analysis prompt.
     
+    The label text is sent as read. Ingredients found via the lexicon are
+    listed separately, with possible misreads as hints only (a near match
+    may be a different real word). Label text over LABEL_TEXT_TOKEN_BUDGET
+    is cut down to its relevant sections.
+    
     Args:
         user_profile: User's medical profile
         scanned_text: Scanned product text
         
     Returns:
-        Formatted prompt string
+        (formatted prompt string, label extract with token counts)
     """
-    return f"""
+    lexicon = get_lexicon()
+    matches = lexicon.match_text(scanned_text)
+    recognized = sorted({match.term for match in matches if not match.distance})
+    misreads = [f"'{match.token}' may be {match.term}" for match in matches if match.distance]
+    profile_terms = [term for entries in normalize_profile(user_profile).values() for term in entries]
+    label = extract_label_sections(scanned_text, priority_terms=profile_terms, matches=matches)
+    inc('label_tokens_sent_total', label.tokens)
+    inc('label_tokens_saved_total', label.tokens_saved)
+    label_heading = (
+        "PRODUCT TEXT (relevant label sections, as read by OCR; packaging text omitted):"
+        if label.trimmed else "PRODUCT TEXT (from label scan, as read by OCR):"
+    )
+    
+    prompt = f"""
 USER PROFILE:
 - Current Prescriptions: {user_profile.get('prescriptions', 'None listed')}
 - Known Allergies: {user_profile.get('allergies', 'None listed')}
 - Medical Conditions: {user_profile.get('conditions', 'None listed')}
 
-PRODUCT TEXT (from label scan):
-{scanned_text}
+RECOGNIZED INGREDIENTS: {', '.join(recognized) if recognized else 'None recognized'}
+POSSIBLE OCR MISREADS (hints only; label text unaltered): {'; '.join(misreads) if misreads else 'None'}
+
+{label_heading}
+{label.text}
 
 Analyze this product for safety concerns based on the user profile. Return JSON only."""
+    return prompt, label
 
 
 def _parse_gemini_response(response_text: str) -> Dict:
     """
-    Parse and clean Gemini API response.
+    Parse, repair and validate a Gemini API response.
     
     Args:
         response_text: Raw response from Gemini
         
     Returns:
-        Parsed JSON dict
+        Parsed result dict ("repaired": True if it had to be fixed up)
+        
+    Raises:
+        ResponseParseError: If the response cannot be recovered
     """
-    response_text = response_text.strip()
-    
-    # Clean up response if it has markdown code blocks
-    if "```json" in response_text:
-        response_text = response_text.split("```json")[1].split("```")[0]
-    elif "```" in response_text:
-        response_text = response_text.split("```")[1].split("```")[0]
-    
-    return json.loads(response_text)
+    return parse_analysis_response(response_text).to_dict()
 
 
 def get_demo_response(user_profile: Dict[str, str], scanned_text: str) -> Dict:
@@ -122,6 +506,12 @@ def get_demo_response(user_profile: Dict[str, str], scanned_text: str) -> Dict:
     Generate a demo response showing the PCCA compounding hook.
     Intelligently responds based on user profile and scanned text.
     
+    Rules from DEMO_RULES_PATH are matched in a single pass over the label
+    text as read (see core/rule_engine.py), plus the lexicon's exact readings
+    of misprinted names ("Red4O" is red 40 once OCR confusions are folded;
+    fuzzy matches are not used). Every triggered rule is listed in the
+    result's triggered_rules, with positions in the text as read.
+    
     Args:
         user_profile: User's medical profile
         scanned_text: Scanned product text
@@ -129,85 +519,6 @@ def get_demo_response(user_profile: Dict[str, str], scanned_text: str) -> Dict:
     Returns:
         Simulated analysis result dict
     """
-    allergies = user_profile.get('allergies', '').lower()
-    prescriptions = user_profile.get('prescriptions', '').lower()
-    text_lower = scanned_text.lower()
-    
-    # Check for dye allergies (PCCA Hook!)
-    if 'dye' in allergies or 'red 40' in allergies or 'yellow' in allergies:
-        if any(dye in text_lower for dye in ['red 40', 'yellow 5', 'yellow 6', 'blue 1', 'fd&c', 'dye', 'color']):
-            return {
-                "status": "DANGER",
-                "summary": "⚠️ ALLERGEN DETECTED: This product contains artificial dyes that match your allergy profile.",
-                "details": [
-                    "FD&C Red 40 or similar dye detected in product",
-                    "Your profile indicates allergy to: " + user_profile.get('allergies', ''),
-                    "Dyes are common excipients in medications and processed foods"
-                ],
-                "recommendation": "DO NOT USE this product. The artificial coloring could trigger an allergic reaction.",
-                "compounding_suggested": True,
-                "compounding_note": "💊 A compounding pharmacist can create a DYE-FREE version of this medication using the same active ingredients without artificial colors. PCCA-member pharmacies specialize in these custom formulations."
-            }
-    
-    # Check for Warfarin interactions
-    if 'warfarin' in prescriptions:
-        if any(word in text_lower for word in ['vitamin k', 'aspirin', 'ibuprofen', 'nsaid', 'ginkgo', 'garlic', 'ginger', 'green tea']):
-            return {
-                "status": "DANGER",
-                "summary": "⚠️ DRUG INTERACTION: This product may dangerously interact with Warfarin.",
-                "details": [
-                    "Product contains ingredients that affect blood clotting",
-                    "Warfarin (blood thinner) detected in your prescriptions",
-                    "Combining these could increase bleeding risk or reduce Warfarin effectiveness"
-                ],
-                "recommendation": "AVOID this product. Consult your doctor or pharmacist before using any supplements while on Warfarin.",
-                "compounding_suggested": True,
-                "compounding_note": "💊 A compounding pharmacist can formulate alternative supplements that don't interfere with your anticoagulation therapy. Ask about Warfarin-safe vitamin formulations."
-            }
-    
-    # Check for common food allergies
-    if any(allergen in allergies for allergen in ['peanut', 'tree nut', 'milk', 'dairy', 'egg', 'wheat', 'gluten', 'soy', 'shellfish']):
-        for allergen in ['peanut', 'nut', 'milk', 'dairy', 'egg', 'wheat', 'gluten', 'soy', 'shellfish', 'lactose']:
-            if allergen in text_lower:
-                return {
-                    "status": "DANGER",
-                    "summary": f"⚠️ ALLERGEN DETECTED: This product contains {allergen} which is in your allergy list.",
-                    "details": [
-                        f"'{allergen}' found in product ingredients",
-                        f"Your allergy profile includes: {user_profile.get('allergies', '')}",
-                        "Cross-contamination may also be a concern"
-                    ],
-                    "recommendation": f"DO NOT CONSUME. This product contains or may contain {allergen}.",
-                    "compounding_suggested": False,
-                    "compounding_note": ""
-                }
-    
-    # Check for hypertension concerns
-    if 'hypertension' in user_profile.get('conditions', '').lower():
-        if any(word in text_lower for word in ['sodium', 'salt', 'caffeine', 'pseudoephedrine', 'decongestant']):
-            return {
-                "status": "CAUTION",
-                "summary": "⚠️ CONDITION CONCERN: This product may not be ideal for your blood pressure condition.",
-                "details": [
-                    "High sodium/stimulant content detected",
-                    "Your profile indicates Hypertension",
-                    "This could potentially raise blood pressure"
-                ],
-                "recommendation": "Use with caution. Consider low-sodium alternatives or consult your doctor.",
-                "compounding_suggested": True,
-                "compounding_note": "💊 Compounding pharmacies can create sodium-free or stimulant-free versions of many medications for patients with hypertension."
-            }
-    
-    # Default safe response
-    return {
-        "status": "SAFE",
-        "summary": "✅ No conflicts detected between this product and your medical profile.",
-        "details": [
-            "No known allergens matching your profile",
-            "No significant drug interactions identified",
-            "Product appears compatible with your conditions"
-        ],
-        "recommendation": "This product appears safe based on your profile. Always read the full label and consult a pharmacist if unsure.",
-        "compounding_suggested": False,
-        "compounding_note": ""
-    }
+    readings = [(match.term, match.start, match.end)
+                for match in get_lexicon().match_text(scanned_text) if match.corrected and not match.distance]
+    return get_rule_engine().evaluate(user_profile, scanned_text, readings)
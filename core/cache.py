@@ -0,0 +1,235 @@
+"""
+Bounded result caches shared by all Streamlit sessions in the process.
+
+Values must be JSON-serializable. Each cache has an in-memory LRU tier bounded
+by entry count and bytes, optional TTL expiry, and an optional on-disk tier
+that survives restarts.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Build a stable SHA-256 key from bytes and JSON-serializable parts.
+
+    Args:
+        *parts: Raw bytes or JSON-serializable values
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (bytes, bytearray, memoryview)):
+            digest.update(part)
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with byte accounting and an optional disk tier.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: Optional[int] = None
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir or None
+        self.disk_max_bytes = disk_max_bytes
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, size, created)
+        self._bytes = 0
+        self._disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Public API
+    # ─────────────────────────────────────────────────────────────────────
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a key in memory, then on disk.
+
+        Returns:
+            Cached value or None on miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, size, created = entry
+                if self._expired(created):
+                    self._remove(key)
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+
+        record = self._disk_read(key)
+        with self._lock:
+            if record is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._store(key, record['value'], record['created'])
+            return record['value']
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Insert a value, evicting least recently used entries past the limits.
+        """
+        created = time.time()
+        with self._lock:
+            self._store(key, value, created)
+        self._disk_write(key, value, created)
+
+    def clear(self) -> None:
+        """
+        Drop every in-memory entry (the disk tier is left untouched).
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of cache counters.
+
+        Returns:
+            Dict with entries, bytes, hit/miss counts and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'disk_bytes': self._disk_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Memory tier (callers hold self._lock)
+    # ─────────────────────────────────────────────────────────────────────
+    def _expired(self, created: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created > self.ttl_seconds
+
+    def _store(self, key: str, value: Any, created: float) -> None:
+        if key in self._entries:
+            self._remove(key)
+        size = len(json.dumps(value, default=str).encode('utf-8'))
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._entries[key] = (value, size, created)
+        self._bytes += size
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Disk tier
+    # ─────────────────────────────────────────────────────────────────────
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], key + '.json')
+
+    def _disk_files(self):
+        for root, _, files in os.walk(self.disk_dir):
+            for filename in files:
+                if filename.endswith('.json'):
+                    path = os.path.join(root, filename)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _disk_read(self, key: str) -> Optional[Dict]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+            if self._expired(record['created']):
+                return None
+            os.utime(path)  # Refresh mtime so disk eviction is LRU
+            return record
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _disk_write(self, key: str, value: Any, created: float) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            payload = json.dumps({'created': created, 'value': value}, default=str).encode('utf-8')
+            # A temp file per write: concurrent writers of one key must not share it
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix='.tmp', delete=False) as f:
+                f.write(payload)
+            try:
+                with self._lock:
+                    previous = os.path.getsize(path) if os.path.exists(path) else 0
+                    os.replace(f.name, path)
+                    self._disk_bytes += len(payload) - previous  # An overwrite replaces the old entry's bytes
+            except OSError:
+                os.remove(f.name)
+                raise
+            self._disk_evict()
+        except OSError:
+            pass
+
+    def _disk_evict(self) -> None:
+        if self.disk_max_bytes is None or self._disk_bytes <= self.disk_max_bytes:
+            return
+        files = sorted(self._disk_files(), key=lambda item: item[2])
+        total = sum(size for _, size, _ in files)
+        for path, size, _ in files:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
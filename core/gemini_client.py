@@ -0,0 +1,185 @@
+"""
+Process-wide Gemini client with keep-alive connection pooling.
+
+A single genai.Client is created lazily and reused by every Streamlit session
+and batch entry point, so scans skip client construction and TCP/TLS setup.
+A semaphore caps the number of requests in flight at once.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+from config.settings import (
+    GEMINI_API_KEY,
+    GEMINI_BASE_URL,
+    GEMINI_MODEL,
+    GEMINI_CONFIG,
+    GEMINI_HTTP_CONFIG
+)
+from .metrics import get_metrics, inc, span
+from .resources import get_resources
+
+GEMINI_CLIENT_RESOURCE = 'gemini_client'
+
+_inflight = threading.BoundedSemaphore(GEMINI_HTTP_CONFIG['max_concurrent_requests'])
+
+
+def get_gemini_client():
+    """
+    Return the shared Gemini client, creating it on first use.
+
+    Returns:
+        google.genai.Client instance
+
+    Raises:
+        Exception: The error from building the client, if that failed
+    """
+    client = get_resources().get(GEMINI_CLIENT_RESOURCE, _create_client)
+    if client is None:
+        raise get_resources().error(GEMINI_CLIENT_RESOURCE)
+    return client
+
+
+def reset_gemini_client() -> None:
+    """
+    Close and drop the shared client (e.g. after the API key changes).
+    """
+    get_resources().drop(GEMINI_CLIENT_RESOURCE)
+
+
+def generate_content(contents: str, config: Optional[Dict[str, Any]] = None, model: str = GEMINI_MODEL,
+                     timeout_seconds: Optional[float] = None, client=None):
+    """
+    Call models.generate_content on the shared client under the in-flight cap.
+
+    Args:
+        contents: Prompt text
+        config: Generation config (defaults to GEMINI_CONFIG)
+        model: Model name
+        timeout_seconds: Time budget for this request, waiting for a slot
+            included (defaults to the client's HTTP timeout)
+        client: genai.Client to use instead of the shared one
+
+    Returns:
+        GenerateContentResponse
+
+    Raises:
+        TimeoutError: If no request slot frees up within the time budget
+    """
+    timeout_seconds = _acquire_slot(timeout_seconds)
+    try:
+        with span('gemini.request'):
+            response = (client or get_gemini_client()).models.generate_content(
+                model=model,
+                contents=contents,
+                config=_with_timeout(config if config is not None else GEMINI_CONFIG, timeout_seconds)
+            )
+        _count_tokens(response.usage_metadata)
+        return response
+    finally:
+        _inflight.release()
+
+
+def generate_content_stream(contents: str, config: Optional[Dict[str, Any]] = None,
+                            model: str = GEMINI_MODEL, timeout_seconds: Optional[float] = None,
+                            client=None) -> Iterator[str]:
+    """
+    Stream a generation on the shared client, yielding text deltas.
+
+    The in-flight slot is held until the stream is exhausted or closed.
+
+    Args:
+        contents: Prompt text
+        config: Generation config (defaults to GEMINI_CONFIG)
+        model: Model name
+        timeout_seconds: Time budget for this request, waiting for a slot
+            included (defaults to the client's HTTP timeout)
+        client: genai.Client to use instead of the shared one
+
+    Yields:
+        Text fragments in arrival order
+
+    Raises:
+        TimeoutError: If no request slot frees up within the time budget
+    """
+    timeout_seconds = _acquire_slot(timeout_seconds)
+    start = time.perf_counter()
+    usage = None
+    try:
+        stream = (client or get_gemini_client()).models.generate_content_stream(
+            model=model,
+            contents=contents,
+            config=_with_timeout(config if config is not None else GEMINI_CONFIG, timeout_seconds)
+        )
+        for i, chunk in enumerate(stream):
+            if i == 0:
+                get_metrics().observe('gemini.first_chunk', time.perf_counter() - start)
+            usage = chunk.usage_metadata or usage
+            if chunk.text:
+                yield chunk.text
+        get_metrics().observe('gemini.stream', time.perf_counter() - start)
+        _count_tokens(usage)
+    finally:
+        _inflight.release()
+
+
+def _acquire_slot(timeout_seconds: Optional[float]) -> Optional[float]:
+    """
+    Take an in-flight slot within the request's time budget.
+
+    The wait counts against the budget (the caller's attempt deadline), so
+    a queued request cannot outlive it.
+
+    Returns:
+        HTTP timeout left for the request itself (None: the client's default)
+    """
+    start = time.monotonic()
+    budget = timeout_seconds if timeout_seconds is not None else GEMINI_HTTP_CONFIG['timeout_seconds']
+    if not _inflight.acquire(timeout=max(0.0, budget)):
+        raise TimeoutError("Too many Gemini requests in flight")
+    if timeout_seconds is None:
+        return None
+    return max(0.0, timeout_seconds - (time.monotonic() - start))
+
+
+def _count_tokens(usage) -> None:
+    """
+    Add a response's usage metadata to the token counters.
+    """
+    if usage is None:
+        return
+    inc('gemini_tokens_total', usage.prompt_token_count or 0, kind='prompt')
+    inc('gemini_tokens_total', usage.candidates_token_count or 0, kind='output')
+
+
+def _with_timeout(config: Dict[str, Any], timeout_seconds: Optional[float]) -> Dict[str, Any]:
+    """
+    Attach a per-request HTTP timeout to a generation config dict.
+    """
+    if timeout_seconds is None:
+        return config
+    return dict(config, http_options={'timeout': max(1, int(timeout_seconds * 1000))})
+
+
+def _create_client():
+    """
+    Build a genai.Client backed by a pooled, keep-alive httpx client.
+    """
+    import httpx
+    from google import genai
+    from google.genai import types
+
+    http_options = types.HttpOptions(
+        timeout=int(GEMINI_HTTP_CONFIG['timeout_seconds'] * 1000),
+        client_args={
+            'limits': httpx.Limits(
+                max_connections=GEMINI_HTTP_CONFIG['max_connections'],
+                max_keepalive_connections=GEMINI_HTTP_CONFIG['max_keepalive_connections'],
+                keepalive_expiry=GEMINI_HTTP_CONFIG['keepalive_expiry_seconds']
+            )
+        }
+    )
+    if GEMINI_BASE_URL:
+        http_options.base_url = GEMINI_BASE_URL
+
+    return genai.Client(api_key=GEMINI_API_KEY, http_options=http_options)
@@ -0,0 +1,427 @@
+"""
+Persistent scan history in SQLite, shared by every session in the process.
+
+Each completed scan is stored with its image hash, OCR text, text
+fingerprint, normalized profile hash, result JSON, model / prompt version and
+per-stage timings, so a result can be reopened without OCR or Gemini:
+
+- Analyze on a photo scanned before (same pixels and profile) finds it by
+  image hash;
+- a new photo whose OCR text normalizes to a scanned label finds it by text
+  fingerprint;
+- the sidebar lists the past scans of the current user (an owner key, one
+  per app session) with the current profile.
+
+Reuse by image or text is shared by every user with the same profile; the
+listing and clearing are scoped to the owner, so users never see or delete
+each other's scans.
+
+Only entries from the current model and prompt version are reused. Writes
+are queued and committed in batches by a background thread, so recording a
+scan never waits for the disk; entries still queued are visible to lookups.
+"""
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+from PIL import Image
+
+from config.settings import DEMO_MODE, GEMINI_MODEL, SCAN_HISTORY
+from .ai_analyzer import (
+    PROMPT_VERSION,
+    SOURCE_DEMO,
+    SOURCE_GEMINI,
+    SOURCE_LOCAL,
+    normalize_label_text,
+    normalize_profile
+)
+from .cache import make_cache_key
+from .metrics import get_metrics
+from .resources import get_resources
+
+logger = logging.getLogger(__name__)
+
+SCAN_HISTORY_RESOURCE = 'scan_history'
+
+# Results worth reopening (rule fallbacks and errors are retried instead)
+HISTORY_SOURCES = (SOURCE_GEMINI, SOURCE_LOCAL, SOURCE_DEMO)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created REAL NOT NULL,
+    image_hash TEXT,
+    text_fingerprint TEXT NOT NULL,
+    profile_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    ocr_text TEXT NOT NULL,
+    result_json TEXT NOT NULL,
+    timings_json TEXT NOT NULL,
+    owner TEXT NOT NULL DEFAULT ''
+);
+"""
+# After the owner column is added to databases created without it
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS scans_by_image ON scans (image_hash, profile_hash, created);
+CREATE INDEX IF NOT EXISTS scans_by_text ON scans (text_fingerprint, profile_hash, created);
+CREATE INDEX IF NOT EXISTS scans_by_owner ON scans (owner, profile_hash, created);
+"""
+_COLUMNS = ('created', 'image_hash', 'text_fingerprint', 'profile_hash', 'model', 'prompt_version',
+            'ocr_text', 'result_json', 'timings_json', 'owner')
+
+
+def image_hash(image: Union[bytes, Image.Image, np.ndarray]) -> str:
+    """
+    Content hash of a photo: its encoded file bytes as uploaded (no decode
+    needed), or its pixels before preprocessing.
+    """
+    if isinstance(image, bytes):
+        return make_cache_key(image)
+    if isinstance(image, Image.Image):
+        return make_cache_key(image.tobytes(), image.size, image.mode)
+    array = np.ascontiguousarray(image)
+    return make_cache_key(array.tobytes(), array.shape, str(array.dtype))
+
+
+def text_fingerprint(scanned_text: str) -> str:
+    """
+    Hash of the OCR text with case and whitespace differences collapsed.
+    """
+    return make_cache_key(normalize_label_text(scanned_text))
+
+
+def profile_hash(user_profile: Dict[str, str]) -> str:
+    """
+    Hash of the normalized profile; the profile itself is never stored.
+    """
+    return make_cache_key(normalize_profile(user_profile))
+
+
+def current_model() -> str:
+    """
+    Model whose results may be reused (demo rules when no API key is set).
+    """
+    return SOURCE_DEMO if DEMO_MODE else GEMINI_MODEL
+
+
+@dataclass
+class HistoryEntry:
+    """
+    One recorded scan.
+    """
+    image_hash: Optional[str]
+    text_fingerprint: str
+    profile_hash: str
+    ocr_text: str
+    result: Dict[str, Any]
+    timings: Dict[str, float] = field(default_factory=dict)
+    owner: str = ''  # User / app session that scanned it (listing and clearing only)
+    model: str = GEMINI_MODEL
+    prompt_version: str = PROMPT_VERSION
+    created: float = field(default_factory=time.time)
+    id: Optional[int] = None  # Set once written
+
+    @classmethod
+    def for_scan(cls, image_digest: Optional[str], user_profile: Dict[str, str], scanned_text: str,
+                 result: Dict[str, Any], timings: Optional[Dict[str, float]] = None,
+                 owner: str = '') -> 'HistoryEntry':
+        return cls(
+            image_hash=image_digest,
+            text_fingerprint=text_fingerprint(scanned_text),
+            profile_hash=profile_hash(user_profile),
+            ocr_text=scanned_text,
+            result={key: value for key, value in result.items() if key != 'from_history'},
+            timings=dict(timings or {}),
+            owner=owner,
+            model=SOURCE_DEMO if result.get('source') == SOURCE_DEMO else GEMINI_MODEL
+        )
+
+    @property
+    def status(self) -> str:
+        return self.result.get('status', 'CAUTION')
+
+    @property
+    def summary(self) -> str:
+        return self.result.get('summary', '')
+
+    def reopened_result(self) -> Dict[str, Any]:
+        """
+        Copy of the result, its "from_history" key set to when it was scanned.
+        """
+        return dict(self.result, from_history=self.created)
+
+    def _row(self):
+        return (self.created, self.image_hash, self.text_fingerprint, self.profile_hash, self.model,
+                self.prompt_version, self.ocr_text, json.dumps(self.result), json.dumps(self.timings), self.owner)
+
+    @classmethod
+    def _from_row(cls, row) -> 'HistoryEntry':
+        return cls(
+            id=row['id'],
+            created=row['created'],
+            image_hash=row['image_hash'],
+            text_fingerprint=row['text_fingerprint'],
+            profile_hash=row['profile_hash'],
+            model=row['model'],
+            prompt_version=row['prompt_version'],
+            ocr_text=row['ocr_text'],
+            result=json.loads(row['result_json']),
+            timings=json.loads(row['timings_json']),
+            owner=row['owner']
+        )
+
+
+class ScanHistory:
+    """
+    SQLite-backed history with batched background writes.
+
+    Args:
+        path: Database file (created with its directory if missing)
+        batch_size: Most rows committed in one transaction
+        flush_interval_seconds: Longest a recorded scan waits to be written
+        max_pending: Scans queued beyond this are dropped
+        reuse_max_age_days: Older entries are listed but not reused by lookups
+    """
+
+    def __init__(self, path: str, batch_size: int = 32, flush_interval_seconds: float = 1.0,
+                 max_pending: int = 1000, reuse_max_age_days: float = 30.0):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self.reuse_max_age_seconds = reuse_max_age_days * 86400
+        self._cond = threading.Condition()
+        self._pending: List[HistoryEntry] = []  # Oldest first; includes the batch being written
+        self._closed = False
+        self._local = threading.local()
+        self._counts = {'recorded': 0, 'written': 0, 'dropped': 0, 'write_errors': 0, 'hits': 0, 'misses': 0}
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+            if 'owner' not in {row['name'] for row in conn.execute("PRAGMA table_info(scans)")}:
+                conn.execute("ALTER TABLE scans ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+            conn.executescript(_INDEXES)
+        self._writer = threading.Thread(target=self._run, name='scan-history-writer', daemon=True)
+        self._writer.start()
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # Writes
+    # ═══════════════════════════════════════════════════════════════════════
+    def record(self, entry: HistoryEntry) -> bool:
+        """
+        Queue a scan for writing (returns at once).
+
+        Returns:
+            False if the queue was full or the history is closed (not recorded)
+        """
+        with self._cond:
+            if self._closed or len(self._pending) >= self.max_pending:
+                self._counts['dropped'] += 1
+                return False
+            self._pending.append(entry)
+            self._counts['recorded'] += 1
+            self._cond.notify_all()
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Wait until every queued scan is written.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self) -> None:
+        """
+        Write what is queued and stop the writer.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join(timeout=10)
+
+    def clear(self, user_profile: Dict[str, str], owner: str) -> int:
+        """
+        Delete one owner's entries for one profile (queued ones included);
+        other users' and profiles' stay.
+
+        Returns:
+            Number of stored entries deleted
+        """
+        self.flush()
+        with self._connection() as conn:
+            return conn.execute("DELETE FROM scans WHERE owner = ? AND profile_hash = ?",
+                                (owner, profile_hash(user_profile))).rowcount
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and not self._pending:
+                    self._cond.wait()
+                # Gather a batch for up to flush_interval_seconds
+                deadline = time.monotonic() + self.flush_interval_seconds
+                while not self._closed and len(self._pending) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if not self._pending:
+                    return
+                batch = self._pending[:self.batch_size]
+            self._write(batch)
+            with self._cond:
+                del self._pending[:len(batch)]
+                self._cond.notify_all()
+
+    def _write(self, batch: List[HistoryEntry]) -> None:
+        start = time.perf_counter()
+        try:
+            with self._connection() as conn:
+                for entry in batch:
+                    entry.id = conn.execute(
+                        f"INSERT INTO scans ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                        entry._row()
+                    ).lastrowid
+        except sqlite3.Error as e:
+            logger.warning("Could not write %d scans to the history: %s", len(batch), e)
+            with self._cond:
+                self._counts['write_errors'] += 1
+            return
+        with self._cond:
+            self._counts['written'] += len(batch)
+        get_metrics().observe('history.write', time.perf_counter() - start)
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # Lookups
+    # ═══════════════════════════════════════════════════════════════════════
+    def find_by_image(self, image_digest: str, user_profile: Dict[str, str]) -> Optional[HistoryEntry]:
+        """
+        Newest reusable entry for this photo and profile.
+        """
+        return self._find('image_hash', image_digest, profile_hash(user_profile))
+
+    def find_by_text(self, scanned_text: str, user_profile: Dict[str, str]) -> Optional[HistoryEntry]:
+        """
+        Newest reusable entry for this label text and profile.
+        """
+        return self._find('text_fingerprint', text_fingerprint(scanned_text), profile_hash(user_profile))
+
+    def recent(self, user_profile: Dict[str, str], owner: str, limit: int = 20) -> List[HistoryEntry]:
+        """
+        Latest entries of this owner for this profile, newest first (any model or age).
+        """
+        digest = profile_hash(user_profile)
+        with self._cond:
+            queued = [entry for entry in reversed(self._pending)
+                      if entry.owner == owner and entry.profile_hash == digest][:limit]
+        queued_ids = {entry.id for entry in queued if entry.id is not None}
+        rows = self._query("SELECT * FROM scans WHERE owner = ? AND profile_hash = ? ORDER BY created DESC LIMIT ?",
+                           (owner, digest, limit))
+        stored = [entry for entry in map(HistoryEntry._from_row, rows) if entry.id not in queued_ids]
+        return sorted(queued + stored, key=lambda entry: entry.created, reverse=True)[:limit]
+
+    def get(self, entry_id: int) -> Optional[HistoryEntry]:
+        rows = self._query("SELECT * FROM scans WHERE id = ?", (entry_id,))
+        return HistoryEntry._from_row(rows[0]) if rows else None
+
+    def _find(self, column: str, value: str, digest: str) -> Optional[HistoryEntry]:
+        model, oldest = current_model(), time.time() - self.reuse_max_age_seconds
+        with self._cond:
+            for entry in reversed(self._pending):
+                if (getattr(entry, column) == value and entry.profile_hash == digest and entry.model == model
+                        and entry.prompt_version == PROMPT_VERSION):
+                    self._counts['hits'] += 1
+                    return entry
+        rows = self._query(
+            f"SELECT * FROM scans WHERE {column} = ? AND profile_hash = ? AND model = ? AND prompt_version = ? "
+            f"AND created >= ? ORDER BY created DESC LIMIT 1",
+            (value, digest, model, PROMPT_VERSION, oldest)
+        )
+        with self._cond:
+            self._counts['hits' if rows else 'misses'] += 1
+        return HistoryEntry._from_row(rows[0]) if rows else None
+
+    def _query(self, sql: str, params) -> List[sqlite3.Row]:
+        try:
+            return self._connection().execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logger.warning("Scan history lookup failed: %s", e)
+            return []
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        This thread's connection (sqlite3 connections are not shared across threads).
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # Stats
+    # ═══════════════════════════════════════════════════════════════════════
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return dict(self._counts, pending=len(self._pending), path=self.path)
+
+    def metric_samples(self):
+        stats = self.stats()
+        samples = [(f'history_{key}_total', 'counter', {}, stats[key])
+                   for key in ('recorded', 'written', 'dropped', 'write_errors')]
+        samples.append(('history_lookups_total', 'counter', {'outcome': 'hit'}, stats['hits']))
+        samples.append(('history_lookups_total', 'counter', {'outcome': 'miss'}, stats['misses']))
+        samples.append(('history_pending', 'gauge', {}, stats['pending']))
+        return samples
+
+
+def _create_history() -> ScanHistory:
+    history = ScanHistory(
+        SCAN_HISTORY['path'],
+        batch_size=SCAN_HISTORY['batch_size'],
+        flush_interval_seconds=SCAN_HISTORY['flush_interval_seconds'],
+        max_pending=SCAN_HISTORY['max_pending'],
+        reuse_max_age_days=SCAN_HISTORY['reuse_max_age_days']
+    )
+    # Daemon writer: write what is still queued when the process exits
+    atexit.register(history.close)
+    logger.info("Scan history at %s", os.path.abspath(SCAN_HISTORY['path']))
+    return history
+
+
+def get_scan_history() -> Optional[ScanHistory]:
+    """
+    The process-wide history, or None if disabled (empty SCAN_HISTORY_PATH) or unusable.
+    """
+    if not SCAN_HISTORY['path']:
+        return None
+    return get_resources().get(SCAN_HISTORY_RESOURCE, _create_history)
+
+
+def _metric_samples():
+    history = get_resources().peek(SCAN_HISTORY_RESOURCE)
+    return history.metric_samples() if history is not None else []
+
+
+get_metrics().register_collector(_metric_samples)
@@ -0,0 +1,183 @@
+"""
+Image normalization applied before OCR.
+
+Phone photos arrive at 12MP+ with arbitrary EXIF orientation. EasyOCR's
+CRAFT detector cost grows with pixel count, so labels are decoded at reduced
+size, rotated upright, downscaled, converted to grayscale and contrast
+stretched before they reach reader.readtext. With a quality gate config the
+frame is also scored (before contrast stretching, which would hide bad
+exposure) and rejected with ImageQualityError.
+"""
+
+import math
+import time
+import numpy as np
+from PIL import Image, ImageOps
+from typing import Dict, Optional, Tuple, Union
+from config.settings import OCR_PREPROCESS_CONFIG
+from .image_quality import ImageQualityError, assess_quality
+
+
+def preprocess_image(
+    image_data: Union[Image.Image, np.ndarray],
+    config: Dict = None,
+    quality_gate: Optional[Dict] = None
+) -> Tuple[np.ndarray, Dict[str, float]]:
+    """
+    Run the pre-OCR normalization pipeline.
+
+    Args:
+        image_data: PIL Image or numpy array
+        config: Preprocessing parameters (defaults to OCR_PREPROCESS_CONFIG)
+        quality_gate: Quality thresholds (see OCR_QUALITY_GATE); None skips the check
+
+    Returns:
+        Tuple of (normalized numpy array, per-stage timings in milliseconds)
+
+    Raises:
+        ImageQualityError: The frame failed the quality gate
+    """
+    config = config or OCR_PREPROCESS_CONFIG
+    timings = {}
+
+    def _timed(stage, func, *args):
+        return _timed_stage(timings, stage, func, *args)
+
+    image = reduce_image(image_data, config, timings)
+
+    if quality_gate is not None:
+        report = _timed('quality', assess_quality, image, quality_gate)
+        if not report.ok:
+            raise ImageQualityError(report)
+
+    if config.get('contrast_cutoff') is not None:
+        image = _timed('contrast', _normalize_contrast, image, config['contrast_cutoff'])
+
+    if config.get('deskew', False):
+        image = _timed(
+            'deskew', _deskew, image,
+            config.get('deskew_max_angle', 10.0),
+            config.get('deskew_step', 1.0)
+        )
+
+    img_array = _timed('to_array', np.asarray, image)
+    return img_array, timings
+
+
+def reduce_image(
+    image_data: Union[Image.Image, np.ndarray],
+    config: Dict = None,
+    timings: Optional[Dict[str, float]] = None
+) -> Image.Image:
+    """
+    The size-reducing first half of preprocess_image: decode, rotate upright,
+    downscale and convert to grayscale.
+
+    Running preprocess_image on the result gives the same output as on the
+    original, so callers can shrink an image before sending it elsewhere.
+
+    Args:
+        image_data: PIL Image or numpy array
+        config: Preprocessing parameters (defaults to OCR_PREPROCESS_CONFIG)
+        timings: Dict to add per-stage milliseconds to
+
+    Returns:
+        PIL Image
+    """
+    config = config or OCR_PREPROCESS_CONFIG
+    timings = timings if timings is not None else {}
+    if isinstance(image_data, np.ndarray):
+        image = Image.fromarray(image_data)
+    else:
+        image = image_data
+
+    max_long_edge = config.get('max_long_edge')
+    grayscale = config.get('grayscale', True)
+
+    image = _timed_stage(timings, 'decode', _decode_reduced, image, max_long_edge, grayscale)
+    image = _timed_stage(timings, 'exif_rotate', ImageOps.exif_transpose, image)
+
+    if max_long_edge:
+        image = _timed_stage(timings, 'downscale', _downscale, image, max_long_edge)
+
+    if grayscale:
+        image = _timed_stage(timings, 'grayscale', image.convert, 'L')
+    elif image.mode not in ('RGB', 'L'):
+        image = _timed_stage(timings, 'grayscale', image.convert, 'RGB')
+    return image
+
+
+def _timed_stage(timings: Dict[str, float], stage: str, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    timings[stage] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def _decode_reduced(image: Image.Image, max_long_edge: int, grayscale: bool) -> Image.Image:
+    """
+    Ask the JPEG decoder for a reduced-size decode (DCT scaling).
+
+    Only has an effect on images that have not been loaded yet; the decoder
+    never goes below the requested size, so downscale still runs after it.
+    """
+    if max_long_edge and max(image.size) > max_long_edge:
+        scale = max_long_edge / max(image.size)
+        requested = (math.ceil(image.width * scale), math.ceil(image.height * scale))
+        try:
+            image.draft('L' if grayscale else 'RGB', requested)
+        except (AttributeError, ValueError, OSError):
+            pass
+    image.load()
+    return image
+
+
+def _downscale(image: Image.Image, max_long_edge: int) -> Image.Image:
+    """
+    Shrink the image so its longest side is at most max_long_edge pixels.
+    """
+    long_edge = max(image.size)
+    if long_edge <= max_long_edge:
+        return image
+
+    scale = max_long_edge / long_edge
+    new_size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(new_size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+
+
+def _normalize_contrast(image: Image.Image, cutoff: float) -> Image.Image:
+    """
+    Stretch the histogram so faint print on glossy packaging becomes legible.
+    """
+    if image.mode not in ('L', 'RGB'):
+        image = image.convert('RGB')
+    return ImageOps.autocontrast(image, cutoff=cutoff)
+
+
+def _deskew(image: Image.Image, max_angle: float, step: float) -> Image.Image:
+    """
+    Correct small rotations using a projection-profile search.
+
+    Candidate angles are scored on a small binarized thumbnail: text lines that
+    are level produce sharply alternating row sums.
+    """
+    thumb = image.convert('L')
+    thumb.thumbnail((400, 400))
+    ink = np.asarray(thumb) < 128
+    thumb = Image.fromarray((ink * 255).astype(np.uint8))
+
+    best_angle, best_score = 0.0, -1.0
+    steps = int(max_angle / step)
+    for i in range(-steps, steps + 1):
+        angle = i * step
+        rotated = np.asarray(thumb.rotate(angle, resample=Image.Resampling.NEAREST))
+        profile = rotated.sum(axis=1, dtype=np.float64)
+        score = float(np.sum(np.diff(profile) ** 2))
+        if score > best_score:
+            best_angle, best_score = angle, score
+
+    if best_angle == 0.0:
+        return image
+
+    fill = 255 if image.mode == 'L' else (255, 255, 255)
+    return image.rotate(best_angle, resample=Image.Resampling.BILINEAR, expand=True, fillcolor=fill)
@@ -0,0 +1,228 @@
+"""
+Fast quality gate for captured frames, run before OCR.
+
+A motion-blurred, dark or washed-out photo costs a full OCR pass and still
+ends in "Could not read text from image clearly". assess_quality scores a
+small grayscale copy of the frame (a few milliseconds of NumPy) and names
+what is wrong, so the user can retake the photo right away:
+
+    blurry        variance of the Laplacian, normalized by the frame's
+                  contrast so dim but sharp photos are not called blurry
+    dark          even the brightest pixels are dark (95th percentile)
+    overexposed   almost nothing is dark (1st percentile), e.g. glare
+    low_contrast  the 1st-99th percentile range is too narrow
+    no_text       too few tiles contain edges (label far away or cropped out)
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from config.settings import OCR_QUALITY_GATE
+from .metrics import inc
+
+logger = logging.getLogger(__name__)
+
+# run_ocr's marker for rejected frames: "[Photo rejected: blurry, dark]"
+REJECTED_PREFIX = "[Photo rejected: "
+
+FEEDBACK = {
+    'blurry': ("The photo is blurry",
+               "Hold the phone steady (or rest it on something) and tap the label to focus."),
+    'dark': ("The photo is too dark",
+             "Move to better light or turn on a lamp."),
+    'overexposed': ("The photo is washed out",
+                    "Avoid direct light or flash glare on the package; tilt it slightly."),
+    'low_contrast': ("The print is barely visible",
+                     "Light the label evenly and avoid shadows or reflections."),
+    'no_text': ("Little or no text is visible",
+                "Move closer so the ingredient or Drug Facts panel fills most of the frame.")
+}
+
+
+@dataclass
+class QualityReport:
+    """
+    Scores for one frame and the problems found.
+    """
+    blur_score: float
+    p1: float
+    p95: float
+    p99: float
+    text_area: float           # Fraction of tiles with edges
+    problems: List[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+    def to_dict(self) -> Dict:
+        return {
+            'ok': self.ok,
+            'problems': list(self.problems),
+            'blur_score': round(self.blur_score, 1),
+            'p1': self.p1,
+            'p95': self.p95,
+            'p99': self.p99,
+            'text_area': round(self.text_area, 3),
+            'elapsed_ms': round(self.elapsed_ms, 2)
+        }
+
+
+class ImageQualityError(ValueError):
+    """
+    Raised by preprocess_image when a frame fails the quality gate.
+    """
+
+    def __init__(self, report: QualityReport):
+        super().__init__(', '.join(report.problems))
+        self.report = report
+
+
+def assess_quality(image: Union[Image.Image, np.ndarray], config: Optional[Dict] = None) -> QualityReport:
+    """
+    Score a frame's sharpness, exposure and visible text area.
+
+    Args:
+        image: Grayscale (or RGB) PIL Image or numpy array, before contrast stretching
+        config: Thresholds (defaults to OCR_QUALITY_GATE)
+
+    Returns:
+        QualityReport; report.problems is empty for a usable frame
+    """
+    config = config or OCR_QUALITY_GATE
+    start = time.perf_counter()
+    gray = _small_gray(image, config['analysis_long_edge'])
+
+    p1, p95, p99 = (float(value) for value in np.percentile(gray, (1, 95, 99)))
+    spread = max(p99 - p1, 1.0)
+
+    # 4-neighbour Laplacian; scaled as if the frame spanned the full 0-255 range
+    laplacian = (gray[1:-1, :-2] + gray[1:-1, 2:] + gray[:-2, 1:-1] + gray[2:, 1:-1]
+                 - 4 * gray[1:-1, 1:-1])
+    blur_score = float(laplacian.var()) * (255.0 / spread) ** 2 if laplacian.size else 0.0
+
+    # Text area: share of tiles whose strongest edge stands out from the frame's range
+    tile = config['tile_size']
+    edges = np.abs(np.diff(gray, axis=1))[:-1, :] + np.abs(np.diff(gray, axis=0))[:, :-1]
+    rows, cols = edges.shape[0] // tile, edges.shape[1] // tile
+    if rows and cols:
+        tiles = edges[:rows * tile, :cols * tile].reshape(rows, tile, cols, tile).max(axis=(1, 3))
+        text_area = float(np.mean(tiles > config['edge_fraction'] * spread))
+    else:
+        text_area = 0.0
+
+    # Smeared ink also lifts the darkest pixels, so a blurry frame is not called washed out
+    blurry = spread >= config['min_spread'] and blur_score < config['min_blur_score']
+    problems = []
+    if p95 < config['min_p95']:
+        problems.append('dark')
+    elif spread < config['min_spread']:
+        problems.append('low_contrast')
+    elif p1 > config['max_p1'] and not blurry:
+        problems.append('overexposed')
+    if blurry:
+        problems.append('blurry')
+    if text_area < config['min_text_area']:
+        problems.append('no_text')
+    return QualityReport(blur_score, p1, p95, p99, text_area, problems,
+                         (time.perf_counter() - start) * 1000)
+
+
+def rejection_text(report: QualityReport) -> str:
+    """
+    run_ocr's "[Photo rejected: ...]" marker for a failed report.
+    """
+    return f"{REJECTED_PREFIX}{', '.join(report.problems)}]"
+
+
+def rejection_feedback(ocr_text: Optional[str]) -> Optional[List[Tuple[str, str]]]:
+    """
+    (problem, advice) pairs for a "[Photo rejected: ...]" marker, else None.
+    """
+    if not ocr_text or not ocr_text.startswith(REJECTED_PREFIX):
+        return None
+    problems = ocr_text[len(REJECTED_PREFIX):].rstrip(']').split(', ')
+    return [FEEDBACK[problem] for problem in problems if problem in FEEDBACK]
+
+
+def _small_gray(image: Union[Image.Image, np.ndarray], long_edge: int) -> np.ndarray:
+    """
+    float32 grayscale copy with its long edge at most long_edge (box-filtered).
+    """
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    if image.mode != 'L':
+        image = image.convert('L')
+    factor = -(-max(image.size) // long_edge)
+    if factor > 1:
+        image = image.reduce(factor)
+    return np.asarray(image, dtype=np.float32)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Savings accounting
+# ═══════════════════════════════════════════════════════════════════════════
+class QualityStats:
+    """
+    Rejections and the OCR CPU time they avoided.
+
+    The saving per rejected frame is the mean CPU time of the OCR passes this
+    process has run (OCR_QUALITY_GATE['default_ocr_cpu_seconds'] before the first).
+    """
+
+    def __init__(self, default_ocr_cpu_seconds: float):
+        self._lock = threading.Lock()
+        self.default_ocr_cpu_seconds = default_ocr_cpu_seconds
+        self.ocr_runs = 0
+        self.ocr_cpu_seconds = 0.0
+        self.rejected = 0
+        self.cpu_seconds_saved = 0.0
+
+    def record_ocr(self, cpu_seconds: float) -> None:
+        with self._lock:
+            self.ocr_runs += 1
+            self.ocr_cpu_seconds += cpu_seconds
+
+    def record_rejection(self, report: QualityReport) -> float:
+        """
+        Count a rejected frame.
+
+        Returns:
+            Estimated OCR CPU seconds saved
+        """
+        with self._lock:
+            saved = self.ocr_cpu_seconds / self.ocr_runs if self.ocr_runs else self.default_ocr_cpu_seconds
+            self.rejected += 1
+            self.cpu_seconds_saved += saved
+            total = self.cpu_seconds_saved
+        for problem in report.problems:
+            inc('ocr_quality_rejected_total', reason=problem)
+        inc('ocr_quality_cpu_seconds_saved_total', saved)
+        logger.info("Rejected frame before OCR (%s, checked in %.1f ms); saved ~%.2f CPU s, %.1f s in total",
+                    ', '.join(report.problems), report.elapsed_ms, saved, total)
+        return saved
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'ocr_runs': self.ocr_runs,
+                'rejected': self.rejected,
+                'cpu_seconds_saved': self.cpu_seconds_saved
+            }
+
+
+_stats = QualityStats(OCR_QUALITY_GATE['default_ocr_cpu_seconds'])
+
+
+def get_quality_stats() -> QualityStats:
+    """
+    Return the process-wide quality gate statistics.
+    """
+    return _stats
@@ -0,0 +1,112 @@
+"""
+Incremental / tolerant JSON parsing for streamed LLM output.
+
+parse_partial_json turns any prefix of a JSON document (optionally wrapped in
+markdown code fences) into the largest valid value it can: open strings are
+closed, dangling keys and commas are dropped and open containers are closed.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+_CLOSERS = {'{': '}', '[': ']'}
+
+
+def strip_code_fences(text: str) -> str:
+    """
+    Remove a leading ```/```json fence and a trailing ``` fence, if present.
+    """
+    text = text.strip()
+    if text.startswith('```'):
+        newline = text.find('\n')
+        text = text[newline + 1:] if newline != -1 else ''
+    if text.rstrip().endswith('```'):
+        text = text.rstrip()[:-3]
+    return text
+
+
+def parse_partial_json(text: str) -> Optional[Any]:
+    """
+    Parse a possibly truncated JSON document.
+
+    Args:
+        text: Raw model output received so far
+
+    Returns:
+        Parsed value, or None if nothing usable has arrived yet
+    """
+    text = strip_code_fences(text)
+    start = min((i for i in (text.find('{'), text.find('[')) if i != -1), default=-1)
+    if start == -1:
+        return None
+    text = text[start:]
+
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+
+    stack, in_string, escaped, snapshots = _scan(text)
+
+    # First try: keep everything, closing a dangling string
+    candidate = text
+    if in_string:
+        if escaped:
+            candidate = candidate[:-1]
+        candidate += '"'
+    parsed = _try_close(candidate, stack)
+    if parsed is not None:
+        return parsed
+
+    # Otherwise back off to the most recent structurally safe point
+    for position, snapshot_stack in reversed(snapshots):
+        parsed = _try_close(text[:position], snapshot_stack)
+        if parsed is not None:
+            return parsed
+    return None
+
+
+def _scan(text: str) -> Tuple[List[str], bool, bool, List[Tuple[int, List[str]]]]:
+    """
+    Walk the text tracking container nesting and string state.
+
+    Returns:
+        (open container stack, inside a string, pending escape, safe cut points)
+    """
+    stack = []
+    in_string = escaped = False
+    snapshots = []
+    for position, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+                snapshots.append((position + 1, list(stack)))
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(char)
+            snapshots.append((position + 1, list(stack)))
+        elif char in '}]':
+            if stack:
+                stack.pop()
+            snapshots.append((position + 1, list(stack)))
+        elif char == ',':
+            snapshots.append((position, list(stack)))
+    return stack, in_string, escaped, snapshots
+
+
+def _try_close(prefix: str, stack: List[str]) -> Optional[Any]:
+    prefix = prefix.rstrip().rstrip(',').rstrip()
+    if prefix.endswith(':'):
+        return None
+    closing = ''.join(_CLOSERS[opener] for opener in reversed(stack))
+    try:
+        return json.loads(prefix + closing)
+    except ValueError:
+        return None
@@ -0,0 +1,259 @@
+"""
+Local interaction / allergen / contraindication knowledge base.
+
+Loaded from config/knowledge_base.json and indexed three ways:
+prescription -> interacting ingredients, allergen -> synonyms and derivatives,
+condition -> contraindicated ingredients. analyze_safety consults it before
+calling Gemini so clear-cut DANGER cases are answered locally.
+"""
+
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from config.settings import KNOWLEDGE_BASE_PATH
+from .rule_engine import AhoCorasick, STATUS_SEVERITY
+
+# KB section -> (profile field, hit kind)
+SECTIONS = {
+    'interactions': ('prescriptions', 'interaction'),
+    'allergens': ('allergies', 'allergen'),
+    'contraindications': ('conditions', 'contraindication')
+}
+
+# Negation around a label mention: "no milk", "free of peanuts, tree nuts",
+# "does not contain aspirin" before it (same clause), "aspirin-free" after it
+_NEGATION_BEFORE_RE = re.compile(
+    r"\b(?:no|free\s+(?:of|from)|(?:does|do)\s*(?:not|n't)\s+contain|contains\s+no|without)\b[^.;:!?\n]{0,60}$",
+    re.IGNORECASE
+)
+_NEGATION_AFTER_RE = re.compile(r"\s*-?\s*free\b", re.IGNORECASE)
+
+
+@dataclass
+class KnowledgeHit:
+    """
+    A label ingredient that conflicts with one entry of the user's profile.
+    """
+    kind: str
+    entity: str
+    ingredient: str
+    severity: str
+    reason: str
+    excipient: bool
+    start: int
+    end: int
+    negated: bool = False  # Label says the product is free of it ("aspirin-free", "no milk")
+
+
+def _is_negated(text: str, start: int, end: int) -> bool:
+    """
+    Whether the mention at text[start:end] is negated ("X-free", "no X", ...).
+    """
+    return bool(_NEGATION_AFTER_RE.match(text, end) or _NEGATION_BEFORE_RE.search(text[max(0, start - 80):start]))
+
+
+@dataclass
+class TriageResult:
+    """
+    Outcome of a local knowledge base check.
+
+    decisive is True when the local answer is confident enough to skip the
+    LLM; result then holds the analysis dict to return.
+    """
+    decisive: bool
+    status: str
+    hits: List[KnowledgeHit] = field(default_factory=list)
+    result: Optional[Dict] = None
+
+
+class KnowledgeBase:
+    """
+    Indexed lookups over the local knowledge base.
+    """
+
+    def __init__(self, data: Dict):
+        self.entries = {section: data.get(section, {}) for section in SECTIONS}
+
+        # Profile entity resolution: alias automaton per profile field
+        self._alias_automata = {}
+        for section, (profile_field, _) in SECTIONS.items():
+            aliases, owners = [], []
+            for entity, entry in self.entries[section].items():
+                for alias in entry.get('aliases', [entity]):
+                    aliases.append(alias)
+                    owners.append(entity)
+            self._alias_automata[profile_field] = (AhoCorasick(aliases), owners)
+
+        # Label scanning: one automaton over every ingredient term
+        self._ingredient_terms = []
+        self._ingredient_owners = []  # term index -> [(section, entity)]
+        term_index = {}
+        for section in SECTIONS:
+            for entity, entry in self.entries[section].items():
+                for term in self._ingredients_for(section, entry):
+                    key = term.lower()
+                    if key not in term_index:
+                        term_index[key] = len(self._ingredient_terms)
+                        self._ingredient_terms.append(key)
+                        self._ingredient_owners.append([])
+                    self._ingredient_owners[term_index[key]].append((section, entity))
+        self._label_automaton = AhoCorasick(self._ingredient_terms)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'KnowledgeBase':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @staticmethod
+    def _ingredients_for(section: str, entry: Dict) -> List[str]:
+        return entry.get('synonyms' if section == 'allergens' else 'ingredients', [])
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Indexed lookups
+    # ─────────────────────────────────────────────────────────────────────
+    def interacting_ingredients(self, prescription: str) -> List[str]:
+        entry = self.entries['interactions'].get(prescription.lower(), {})
+        return list(entry.get('ingredients', []))
+
+    def allergen_synonyms(self, allergen: str) -> List[str]:
+        entry = self.entries['allergens'].get(allergen.lower(), {})
+        return list(entry.get('synonyms', []))
+
+    def contraindicated_ingredients(self, condition: str) -> List[str]:
+        entry = self.entries['contraindications'].get(condition.lower(), {})
+        return list(entry.get('ingredients', []))
+
+    def ingredient_terms(self) -> List[str]:
+        """
+        Every ingredient name the knowledge base knows about.
+        """
+        return list(self._ingredient_terms)
+
+    def resolve_profile(self, user_profile: Dict[str, str]) -> Dict[str, Set[str]]:
+        """
+        Map free-text profile fields to canonical knowledge base entities.
+
+        Returns:
+            Dict of KB section -> set of canonical entity names
+        """
+        resolved = {}
+        for section, (profile_field, _) in SECTIONS.items():
+            automaton, owners = self._alias_automata[profile_field]
+            value = user_profile.get(profile_field) or ''
+            resolved[section] = {owners[i] for _, _, i in automaton.iter_matches(value)}
+        return resolved
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Label checks
+    # ─────────────────────────────────────────────────────────────────────
+    def find_hits(self, user_profile: Dict[str, str], scanned_text: str) -> List[KnowledgeHit]:
+        """
+        Scan the label once and return every conflict with the profile.
+        """
+        resolved = self.resolve_profile(user_profile)
+        if not any(resolved.values()):
+            return []
+
+        hits = []
+        for start, end, term_index in self._label_automaton.iter_matches(scanned_text):
+            for section, entity in self._ingredient_owners[term_index]:
+                if entity not in resolved[section]:
+                    continue
+                entry = self.entries[section][entity]
+                hits.append(KnowledgeHit(
+                    kind=SECTIONS[section][1],
+                    entity=entity,
+                    ingredient=self._ingredient_terms[term_index],
+                    severity=entry.get('severity', 'DANGER'),
+                    reason=entry.get('reason', f"is a form of your {entity} allergy"),
+                    excipient=bool(entry.get('excipient', False)),
+                    start=start,
+                    end=end,
+                    negated=_is_negated(scanned_text, start, end)
+                ))
+        hits.sort(key=lambda hit: -STATUS_SEVERITY.get(hit.severity, 1))
+        return hits
+
+    def triage(self, user_profile: Dict[str, str], scanned_text: str) -> TriageResult:
+        """
+        Decide whether the local knowledge base answers this scan on its own.
+
+        Only DANGER findings from positive mentions are decisive: a CAUTION
+        finding, no finding at all, or a negated mention ("aspirin-free",
+        "contains no milk") may still hide something the KB does not cover
+        or read wrongly, so those cases go to the LLM.
+        """
+        hits = self.find_hits(user_profile, scanned_text)
+        if not hits:
+            return TriageResult(decisive=False, status='SAFE')
+
+        positive = [hit for hit in hits if not hit.negated]
+        status = positive[0].severity if positive else 'SAFE'
+        if status != 'DANGER':
+            return TriageResult(decisive=False, status=status, hits=hits)
+        return TriageResult(decisive=True, status=status, hits=hits, result=_build_result(positive))
+
+
+def _build_result(hits: List[KnowledgeHit]) -> Dict:
+    """
+    Turn knowledge base hits into an analysis result dict.
+    """
+    primary = hits[0]
+    if primary.kind == 'allergen':
+        summary = (f"⚠️ ALLERGEN DETECTED: This product contains {primary.ingredient}, "
+                   f"a form of {primary.entity}, which is in your allergy list.")
+        recommendation = f"DO NOT USE. This product contains {primary.ingredient}."
+    elif primary.kind == 'interaction':
+        summary = (f"⚠️ DRUG INTERACTION: {primary.ingredient} in this product may dangerously "
+                   f"interact with {primary.entity.title()}.")
+        recommendation = (f"AVOID this product. Consult your doctor or pharmacist before combining "
+                          f"it with {primary.entity.title()}.")
+    else:
+        summary = (f"⚠️ CONDITION CONFLICT: {primary.ingredient} in this product is a concern "
+                   f"with {primary.entity}.")
+        recommendation = "DO NOT USE without first checking with your doctor or pharmacist."
+
+    details, seen = [], set()
+    for hit in hits:
+        line = f"'{hit.ingredient}' {hit.reason}"
+        if hit.kind != 'allergen':
+            line += f" ({hit.entity})"
+        if line not in seen:
+            seen.add(line)
+            details.append(line)
+
+    excipient = next((hit for hit in hits if hit.excipient), None)
+    return {
+        "status": "DANGER",
+        "summary": summary,
+        "details": details,
+        "recommendation": recommendation,
+        "compounding_suggested": excipient is not None,
+        "compounding_note": (
+            f"💊 A compounding pharmacist can prepare a version without {excipient.ingredient} "
+            f"using the same active ingredients." if excipient else ""
+        ),
+        "local_matches": [
+            {'kind': hit.kind, 'entity': hit.entity, 'ingredient': hit.ingredient,
+             'start': hit.start, 'end': hit.end}
+            for hit in hits
+        ]
+    }
+
+
+_knowledge_base: Optional[KnowledgeBase] = None
+_knowledge_base_lock = threading.Lock()
+
+
+def get_knowledge_base() -> KnowledgeBase:
+    """
+    Return the process-wide knowledge base loaded from KNOWLEDGE_BASE_PATH.
+    """
+    global _knowledge_base
+    if _knowledge_base is None:
+        with _knowledge_base_lock:
+            if _knowledge_base is None:
+                _knowledge_base = KnowledgeBase.from_file(KNOWLEDGE_BASE_PATH)
+    return _knowledge_base
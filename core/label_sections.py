@@ -0,0 +1,270 @@
+"""
+Label section extraction for prompt trimming.
+
+OCR of a large package returns marketing copy, addresses, lot numbers and
+barcodes alongside the parts that matter for a safety check. The label is
+split into sections at headers such as "Drug Facts", "Inactive ingredients",
+"Warnings" or "Contains"; each segment is scored by its section, by the
+ingredient names it mentions and by the user's own medications/allergies.
+The first lines of ingredient, allergen and warning sections and any line
+naming an ingredient or the user's own entries are always kept whole (even
+past the budget); the best of the remaining segments are added (in label
+order) until the token budget is met.
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from config.settings import LABEL_TEXT_TOKEN_BUDGET
+from .lexicon import LexiconMatch
+
+# Section name -> (header phrases, relevance weight)
+SECTION_HEADERS = {
+    'active_ingredients': (['active ingredients', 'active ingredient', 'medicinal ingredients'], 1.0),
+    'inactive_ingredients': (['inactive ingredients', 'other ingredients', 'non-medicinal ingredients',
+                              'excipients'], 1.0),
+    'ingredients': (['ingredients', 'ingredient list'], 1.0),
+    'contains': (['allergen information', 'allergy information', 'allergens', 'may contain',
+                  'contains'], 1.0),
+    'warnings': (['warnings', 'warning', 'do not use', 'ask a doctor', 'stop use', 'caution'], 0.9),
+    'facts': (['drug facts', 'supplement facts', 'nutrition facts'], 0.8),
+    'uses': (['uses', 'purpose', 'indications'], 0.5),
+    'directions': (['directions', 'suggested use', 'dosage'], 0.4)
+}
+UNSECTIONED_WEIGHT = 0.1
+INGREDIENT_HIT_BONUS = 0.5   # Per recognized ingredient, up to two
+PRIORITY_TERM_BONUS = 2.0    # Segment mentions the user's medication/allergy/condition
+# Segments at or above this are always kept, whole: the first SECTION_SPAN
+# lines of ingredient/allergen/warning sections and lines naming an ingredient
+# or the user's own entries
+MUST_KEEP_SCORE = 0.9
+# Sections whose noise-like lines are demoted, not dropped ("Made in a facility that also processes ...")
+MUST_KEEP_SECTIONS = {'active_ingredients', 'inactive_ingredients', 'ingredients', 'contains', 'warnings'}
+SECTION_SPAN = 4             # Segments after a header at full weight; later ones get half
+
+# Lines that are never relevant to a safety check: URLs, lot/expiry codes,
+# distributor addresses (city, ST 12345), phone and barcode numbers
+_NOISE_RE = re.compile(
+    r"(https?://|www\.|@[a-z0-9-]+\.|\.com\b|\b(?:lot|exp|upc|sku)\b[\s.:#]|"
+    r"\b(?:distributed|manufactured|made|packed) (?:by|for)\b|(?-i:\b[A-Z]{2}) \d{5}\b|\b\d{5}-\d{4}\b|"
+    r"\d{8,}|\(?\d{3}\)?[\s.-]\d{3}[\s.-]\d{4}|©|copyright)",
+    re.IGNORECASE
+)
+_CONFUSABLE = {'i': '[il1|!]', 'l': '[il1|!]', 'o': '[o0]', 's': '[s5$]', ' ': r'\s*', '-': r'[\s-]?'}
+
+
+def _tolerant(phrase: str) -> str:
+    """
+    Regex for a header phrase that tolerates common OCR character swaps.
+    """
+    return ''.join(_CONFUSABLE.get(char, re.escape(char)) for char in phrase)
+
+
+# Longest phrases first so "inactive ingredients" wins over "ingredients"
+_HEADER_PHRASES = sorted(
+    ((phrase, section) for section, (phrases, _) in SECTION_HEADERS.items() for phrase in phrases),
+    key=lambda item: -len(item[0])
+)
+_HEADER_RE = re.compile(
+    r"(?<![a-z0-9])(?:" + '|'.join(f"(?P<h{i}>{_tolerant(phrase)})"
+                                    for i, (phrase, _) in enumerate(_HEADER_PHRASES)) + r")(?![a-z0-9])",
+    re.IGNORECASE
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for Gemini (about four characters per token).
+    """
+    return math.ceil(len(text) / 4) if text else 0
+
+
+@dataclass
+class LabelSegment:
+    """
+    A run of label text belonging to one section.
+    """
+    start: int
+    end: int
+    section: str
+    position: int = 0  # Segments since the section header (0 = header line)
+    score: float = 0.0
+
+
+@dataclass
+class LabelExtract:
+    """
+    Label text selected for the prompt, with token accounting.
+    """
+    text: str
+    original_tokens: int
+    tokens: int
+    sections: List[str] = field(default_factory=list)
+    omitted_segments: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.tokens
+
+    @property
+    def trimmed(self) -> bool:
+        return self.omitted_segments > 0 or self.tokens < self.original_tokens
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            'original': self.original_tokens,
+            'sent': self.tokens,
+            'saved': self.tokens_saved
+        }
+
+
+def split_sections(text: str) -> List[LabelSegment]:
+    """
+    Split label text into segments at line breaks and section headers.
+
+    Text after a header belongs to that header's section until the next
+    header; text before the first header is unsectioned ('other'). A header
+    phrase counts when it starts a line or is followed by a colon, so
+    "Purpose" in a Drug Facts column heading or "ask a doctor" mid-sentence
+    does not open a section.
+    """
+    segments = []
+    section, position = 'other', 0
+    for line in re.finditer(r"[^\n]+", text):
+        cursor = line.start()
+        for header in _HEADER_RE.finditer(line.group(0)):
+            if not _is_header(line.group(0), header):
+                continue
+            header_start = line.start() + header.start()
+            if header_start > cursor and text[cursor:header_start].strip():
+                segments.append(LabelSegment(cursor, header_start, section, position))
+                position += 1
+            cursor = header_start
+            section, position = _HEADER_PHRASES[int(header.lastgroup[1:])][1], 0
+        if text[cursor:line.end()].strip():
+            segments.append(LabelSegment(cursor, line.end(), section, position))
+            position += 1
+    return segments
+
+
+def header_section(line: str, truncated: bool = False) -> Optional[str]:
+    """
+    Section opened by a header at the start of a line ("Warnings:", "INGREDIENTS ..."), if any.
+
+    With truncated=True the line is only the start of the real line (an OCR
+    probe), so a line that is itself the start of a header phrase
+    ("Inactive ingr") also counts, given at least six characters.
+    """
+    stripped = line.lstrip(' \t*•-#')
+    header = _HEADER_RE.match(stripped)
+    if header is not None:
+        return _HEADER_PHRASES[int(header.lastgroup[1:])][1]
+    prefix = ' '.join(stripped.lower().split())
+    if truncated and len(prefix) >= 6:
+        return next((section for phrase, section in _HEADER_PHRASES if phrase.startswith(prefix)), None)
+    return None
+
+
+def is_noise(text: str) -> bool:
+    """
+    Whether text looks like an address, URL, lot/expiry code or barcode number.
+    """
+    return _NOISE_RE.search(text) is not None
+
+
+def _is_header(line: str, header: re.Match) -> bool:
+    if not line[:header.start()].strip(' \t*•-#'):
+        return True
+    return line[header.end():].lstrip().startswith(':')
+
+
+def extract_label_sections(text: str, token_budget: int = LABEL_TEXT_TOKEN_BUDGET,
+                           priority_terms: Iterable[str] = (),
+                           matches: Optional[Sequence[LexiconMatch]] = None) -> LabelExtract:
+    """
+    Cut label text down to its most relevant segments within a token budget.
+
+    Args:
+        text: OCR text of the label
+        token_budget: Estimated tokens to fill with optional segments (0 = no
+            limit); must-keep segments (see MUST_KEEP_SCORE) are kept even beyond it
+        priority_terms: User profile entries; segments naming them are kept first
+        matches: Lexicon matches in text; segments naming ingredients rank
+            higher (the text itself is kept as read)
+
+    Returns:
+        LabelExtract with the selected text in label order
+    """
+    matches = list(matches or [])
+    original_tokens = estimate_tokens(text)
+    segments = split_sections(text)
+    sections = sorted({segment.section for segment in segments} - {'other'})
+
+    if not token_budget or original_tokens <= token_budget:
+        full_text = _render(text, [(0, len(text))])
+        return LabelExtract(full_text, original_tokens, estimate_tokens(full_text), sections)
+
+    terms = [term.lower() for term in priority_terms if len(term) >= 3]
+    for segment in segments:
+        _score(text, segment, terms, matches)
+
+    # Every must-keep segment, whole (a cut could drop "FD&C Yellow 5" or a
+    # warning), then the rest by score while they still fit
+    ranked = sorted(range(len(segments)), key=lambda i: (not _must_keep(segments[i]), -segments[i].score, i))
+    kept: List[Tuple[int, int]] = []
+    remaining = token_budget
+    for i in ranked:
+        segment = segments[i]
+        if segment.score <= 0:
+            break
+        must_keep = _must_keep(segment)
+        if not must_keep and remaining <= 0:
+            break
+        cost = estimate_tokens(text[segment.start:segment.end]) + 1
+        if must_keep or cost <= remaining:
+            kept.append((segment.start, segment.end))
+            remaining -= cost
+
+    kept.sort()
+    extracted = _render(text, kept)
+    return LabelExtract(
+        text=extracted,
+        original_tokens=original_tokens,
+        tokens=estimate_tokens(extracted),
+        sections=sections,
+        omitted_segments=len(segments) - len(kept)
+    )
+
+
+def _must_keep(segment: LabelSegment) -> bool:
+    return segment.score >= MUST_KEEP_SCORE
+
+
+def _score(text: str, segment: LabelSegment, priority_terms: List[str],
+           matches: Sequence[LexiconMatch]) -> None:
+    chunk = text[segment.start:segment.end]
+    if segment.section == 'other':
+        weight = UNSECTIONED_WEIGHT
+    else:
+        weight = SECTION_HEADERS[segment.section][1]
+        if segment.position >= SECTION_SPAN:
+            weight /= 2  # Sections have no end marker; trailing lines are often packaging text
+    hits = sum(1 for match in matches if segment.start <= match.start < segment.end)
+    lowered = chunk.lower()
+    score = weight + INGREDIENT_HIT_BONUS * min(hits, 2)
+    priority = any(term in lowered for term in priority_terms)
+    if priority:
+        score += PRIORITY_TERM_BONUS
+    if not (hits or priority) and _NOISE_RE.search(chunk):
+        # Noise inside an ingredient/warning section is kept only if it fits
+        score = weight / 2 if segment.section in MUST_KEEP_SECTIONS else 0.0
+    segment.score = score
+
+
+def _render(text: str, spans: List[Tuple[int, int]]) -> str:
+    """
+    Join kept spans, one per line, as read.
+    """
+    lines = (text[start:end].strip() for start, end in spans)
+    return '\n'.join(line for line in lines if line)
@@ -0,0 +1,330 @@
+"""
+OCR-tolerant ingredient lexicon.
+
+Maps noisy OCR tokens ("Warfarln", "Red4O", "peanutS") to canonical ingredient
+names. Terms are normalized with an OCR confusion map (0/O, 1/l/i, 5/S, ...),
+so most misreads become exact hits; the rest go through a trigram inverted
+index with length buckets, a q-gram count filter and a bounded edit distance
+check.
+
+Matches are hints, not rewrites: a fuzzy hit may still be a different real
+word, so callers keep the OCR text as read and pass matches alongside it.
+Tokens that are dictionary words are never fuzzy-matched.
+"""
+
+import re
+import threading
+import numpy as np
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+from config.settings import LEXICON_MIN_CONFIDENCE, LEXICON_EXTRA_PATH, LEXICON_DICTIONARY_PATH
+
+# Characters EasyOCR commonly confuses, folded to one representative
+_CONFUSIONS = str.maketrans({
+    '0': 'o', '1': 'l', 'i': 'l', '|': 'l', '!': 'l',
+    '5': 's', '$': 's', '8': 'b', ' ': None, '-': None, '.': None, ',': None
+})
+_TOKEN_RE = re.compile(r"[A-Za-z0-9&|!$'][A-Za-z0-9&|!$'.\-]*")
+_MAX_WINDOW = 4
+_MAX_CANDIDATES = 64
+
+# Label words one or two edits from a lexicon term; never fuzzy-matched even
+# without a system word list
+_LABEL_WORDS = frozenset({
+    'lactase', 'lactate', 'lactates', 'sucrase', 'maltase', 'amylase', 'protease', 'lipase',
+    'glucosamine', 'galactose', 'fructose', 'dextrose', 'maltose', 'sucrose', 'cellulase',
+    'caffeine', 'codeine', 'cysteine', 'lysine', 'histamine', 'glutamine', 'glutamate', 'glutathione',
+    'thiamine', 'niacin', 'niacinamide', 'riboflavin', 'pectin', 'lecithin', 'gelatin', 'glycerin',
+    'potassium', 'magnesium', 'calcium', 'sodium', 'chloride', 'fluoride', 'sulfate', 'sulfite',
+    'sulfites', 'ointment', 'tablets', 'capsules', 'directions', 'warnings', 'ingredients',
+    'inactive', 'children', 'pregnant', 'physician', 'pharmacist', 'distributed', 'manufactured',
+})
+
+
+def normalize_term(text: str) -> str:
+    """
+    Fold case, OCR-confusable characters and separators.
+    """
+    return text.lower().translate(_CONFUSIONS)
+
+
+def _trigrams(normalized: str) -> List[str]:
+    padded = f"^{normalized}$"
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+def _max_distance(length: int) -> int:
+    # One edit turns too many English words of up to 8 letters into terms
+    # ("daily" -> "dairy", "lactase" -> "lactose"); the confusion map still
+    # resolves their usual misreads exactly
+    if length <= 8:
+        return 0
+    return 2
+
+
+def _plausible_fuzzy(phrase: str, term: str, dictionary: FrozenSet[str]) -> bool:
+    """
+    Reject fuzzy hits that swallow, swap or replace whole words.
+
+    The phrase must have as many words as the term, and each word must be
+    within its own edit limit, so "or kidney disease" does not become
+    "kidney disease" and "vitamin a" does not become "vitamin k". A word
+    that differs from the term's but is itself a real word is not a misread.
+    """
+    words, term_words = phrase.split(), term.split()
+    if len(words) != len(term_words):
+        return False
+    for word, term_word in zip(words, term_words):
+        a, b = normalize_term(word), normalize_term(term_word)
+        if a == b:
+            continue
+        if word.lower().strip(".-'") in dictionary:
+            return False
+        if bounded_edit_distance(a, b, _max_distance(max(len(a), len(b)))) is None:
+            return False
+    return True
+
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> Optional[int]:
+    """
+    Levenshtein distance, or None once it is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j, char_b in enumerate(b, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            )
+            row_min = min(row_min, current[j])
+        if row_min > limit:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+@dataclass
+class LexiconMatch:
+    """
+    A span of OCR text resolved to a lexicon entry.
+    """
+    token: str
+    start: int
+    end: int
+    canonical: str
+    term: str
+    distance: int
+    confidence: float
+
+    @property
+    def corrected(self) -> bool:
+        return self.token.lower() != self.term
+
+
+class IngredientLexicon:
+    """
+    Trigram-indexed lexicon of drug, excipient and allergen names.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str]], min_confidence: float = LEXICON_MIN_CONFIDENCE,
+                 dictionary: Iterable[str] = _LABEL_WORDS):
+        """
+        Args:
+            entries: (canonical_id, surface term) pairs
+            min_confidence: Minimum 1 - distance/length score to accept a fuzzy hit
+            dictionary: Real words (lowercase) that are never fuzzy-matched
+        """
+        self.min_confidence = min_confidence
+        self._terms = []        # index -> (normalized, term, canonical)
+        self._exact = {}        # normalized -> index
+        self._postings = defaultdict(list)  # (trigram, length) -> [index]
+        for canonical, term in entries:
+            normalized = normalize_term(term)
+            if not normalized or normalized in self._exact:
+                continue
+            index = len(self._terms)
+            self._terms.append((normalized, term.lower(), canonical))
+            self._exact[normalized] = index
+            for gram in _trigrams(normalized):
+                self._postings[(gram, len(normalized))].append(index)
+        self._postings = {
+            key: np.asarray(indexes, dtype=np.int32) for key, indexes in self._postings.items()
+        }
+        # Lexicon terms stay matchable even if the word list has them
+        self.dictionary = frozenset(dictionary) - {term for _, term, _ in self._terms}
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def lookup(self, token: str) -> Optional[Tuple[str, str, int, float]]:
+        """
+        Resolve one token (or multi-word phrase) to a lexicon entry.
+
+        Returns:
+            (canonical, term, distance, confidence) or None
+        """
+        normalized = normalize_term(token)
+        if not normalized:
+            return None
+        index = self._exact.get(normalized)
+        if index is not None:
+            _, term, canonical = self._terms[index]
+            return canonical, term, 0, 1.0
+
+        limit = _max_distance(len(normalized))
+        if limit == 0:
+            return None
+
+        # q-gram count filter: a term within `limit` edits shares at least
+        # len(grams) - 3 * limit of the query's trigrams. Postings are numpy
+        # arrays, so counting is one bincount and only a handful of
+        # candidates reach the edit distance check.
+        grams = _trigrams(normalized)
+        required = max(1, len(grams) - 3 * limit)
+        postings = [
+            self._postings[key]
+            for length in range(len(normalized) - limit, len(normalized) + limit + 1)
+            for key in ((gram, length) for gram in grams)
+            if key in self._postings
+        ]
+        if len(postings) < required:
+            return None
+        counts = np.bincount(np.concatenate(postings))
+        candidates = np.flatnonzero(counts >= required)
+        if len(candidates) > _MAX_CANDIDATES:
+            # Verify only the terms sharing the most trigrams with the query
+            top = np.argpartition(-counts[candidates], _MAX_CANDIDATES)[:_MAX_CANDIDATES]
+            candidates = candidates[top]
+        candidates = candidates[np.argsort(-counts[candidates], kind='stable')]
+
+        best = None
+        for index in candidates.tolist():
+            if best is not None and best[2] <= 1:
+                break  # Distance 0 was ruled out by the exact lookup
+            candidate, term, canonical = self._terms[index]
+            max_allowed = limit if best is None else best[2] - 1
+            distance = bounded_edit_distance(normalized, candidate, max_allowed)
+            if distance is None:
+                continue
+            confidence = 1.0 - distance / max(len(normalized), len(candidate))
+            if confidence >= self.min_confidence:
+                best = (canonical, term, distance, confidence)
+        return best
+
+    def match_text(self, text: str) -> List[LexiconMatch]:
+        """
+        Find lexicon terms in OCR text, longest phrase first, non-overlapping.
+
+        Fuzzy matches are possible misreads, not certainties: use them as
+        hints next to the text rather than to rewrite it.
+
+        Args:
+            text: OCR-extracted text
+
+        Returns:
+            LexiconMatch list in text order
+        """
+        tokens = [(m.group(0).strip(".-'"), m.start(), m.start() + len(m.group(0).strip(".-'")))
+                  for m in _TOKEN_RE.finditer(text)]
+        matches = []
+        i = 0
+        while i < len(tokens):
+            found = None
+            for width in range(min(_MAX_WINDOW, len(tokens) - i), 0, -1):
+                start, end = tokens[i][1], tokens[i + width - 1][2]
+                phrase = text[start:end]
+                if width > 1 and '\n' in phrase:
+                    continue
+                hit = self.lookup(phrase)
+                if hit is not None and hit[2] and not _plausible_fuzzy(phrase, hit[1], self.dictionary):
+                    hit = None
+                if hit is not None:
+                    canonical, term, distance, confidence = hit
+                    found = (width, LexiconMatch(phrase, start, end, canonical, term, distance, confidence))
+                    break
+            if found:
+                matches.append(found[1])
+                i += found[0]
+            else:
+                i += 1
+        return matches
+
+    def canonicalize_text(self, text: str, matches: Optional[List[LexiconMatch]] = None) -> str:
+        """
+        Rewrite OCR text with misread ingredient names replaced by their terms.
+
+        For display and search only: fuzzy matches can be wrong, so the
+        rewritten text must not drive a verdict or replace what Gemini reads.
+        """
+        if matches is None:
+            matches = self.match_text(text)
+        pieces, cursor = [], 0
+        for match in matches:
+            if match.corrected:
+                pieces.append(text[cursor:match.start])
+                pieces.append(match.term)
+                cursor = match.end
+        pieces.append(text[cursor:])
+        return ''.join(pieces)
+
+
+def _default_entries() -> List[Tuple[str, str]]:
+    """
+    Lexicon terms from the knowledge base, the demo rules and LEXICON_EXTRA_PATH.
+    """
+    from .knowledge_base import get_knowledge_base
+    from .rule_engine import get_rule_engine
+
+    entries = []
+    kb = get_knowledge_base()
+    for allergen, entry in kb.entries['allergens'].items():
+        for term in entry.get('synonyms', []) + entry.get('aliases', []):
+            entries.append((allergen, term))
+    for section in ('interactions', 'contraindications'):
+        for entity, entry in kb.entries[section].items():
+            entries.extend((entity, alias) for alias in entry.get('aliases', []))
+            entries.extend((term, term) for term in entry.get('ingredients', []))
+    for rule in get_rule_engine().rules:
+        entries.extend((term.rstrip('*'), term.rstrip('*')) for term in rule.label_terms)
+
+    if LEXICON_EXTRA_PATH:
+        # One entry per line: "<canonical_id>\t<term>" or just "<term>"
+        with open(LEXICON_EXTRA_PATH, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.rstrip('\n').split('\t')
+                if parts[-1]:
+                    entries.append((parts[0], parts[-1]))
+    return entries
+
+
+def _default_dictionary() -> FrozenSet[str]:
+    """
+    Built-in label words plus LEXICON_DICTIONARY_PATH, if set.
+    """
+    words = set(_LABEL_WORDS)
+    if LEXICON_DICTIONARY_PATH:
+        with open(LEXICON_DICTIONARY_PATH, 'r', encoding='utf-8', errors='ignore') as f:
+            words.update(line.strip().lower() for line in f if line.strip().isalpha())
+    return frozenset(words)
+
+
+_lexicon: Optional[IngredientLexicon] = None
+_lexicon_lock = threading.Lock()
+
+
+def get_lexicon() -> IngredientLexicon:
+    """
+    Return the process-wide ingredient lexicon.
+    """
+    global _lexicon
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                _lexicon = IngredientLexicon(_default_entries(), dictionary=_default_dictionary())
+    return _lexicon
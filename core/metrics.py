@@ -0,0 +1,333 @@
+"""
+In-process metrics: timing spans, counters and Prometheus export.
+
+Stages of a scan are timed with span("ocr.readtext") and land in one
+histogram labelled by stage; counters (cache hits, retries, tokens, ...)
+are incremented with inc(). Components that already keep their own stats
+(caches, the resilience wrapper, the response parser) register a collector
+that is read only at export time.
+
+When METRICS_ENABLED is off, span() returns a shared no-op context manager
+and inc()/observe() return immediately, so instrumentation stays in place
+at negligible cost.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from config.settings import METRICS_ENABLED
+
+METRIC_PREFIX = 'contrascan'
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RECENT_SAMPLES = 512  # Per stage, for the admin panel's percentiles
+
+# (metric name, 'counter' or 'gauge', labels, value)
+Sample = Tuple[str, str, Dict[str, str], float]
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('registry', 'stage', 'start')
+
+    def __init__(self, registry: 'MetricsRegistry', stage: str):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        self.registry.observe(self.stage, time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.registry.inc('stage_errors_total', stage=self.stage)
+        return False
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'total', 'count', 'recent')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def add(self, seconds: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.total += seconds
+        self.count += 1
+        self.recent.append(seconds)
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of stage timings and counters.
+    """
+
+    def __init__(self, enabled: bool = True, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _Histogram] = {}
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def span(self, stage: str):
+        """
+        Context manager timing one stage (e.g. "gemini.request").
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """
+        Record a duration measured elsewhere.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = _Histogram(self.buckets)
+            histogram.add(seconds)
+
+    def observe_ms(self, prefix: str, timings_ms: Dict[str, float]) -> None:
+        """
+        Record a dict of stage -> milliseconds (as kept by preprocess_image).
+        """
+        if not self.enabled:
+            return
+        for stage, ms in timings_ms.items():
+            self.observe(f"{prefix}.{stage}", ms / 1000)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """
+        Add to a counter (name should end in _total).
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """
+        Add a callable returning (name, type, labels, value) samples at export time.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def stage_summary(self) -> List[Dict[str, float]]:
+        """
+        Per-stage count, mean and recent p50/p95/p99 in milliseconds.
+        """
+        with self._lock:
+            stages = {stage: (h.count, h.total, sorted(h.recent)) for stage, h in self._stages.items()}
+        rows = []
+        for stage, (count, total, recent) in sorted(stages.items()):
+            rows.append({
+                'stage': stage,
+                'count': count,
+                'mean_ms': total / count * 1000 if count else 0.0,
+                'p50_ms': _percentile(recent, 0.50) * 1000,
+                'p95_ms': _percentile(recent, 0.95) * 1000,
+                'p99_ms': _percentile(recent, 0.99) * 1000
+            })
+        return rows
+
+    def samples(self) -> List[Sample]:
+        """
+        Counters plus collector samples, for display or export.
+        """
+        with self._lock:
+            samples = [(name, 'counter', dict(labels), value) for (name, labels), value in self._counters.items()]
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                samples.extend(collector())
+            except Exception:
+                continue
+        return sorted(samples, key=lambda sample: (sample[0], sorted(sample[2].items())))
+
+    def render_prometheus(self) -> str:
+        """
+        Render everything in the Prometheus text exposition format.
+        """
+        lines = []
+        stage_metric = f"{METRIC_PREFIX}_stage_seconds"
+        with self._lock:
+            stages = [(stage, list(h.counts), h.total, h.count) for stage, h in sorted(self._stages.items())]
+        if stages:
+            lines.append(f"# HELP {stage_metric} Time spent per scan stage")
+            lines.append(f"# TYPE {stage_metric} histogram")
+        for stage, counts, total, count in stages:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{stage_metric}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{stage_metric}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{stage_metric}_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'{stage_metric}_count{{stage="{stage}"}} {count}')
+
+        declared = set()
+        for name, kind, labels, value in self.samples():
+            metric = f"{METRIC_PREFIX}_{name}"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} {kind}")
+                declared.add(metric)
+            lines.append(f"{metric}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Atomically write the exposition text (node_exporter textfile style).
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+
+def cache_samples(stats: Dict[str, float]) -> List[Sample]:
+    """
+    Collector samples for a ResultCache.stats() snapshot.
+    """
+    labels = {'cache': stats['name']}
+    return [
+        ('cache_hits_total', 'counter', labels, stats['hits']),
+        ('cache_disk_hits_total', 'counter', labels, stats['disk_hits']),
+        ('cache_misses_total', 'counter', labels, stats['misses']),
+        ('cache_evictions_total', 'counter', labels, stats['evictions']),
+        ('cache_entries', 'gauge', labels, stats['entries']),
+        ('cache_bytes', 'gauge', labels, stats['bytes'])
+    ]
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    escaped = (f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for key, value in sorted(labels.items()))
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else f"{value:.6g}"
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Process-wide registry and export surfaces
+# ═══════════════════════════════════════════════════════════════════════════
+_registry = MetricsRegistry(enabled=METRICS_ENABLED)
+_server = None
+_server_lock = threading.Lock()
+_last_export = 0.0
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Return the process-wide metrics registry.
+    """
+    return _registry
+
+
+def span(stage: str):
+    """
+    Time a stage on the process-wide registry (no-op when metrics are off).
+    """
+    return _registry.span(stage)
+
+
+def inc(name: str, value: float = 1, **labels: str) -> None:
+    """
+    Increment a counter on the process-wide registry.
+    """
+    _registry.inc(name, value, **labels)
+
+
+def export_metrics(path: str, min_interval_seconds: float = 1.0) -> bool:
+    """
+    Write the registry to a file, at most once per min_interval_seconds.
+
+    Returns:
+        True if the file was written
+    """
+    global _last_export
+    if not _registry.enabled or not path:
+        return False
+    now = time.monotonic()
+    if now - _last_export < min_interval_seconds:
+        return False
+    _last_export = now
+    _registry.write_prometheus(path)
+    return True
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1') -> Optional[int]:
+    """
+    Serve GET /metrics from a daemon thread (idempotent per process).
+
+    Returns:
+        The bound port, or None if metrics are disabled
+    """
+    global _server
+    if not _registry.enabled:
+        return None
+    with _server_lock:
+        if _server is None:
+            from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+            class MetricsHandler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split('?')[0] not in ('/metrics', '/'):
+                        self.send_error(404)
+                        return
+                    payload = _registry.render_prometheus().encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                    self.send_header('Content-Length', str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+
+                def log_message(self, format, *args):
+                    pass
+
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name='metrics-http', daemon=True).start()
+    return _server.server_address[1]
@@ -0,0 +1,204 @@
+"""
+OCR inference backends behind the easyocr.Reader interface.
+
+'easyocr' is the stock reader. 'onnx' keeps EasyOCR's pre/post-processing
+(resizing, box grouping, CTC decoding) but swaps the two networks for ONNX
+Runtime sessions:
+
+- the CRAFT detector (fully convolutional, most of the CPU time on large
+  labels) runs fp32 with ONNX Runtime's graph optimizations;
+- the recognizer is additionally int8-quantized with dynamic quantization.
+
+The ONNX files are exported once from an unquantized reader and cached in
+OCR_CPU_CONFIG['onnx_model_dir'], keyed by EasyOCR version and languages.
+torch, easyocr and onnxruntime are imported lazily; a missing package fails
+the reader load like a missing model does.
+"""
+
+import logging
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config.settings import OCR_CPU_CONFIG
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('easyocr', 'onnx')
+
+
+def intra_op_threads(config: Optional[Dict] = None) -> int:
+    """
+    Threads per inference call: configured, else OMP_NUM_THREADS (set by
+    OCR pool workers), else 0 for the runtime's default.
+    """
+    config = config or OCR_CPU_CONFIG
+    return config['intra_op_threads'] or int(os.environ.get('OMP_NUM_THREADS', '0') or 0)
+
+
+def create_reader(backend: str, languages: Sequence[str], gpu: bool, verbose: bool = False,
+                  config: Optional[Dict] = None):
+    """
+    Build a reader with easyocr.Reader's readtext for the given backend.
+
+    Raises:
+        ValueError: Unknown backend
+        ImportError: Backend dependencies are not installed
+    """
+    config = config or OCR_CPU_CONFIG
+    if backend == 'easyocr':
+        return _create_easyocr_reader(languages, gpu, verbose, config)
+    if backend == 'onnx':
+        return _create_onnx_reader(languages, verbose, config)
+    raise ValueError(f"Unknown OCR backend {backend!r} (expected one of {', '.join(BACKENDS)})")
+
+
+def _create_easyocr_reader(languages: Sequence[str], gpu: bool, verbose: bool, config: Dict):
+    import easyocr
+    threads = intra_op_threads(config)
+    if threads:
+        import torch
+        torch.set_num_threads(threads)
+    # GPU=True will auto-detect CUDA availability
+    return easyocr.Reader(list(languages), gpu=gpu, verbose=verbose)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ONNX Runtime backend
+# ═══════════════════════════════════════════════════════════════════════════
+class OnnxModule:
+    """
+    Callable standing in for a torch module inside EasyOCR's pipeline.
+
+    Takes torch tensors and returns torch tensors, so EasyOCR's detection
+    and recognition code runs unchanged around it.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+
+    def eval(self) -> 'OnnxModule':
+        return self
+
+    def __call__(self, x, *unused):
+        import torch
+        outputs = self.session.run(None, {self.input_name: x.detach().cpu().numpy()})
+        tensors = tuple(torch.from_numpy(output) for output in outputs)
+        return tensors[0] if len(tensors) == 1 else tensors
+
+
+def onnx_model_paths(languages: Sequence[str], config: Dict) -> Dict[str, str]:
+    """
+    Cached file locations for the exported (and quantized) networks.
+    """
+    import easyocr
+    tag = f"easyocr{easyocr.__version__}_{'-'.join(sorted(languages))}"
+    directory = config['onnx_model_dir']
+    return {
+        'detector': os.path.join(directory, f"craft_{tag}.onnx"),
+        'recognizer': os.path.join(directory, f"recognizer_{tag}.onnx"),
+        'recognizer_int8': os.path.join(directory, f"recognizer_{tag}.int8.onnx")
+    }
+
+
+def export_onnx_models(languages: Sequence[str], config: Optional[Dict] = None) -> Dict[str, str]:
+    """
+    Export EasyOCR's networks to ONNX (skipping files that already exist).
+
+    Returns:
+        Paths from onnx_model_paths
+    """
+    import easyocr
+    import torch
+
+    config = config or OCR_CPU_CONFIG
+    paths = onnx_model_paths(languages, config)
+    need_recognizer_int8 = config['onnx_quantize_recognizer'] and not os.path.exists(paths['recognizer_int8'])
+    if os.path.exists(paths['detector']) and os.path.exists(paths['recognizer']) and not need_recognizer_int8:
+        return paths
+
+    os.makedirs(config['onnx_model_dir'], exist_ok=True)
+    # EasyOCR quantizes on CPU by default; dynamically quantized LSTMs cannot be exported
+    reader = easyocr.Reader(list(languages), gpu=False, quantize=False, verbose=False)
+
+    if not os.path.exists(paths['detector']):
+        logger.info("Exporting OCR detector to %s", paths['detector'])
+        torch.onnx.export(
+            reader.detector.eval(),
+            torch.randn(1, 3, 640, 640),
+            paths['detector'],
+            input_names=['image'],
+            output_names=['score_maps', 'feature'],
+            dynamic_axes={'image': {0: 'batch', 2: 'height', 3: 'width'},
+                          'score_maps': {0: 'batch', 1: 'map_height', 2: 'map_width'},
+                          'feature': {0: 'batch', 2: 'map_height', 3: 'map_width'}},
+            opset_version=config['onnx_opset']
+        )
+
+    if not os.path.exists(paths['recognizer']):
+        logger.info("Exporting OCR recognizer to %s", paths['recognizer'])
+
+        class _Recognizer(torch.nn.Module):
+            # The CTC models ignore their second ("text") argument
+            def __init__(self, model):
+                super().__init__()
+                self.model = model
+
+            def forward(self, image):
+                return self.model(image, None)
+
+        torch.onnx.export(
+            _Recognizer(reader.recognizer).eval(),
+            torch.randn(2, 1, 64, 256),
+            paths['recognizer'],
+            input_names=['crops'],
+            output_names=['logits'],
+            dynamic_axes={'crops': {0: 'batch', 3: 'width'}, 'logits': {0: 'batch', 1: 'steps'}},
+            opset_version=config['onnx_opset']
+        )
+
+    if need_recognizer_int8:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        logger.info("Quantizing OCR recognizer to %s", paths['recognizer_int8'])
+        quantize_dynamic(paths['recognizer'], paths['recognizer_int8'], weight_type=QuantType.QInt8)
+    return paths
+
+
+def _session(path: str, config: Dict):
+    import onnxruntime as ort
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = intra_op_threads(config)
+    options.inter_op_num_threads = config['inter_op_threads']
+    return ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+
+
+def _create_onnx_reader(languages: Sequence[str], verbose: bool, config: Dict):
+    import easyocr
+    import onnxruntime  # noqa: F401  (fail before the slow export if it is missing)
+
+    paths = export_onnx_models(languages, config)
+    # Loads the torch weights once more for the character set and converter;
+    # the networks themselves are replaced by ONNX sessions and freed
+    reader = easyocr.Reader(list(languages), gpu=False, verbose=verbose)
+    reader.detector = OnnxModule(_session(paths['detector'], config))
+    recognizer = paths['recognizer_int8'] if config['onnx_quantize_recognizer'] else paths['recognizer']
+    reader.recognizer = OnnxModule(_session(recognizer, config))
+    return reader
+
+
+def backend_available(backend: str) -> Tuple[bool, str]:
+    """
+    Whether a backend's packages import here (models may still need downloading).
+
+    Returns:
+        (available, reason if not)
+    """
+    modules: List[str] = ['easyocr'] + (['onnxruntime', 'onnx'] if backend == 'onnx' else [])
+    for module in modules:
+        try:
+            __import__(module)
+        except ImportError as e:
+            return False, str(e)
+    return True, ''
@@ -0,0 +1,303 @@
+"""
+Cross-session micro-batching of the text recognizer.
+
+On CPU, easyocr.Reader.recognize runs the recognizer once per text crop
+(batch size 1), so N concurrent scans of M lines each cost N x M small
+forward passes. With batching on, each scan still detects its text boxes
+on its own reader replica, but hands the crops to one process-wide
+RecognizerBatcher:
+
+1. the first scan to submit opens a batch and waits up to window_ms;
+2. crops of other scans submitted meanwhile join it; it closes early once
+   no other scan is still detecting (nobody else is about to submit) or
+   max_batch_crops are in;
+3. the batch is sorted by crop width and cut into a few passes whose widest
+   crop is at most max_pad_ratio times the narrowest (every crop in a pass
+   is padded to its widest);
+4. the scans in the batch run those passes on their own replicas'
+   recognizers, in parallel, and each returns its own crops' results.
+
+BatchingReader has easyocr.Reader's detect / recognize / readtext, so it can
+stand in for the reader (also under RegionReader).
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import OCR_BATCHING
+from .metrics import get_metrics
+from .ocr_regions import TextBox, _as_ints, _corners, join_lines
+
+logger = logging.getLogger(__name__)
+
+# Recognized (text, confidence) for one crop
+CropText = Tuple[str, float]
+
+
+class EasyOCRCropRecognizer:
+    """
+    Cuts recognizer-ready crops out of an image and recognizes any list of
+    them in one pass, using the same EasyOCR helpers as Reader.recognize.
+    """
+
+    def __init__(self, reader, decoder: str = 'greedy', beam_width: int = 5, contrast_ths: float = 0.1,
+                 adjust_contrast: float = 0.5, filter_ths: float = 0.003):
+        self.reader = reader
+        self.img_height = getattr(reader, 'imgH', 64)
+        self.decoder = decoder
+        self.beam_width = beam_width
+        self.contrast_ths = contrast_ths
+        self.adjust_contrast = adjust_contrast
+        self.filter_ths = filter_ths
+        self.ignore_char = ''.join(set(reader.character) - set(reader.lang_char))
+
+    def crops(self, image: np.ndarray, horizontal_list: Sequence, free_list: Sequence) -> List[np.ndarray]:
+        """
+        One grayscale crop per box, scaled to the recognizer's height:
+        horizontal boxes first, then free ones, each in input order.
+        """
+        from easyocr.utils import get_image_list, reformat_input
+        _, gray = reformat_input(image)
+        crops = []
+        # One box at a time: get_image_list sorts what it is given by position
+        for box in horizontal_list:
+            crops.append(get_image_list([box], [], gray, model_height=self.img_height)[0][0][1])
+        for box in free_list:
+            crops.append(get_image_list([], [box], gray, model_height=self.img_height)[0][0][1])
+        return crops
+
+    def recognize(self, crops: Sequence[np.ndarray]) -> List[CropText]:
+        """
+        Recognize crops in one forward pass (padded to the widest).
+        """
+        from easyocr.recognition import get_text
+        width = max(math.ceil(crop.shape[1] / crop.shape[0]) * self.img_height for crop in crops)
+        image_list = [([[0, 0], [crop.shape[1], 0], [crop.shape[1], crop.shape[0]], [0, crop.shape[0]]], crop)
+                      for crop in crops]
+        results = get_text(self.reader.character, self.img_height, int(width), self.reader.recognizer,
+                           self.reader.converter, image_list, self.ignore_char, self.decoder, self.beam_width,
+                           len(image_list), self.contrast_ths, self.adjust_contrast, self.filter_ths, 0,
+                           self.reader.device)
+        return [(text, float(confidence)) for _, text, confidence in results]
+
+
+class _Batch:
+    """
+    Crops of the scans batched together, and the passes they are cut into.
+    """
+
+    def __init__(self):
+        self.crops: List[Any] = []
+        self.scans = 0
+        self.opened = time.monotonic()
+        self.passes: Optional[Deque[List[int]]] = None  # Planned when the batch closes
+        self.running = 0
+        self.results: List[Optional[CropText]] = []
+        self.error: Optional[BaseException] = None
+
+
+class RecognizerBatcher:
+    """
+    Groups the crops of concurrent scans into shared recognizer passes.
+
+    The first scan to submit crops opens a batch and waits up to window_ms
+    for other scans to join (less if none is still detecting, or once
+    max_batch_crops are in). The batch is then cut into passes of similar
+    width, at most one per scan taking part, and every scan in it runs
+    passes on its own recognizer until none are left: no recognizer is
+    shared between threads and all replicas stay busy.
+
+    Args:
+        window_ms: Longest the first scan of a batch waits for others
+        max_batch_crops: A batch this large closes at once
+        max_pad_ratio: Widest / narrowest crop allowed in one pass
+    """
+
+    def __init__(self, window_ms: float = OCR_BATCHING['window_ms'],
+                 max_batch_crops: int = OCR_BATCHING['max_batch_crops'],
+                 max_pad_ratio: float = OCR_BATCHING['max_pad_ratio']):
+        self.window_seconds = window_ms / 1000
+        self.max_batch_crops = max(1, max_batch_crops)
+        self.max_pad_ratio = max(1.0, max_pad_ratio)
+        self._cond = threading.Condition()
+        self._open: Optional[_Batch] = None
+        self._detecting = 0
+        self._counts = {'scans': 0, 'crops': 0, 'batches': 0, 'passes': 0}
+
+    def detecting(self, delta: int) -> None:
+        """
+        Count scans in their detection step (they will submit crops soon).
+        """
+        with self._cond:
+            self._detecting += delta
+            self._cond.notify_all()
+
+    def recognize(self, crops: List[Any], recognizer) -> List[CropText]:
+        """
+        Recognize one scan's crops as part of a batch.
+
+        Args:
+            crops: Crops cut by recognizer.crops
+            recognizer: This scan's own recognizer (runs some of the batch's passes)
+
+        Returns:
+            (text, confidence) per crop, in order. A failed pass raises in
+            every scan of its batch.
+        """
+        if not crops:
+            return []
+        with self._cond:
+            batch = self._open
+            leader = batch is None or len(batch.crops) + len(crops) > self.max_batch_crops
+            if leader:
+                batch = self._open = _Batch()
+            offset = len(batch.crops)
+            batch.crops.extend(crops)
+            batch.scans += 1
+            self._cond.notify_all()
+            if leader:
+                self._collect(batch)
+            else:
+                while batch.passes is None:
+                    self._cond.wait()
+        self._run_passes(batch, recognizer)
+        with self._cond:
+            while batch.running or batch.passes:
+                self._cond.wait()
+        if batch.error is not None:
+            raise batch.error
+        return batch.results[offset:offset + len(crops)]
+
+    def _collect(self, batch: _Batch) -> None:
+        """
+        Wait for other scans' crops until the window closes, then plan the passes.
+        Caller holds _cond.
+        """
+        deadline = batch.opened + self.window_seconds
+        while self._detecting > 0 and len(batch.crops) < self.max_batch_crops:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._cond.wait(remaining)
+        if self._open is batch:
+            self._open = None
+        get_metrics().observe('ocr.batch_wait', time.monotonic() - batch.opened)
+        batch.results = [None] * len(batch.crops)
+        batch.passes = deque(self._plan(batch.crops, batch.scans))
+        self._counts['scans'] += batch.scans
+        self._counts['crops'] += len(batch.crops)
+        self._counts['batches'] += 1
+        self._counts['passes'] += len(batch.passes)
+        self._cond.notify_all()
+
+    def _plan(self, crops: List[Any], scans: int) -> List[List[int]]:
+        """
+        Crop indexes per pass: sorted by width, cut where the padding would
+        exceed max_pad_ratio and into about one pass per scan.
+        """
+        order = sorted(range(len(crops)), key=lambda index: _aspect(crops[index]))
+        share = math.ceil(len(order) / scans)
+        passes = [[order[0]]]
+        for index in order[1:]:
+            current = passes[-1]
+            if len(current) >= share or _aspect(crops[index]) > _aspect(crops[current[0]]) * self.max_pad_ratio:
+                passes.append([index])
+            else:
+                current.append(index)
+        return passes
+
+    def _run_passes(self, batch: _Batch, recognizer) -> None:
+        while True:
+            with self._cond:
+                if not batch.passes or batch.error is not None:
+                    return
+                indexes = batch.passes.popleft()
+                batch.running += 1
+            try:
+                texts = recognizer.recognize([batch.crops[index] for index in indexes])
+            except Exception as e:
+                logger.warning("Recognizer pass of %d crops failed: %s", len(indexes), e)
+                with self._cond:
+                    batch.error = batch.error or e
+                    batch.passes.clear()
+                    batch.running -= 1
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                for index, text in zip(indexes, texts):
+                    batch.results[index] = text
+                batch.running -= 1
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            counts = dict(self._counts, window_ms=self.window_seconds * 1000)
+        counts['crops_per_pass'] = counts['crops'] / counts['passes'] if counts['passes'] else 0.0
+        return counts
+
+    def metric_samples(self):
+        stats = self.stats()
+        return [(f'ocr_batcher_{key}_total', 'counter', {}, stats[key])
+                for key in ('scans', 'crops', 'batches', 'passes')]
+
+
+def _aspect(crop) -> float:
+    return crop.shape[1] / max(1, crop.shape[0])
+
+
+class BatchingReader:
+    """
+    Wraps one reader (replica) so its recognition joins the process-wide batches.
+
+    detect runs on the wrapped reader; recognize cuts the crops and hands
+    them to the batcher, whose passes this reader's recognizer helps run.
+    readtext keeps easyocr's signature.
+    """
+
+    def __init__(self, reader, batcher: RecognizerBatcher, recognizer=None):
+        self.reader = reader
+        self.batcher = batcher
+        self.recognizer = recognizer or EasyOCRCropRecognizer(reader)
+
+    def detect(self, image: np.ndarray, **kwargs):
+        self.batcher.detecting(1)
+        try:
+            return self.reader.detect(image, **kwargs)
+        finally:
+            self.batcher.detecting(-1)
+
+    def recognize(self, image: np.ndarray, horizontal_list=None, free_list=None, detail: int = 1,
+                  paragraph: bool = False, **kwargs):
+        horizontal_list, free_list = list(horizontal_list or []), list(free_list or [])
+        texts = self.batcher.recognize(self.recognizer.crops(image, horizontal_list, free_list), self.recognizer)
+        boxes = [TextBox(*_as_ints(bounds)) for bounds in horizontal_list]
+        boxes += [_polygon_box(polygon) for polygon in free_list]
+        for box, (text, confidence) in zip(boxes, texts):
+            box.text, box.confidence = text, confidence
+        return _format(boxes, detail, paragraph)
+
+    def readtext(self, image: np.ndarray, detail: int = 1, paragraph: bool = False, **kwargs):
+        horizontal, free = self.detect(image)
+        return self.recognize(image, horizontal[0], free[0], detail=detail, paragraph=paragraph)
+
+
+def _polygon_box(polygon) -> TextBox:
+    xs, ys = [int(point[0]) for point in polygon], [int(point[1]) for point in polygon]
+    return TextBox(min(xs), max(xs), min(ys), max(ys), polygon=[[x, y] for x, y in zip(xs, ys)])
+
+
+def _format(boxes: List[TextBox], detail: int, paragraph: bool):
+    found = [box for box in boxes if box.text]
+    if paragraph:
+        # Lines instead of easyocr's paragraphs, as RegionReader returns them
+        lines = join_lines(found).split('\n') if found else []
+        return lines if detail == 0 else [(None, line, 1.0) for line in lines]
+    if detail == 0:
+        return [box.text for box in boxes]
+    return [(_corners(box), box.text, box.confidence) for box in boxes]
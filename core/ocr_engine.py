@@ -1,69 +1,333 @@
 """
 OCR (Optical Character Recognition) engine using EasyOCR.
+
+Nothing here imports Streamlit: the reader lives in the process-wide
+resource cache (core.resources) and progress is reported through an
+optional on_event(stage, state) callback, so the same code runs in the app,
+CLIs and worker processes.
 """
 
-import streamlit as st
+import functools
+import logging
+import os
+import threading
+import time
 import numpy as np
 from PIL import Image
-from typing import Union
-from config.settings import OCR_LANGUAGE, OCR_GPU_ENABLED, OCR_VERBOSE
+from typing import Callable, Dict, Optional, Tuple, Union
+from config.settings import (
+    OCR_BACKEND,
+    OCR_LANGUAGE,
+    OCR_GPU_ENABLED,
+    OCR_VERBOSE,
+    OCR_PREPROCESS_CONFIG,
+    OCR_CACHE_MAX_ENTRIES,
+    OCR_CACHE_MAX_BYTES,
+    OCR_CACHE_DISK_DIR,
+    OCR_CACHE_DISK_MAX_BYTES,
+    OCR_BATCHING,
+    OCR_POOL,
+    OCR_QUALITY_GATE,
+    OCR_READERS,
+    OCR_ROI
+)
+from .cache import ResultCache, make_cache_key
+from .image_preprocessing import preprocess_image
+from .image_quality import ImageQualityError, get_quality_stats, rejection_text
+from .metrics import cache_samples, get_metrics, span
+from .ocr_backends import create_reader, intra_op_threads
+from .ocr_batching import BatchingReader, RecognizerBatcher
+from .ocr_pool import OCRBusyError, OCRPool, OCRTimeoutError
+from .ocr_regions import RegionReader
+from .reader_pool import ReaderPool
+from .resources import get_resources
+from .service_client import SERVICE_UNAVAILABLE_TEXT, ServiceError, ServiceUnavailableError, get_service_client
+from .singleflight import single_flight
+
+# Process-wide, so a label scanned in one session is a hit for every other
+_ocr_cache = ResultCache(
+    'ocr',
+    max_entries=OCR_CACHE_MAX_ENTRIES,
+    max_bytes=OCR_CACHE_MAX_BYTES,
+    disk_dir=OCR_CACHE_DISK_DIR,
+    disk_max_bytes=OCR_CACHE_DISK_MAX_BYTES
+)
+get_metrics().register_collector(lambda: cache_samples(_ocr_cache.stats()))
+get_metrics().register_collector(lambda: _batcher_samples())
+_ocr_flights = single_flight('ocr')
+
+
+logger = logging.getLogger(__name__)
+
+OCR_READER_RESOURCE = 'ocr_reader'
+OCR_BATCHER_RESOURCE = 'ocr_batcher'
+OCR_BUSY_TEXT = "[OCR busy - too many scans in progress, please try again]"
+
+# Progress callback: on_event(stage, state) with state 'start' or 'end'
+EventCallback = Callable[[str, str], None]
+
+
+def _create_reader():
+    try:
+        reader = create_reader(OCR_BACKEND, OCR_LANGUAGE, gpu=OCR_GPU_ENABLED, verbose=OCR_VERBOSE)
+    except Exception as e:
+        logger.error("Failed to load OCR engine: %s", e)
+        raise
+    # Batch recognition across the in-process replicas (a pool worker reads one image at a time)
+    if OCR_BATCHING['enabled'] and OCR_POOL['workers'] == 0:
+        reader = BatchingReader(reader, get_resources().get(OCR_BATCHER_RESOURCE, _create_batcher))
+    # Recognize only the label panels that matter (also inside pool workers)
+    return RegionReader(reader) if OCR_ROI['enabled'] else reader
+
+
+def _create_batcher() -> RecognizerBatcher:
+    batcher = RecognizerBatcher(
+        window_ms=OCR_BATCHING['window_ms'],
+        max_batch_crops=OCR_BATCHING['max_batch_crops'],
+        max_pad_ratio=OCR_BATCHING['max_pad_ratio']
+    )
+    logger.info("OCR recognizer batching: %.0f ms window, up to %d crops",
+                OCR_BATCHING['window_ms'], OCR_BATCHING['max_batch_crops'])
+    return batcher
+
+
+def _batcher_samples():
+    batcher = get_resources().peek(OCR_BATCHER_RESOURCE)
+    return batcher.metric_samples() if batcher is not None else []
+
+
+def _create_pool() -> OCRPool:
+    pool = OCRPool(
+        _create_reader,
+        workers=OCR_POOL['workers'],
+        queue_size=OCR_POOL['queue_size'],
+        queue_timeout_seconds=OCR_POOL['queue_timeout_seconds'],
+        job_timeout_seconds=OCR_POOL['job_timeout_seconds'],
+        torch_threads=OCR_POOL['torch_threads'],
+        start_method=OCR_POOL['start_method']
+    ).start()
+    get_metrics().register_collector(pool.metric_samples)
+    return pool
+
+
+def _create_reader_pool() -> ReaderPool:
+    pool = ReaderPool(
+        _create_reader,
+        replicas=OCR_READERS['replicas'],
+        memory_budget_mb=OCR_READERS['memory_budget_mb'],
+        replica_memory_mb=OCR_READERS['replica_memory_mb'],
+        checkout_timeout_seconds=OCR_READERS['checkout_timeout_seconds']
+    )
+    # torch's intra-op pool is process-wide; split the cores between replicas
+    if pool.max_replicas > 1 and not intra_op_threads():
+        os.environ['OMP_NUM_THREADS'] = str(pool.threads_per_replica)
+    pool.start()
+    get_metrics().register_collector(pool.metric_samples)
+    logger.info("OCR reader pool: up to %d replicas, %d threads each",
+                pool.max_replicas, pool.threads_per_replica)
+    return pool
 
 
-@st.cache_resource
 def load_ocr_reader():
     """
-    Load EasyOCR reader with GPU support if available.
+    Load the OCR reader for OCR_BACKEND (EasyOCR, with GPU support if available).
+    
+    The reader is built once per process and shared through the resource
+    cache; a failed load is remembered (see get_ocr_reader_error). The
+    result is safe to call from any thread: a ReaderPool of in-process
+    replicas, or with OCR_POOL['workers'] > 0 an OCRPool running readtext
+    in worker processes. Both have easyocr.Reader's readtext.
     
     Returns:
-        EasyOCR Reader instance or None if loading fails
+        ReaderPool (or OCRPool) instance, or None if loading fails
     """
-    try:
-        import easyocr
-        # GPU=True will auto-detect CUDA availability
-        reader = easyocr.Reader(
-            OCR_LANGUAGE,
-            gpu=OCR_GPU_ENABLED,
-            verbose=OCR_VERBOSE
-        )
+    if OCR_POOL['workers'] > 0:
+        return get_resources().get(OCR_READER_RESOURCE, _create_pool)
+    return get_resources().get(OCR_READER_RESOURCE, _create_reader_pool)
+
+
+def reload_ocr_readers() -> None:
+    """
+    Replace the in-process reader replicas (e.g. after new models were
+    installed); scans in progress finish on the old ones.
+    """
+    reader = get_resources().peek(OCR_READER_RESOURCE)
+    if isinstance(reader, ReaderPool):
+        reader.reload()
+
+
+def get_ocr_reader_error() -> Optional[Exception]:
+    """
+    Return the exception from the last failed load_ocr_reader, if any.
+    """
+    return get_resources().error(OCR_READER_RESOURCE)
+
+
+def thread_safe_reader(reader):
+    """
+    reader itself if it may be shared across threads (a pool), else a LockedReader.
+    """
+    if reader is None or isinstance(reader, (OCRPool, ReaderPool)):
         return reader
-    except Exception as e:
-        st.error(f"Failed to load OCR engine: {e}")
-        return None
+    return LockedReader(reader)
 
 
-def extract_text_from_image(image_data: Union[Image.Image, np.ndarray]) -> str:
+class LockedReader:
     """
-    Extract text from image using EasyOCR.
+    Serializes readtext calls; EasyOCR readers are not safe to share across threads.
+    """
+
+    def __init__(self, reader, lock: Optional[threading.Lock] = None):
+        self._reader = reader
+        self._lock = lock or threading.Lock()
+
+    def readtext(self, *args, **kwargs):
+        with self._lock:
+            return self._reader.readtext(*args, **kwargs)
+
+
+def get_ocr_cache() -> ResultCache:
+    """
+    Return the process-wide OCR result cache (for stats display).
+    """
+    return _ocr_cache
+
+
+def run_ocr(image_data: Union[Image.Image, np.ndarray],
+            get_reader: Callable[[], object] = load_ocr_reader,
+            preprocess_config: Optional[Dict] = None,
+            on_event: Optional[EventCallback] = None,
+            quality_gate: Optional[Dict] = None) -> Tuple[str, Dict[str, float]]:
+    """
+    Extract text from an image.
+    
+    The image is normalized first (see preprocess_image) and the result is
+    looked up in the OCR cache by a hash of the normalized pixels plus the OCR
+    settings. The reader is only requested on a cache miss, and concurrent
+    misses for the same frame share one readtext (see core/singleflight.py).
+    Frames failing the quality gate return a "[Photo rejected: ...]" marker
+    without OCR.
     
     Args:
         image_data: PIL Image or numpy array
+        get_reader: Returns the EasyOCR reader to use (None if unavailable)
+        preprocess_config: Preprocessing parameters (defaults to OCR_PREPROCESS_CONFIG)
+        on_event: Called with ('ocr.load_reader' | 'ocr.readtext', 'start' | 'end')
+        quality_gate: Quality thresholds (defaults to OCR_QUALITY_GATE)
         
     Returns:
-        Extracted text as string
+        (extracted text or a "[...]" error marker, per-stage timings in ms)
     """
+    preprocess_config = preprocess_config or OCR_PREPROCESS_CONFIG
+    quality_gate = quality_gate or OCR_QUALITY_GATE
+    notify = on_event or _ignore_event
+    timings: Dict[str, float] = {}
     try:
-        # Load OCR reader
-        if st.session_state.ocr_reader is None:
-            with st.spinner("🔧 Loading OCR engine (first time only)..."):
-                st.session_state.ocr_reader = load_ocr_reader()
+        # Normalize image (rotate, downscale, grayscale, contrast)
+        img_array, timings = preprocess_image(image_data, preprocess_config,
+                                              quality_gate if quality_gate['enabled'] else None)
         
-        reader = st.session_state.ocr_reader
-        if reader is None:
-            return "[OCR Engine unavailable]"
-        
-        # Convert PIL Image to numpy array
-        if isinstance(image_data, Image.Image):
-            img_array = np.array(image_data)
-        else:
-            img_array = image_data
-        
-        # Perform OCR
-        with st.spinner("🔍 Scanning text from image..."):
-            results = reader.readtext(img_array, detail=0, paragraph=True)
+        # Serve repeat scans from the cache
+        start = time.perf_counter()
+        cache_key = make_cache_key(
+            np.ascontiguousarray(img_array).tobytes(),
+            img_array.shape,
+            str(img_array.dtype),
+            OCR_BACKEND,
+            OCR_ROI['enabled'],
+            OCR_LANGUAGE,
+            preprocess_config
+        )
+        cached_text = _ocr_cache.get(cache_key)
+        timings['cache_lookup'] = (time.perf_counter() - start) * 1000
+        if cached_text is not None:
+            get_metrics().observe_ms('ocr', timings)
+            return cached_text, timings
         
-        # Join all detected text
-        extracted_text = "\n".join(results)
-        return extracted_text if extracted_text.strip() else "[No text detected]"
+        # Identical frames already being read (e.g. a promoted product) share that readtext
+        start = time.perf_counter()
+        extracted_text, shared = _ocr_flights.do(
+            cache_key,
+            lambda: _read_text(cache_key, img_array, get_reader, notify, timings),
+            on_wait=functools.partial(notify, 'ocr.readtext')
+        )
+        if shared:
+            timings['coalesced_wait'] = (time.perf_counter() - start) * 1000
+            get_metrics().observe_ms('ocr', timings)
+        return extracted_text, timings
     
+    except ImageQualityError as e:
+        get_quality_stats().record_rejection(e.report)
+        return rejection_text(e.report), {'quality': e.report.elapsed_ms}
+    except OCRBusyError:
+        return OCR_BUSY_TEXT, timings
+    except OCRTimeoutError:
+        return "[OCR timed out]", timings
     except Exception as e:
-        return f"[OCR Error: {str(e)}]"
+        return f"[OCR Error: {str(e)}]", timings
+
+
+def _read_text(cache_key: str, img_array: np.ndarray, get_reader: Callable[[], object],
+               notify: EventCallback, timings: Dict[str, float]) -> str:
+    """
+    Run the reader on a normalized frame and cache the text (run_ocr's miss path).
+    """
+    notify('ocr.load_reader', 'start')
+    try:
+        with span('ocr.load_reader'):
+            reader = get_reader()
+    finally:
+        notify('ocr.load_reader', 'end')
+    if reader is None:
+        return "[OCR Engine unavailable]"
+    
+    # Perform OCR
+    notify('ocr.readtext', 'start')
+    try:
+        start, cpu_start = time.perf_counter(), time.process_time()
+        results = reader.readtext(img_array, detail=0, paragraph=True)
+        timings['readtext'] = (time.perf_counter() - start) * 1000
+    finally:
+        notify('ocr.readtext', 'end')
+    # Pool workers burn their CPU in other processes; count their wall time
+    get_quality_stats().record_ocr(timings['readtext'] / 1000 if isinstance(reader, OCRPool)
+                                   else time.process_time() - cpu_start)
+    get_metrics().observe_ms('ocr', timings)
+    
+    # Join all detected text
+    extracted_text = "\n".join(results)
+    if not extracted_text.strip():
+        return "[No text detected]"
+    
+    _ocr_cache.put(cache_key, extracted_text)
+    return extracted_text
+
+
+def extract_text_from_image(image_data: Union[Image.Image, np.ndarray], reader=None,
+                            on_event: Optional[EventCallback] = None) -> str:
+    """
+    Extract text from image using EasyOCR.
+    
+    Args:
+        image_data: PIL Image or numpy array
+        reader: Reader to use (defaults to the shared one from load_ocr_reader,
+            or the scan service when SCAN_SERVICE_URL is set)
+        on_event: Progress callback, see run_ocr
+        
+    Returns:
+        Extracted text as string
+    """
+    service = get_service_client() if reader is None else None
+    if service is not None:
+        try:
+            return service.ocr(image_data)[0]
+        except ServiceUnavailableError:
+            return SERVICE_UNAVAILABLE_TEXT
+        except ServiceError as e:
+            return f"[OCR Error: {e}]"
+    get_reader = (lambda: reader) if reader is not None else load_ocr_reader
+    return run_ocr(image_data, get_reader, on_event=on_event)[0]
+
+
+def _ignore_event(stage: str, state: str) -> None:
+    pass
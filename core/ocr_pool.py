@@ -0,0 +1,393 @@
+"""
+Process pool for OCR so concurrent CPU scans run in parallel.
+
+readtext holds the GIL for much of its work and shares torch's thread pool,
+so concurrent scans in one process mostly queue behind each other. OCRPool
+starts N worker processes that each build their own reader once, and feeds
+them from a bounded queue owned by a dispatcher thread in the parent:
+
+- submit() fails fast with OCRBusyError when the queue is full, and jobs
+  waiting longer than queue_timeout_seconds are rejected the same way;
+- a worker still running a job after job_timeout_seconds is killed and
+  replaced, and the job fails with OCRTimeoutError;
+- a worker that dies is replaced and its job fails.
+
+OCRPool.readtext matches easyocr.Reader.readtext, so the pool can be used
+anywhere a reader is expected (see load_ocr_reader).
+"""
+
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .metrics import get_metrics
+
+
+class OCRBusyError(RuntimeError):
+    """
+    Raised when the pool cannot take a job in time; the caller should try again later.
+    """
+
+
+class OCRTimeoutError(TimeoutError):
+    """
+    Raised when a job ran longer than the per-job timeout.
+    """
+
+
+def _limit_threads(threads: int) -> None:
+    """
+    Cap intra-op threads so N workers don't oversubscribe the cores.
+    """
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[var] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def _worker_main(conn, reader_factory: Callable[[], Any], threads: int) -> None:
+    """
+    Worker process: build the reader once, then run jobs until told to stop.
+    """
+    _limit_threads(threads)
+    try:
+        reader = reader_factory()
+    except Exception as e:
+        conn.send(('failed', None, f"{type(e).__name__}: {e}"))
+        return
+    conn.send(('ready', None, None))
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if job is None:
+            return
+        job_id, image, kwargs = job
+        start = time.perf_counter()
+        try:
+            outcome = (True, reader.readtext(image, **kwargs))
+        except Exception as e:
+            outcome = (False, f"{type(e).__name__}: {e}")
+        conn.send(('done', job_id, (outcome, time.perf_counter() - start)))
+
+
+class _Worker:
+    __slots__ = ('index', 'process', 'conn', 'ready', 'job', 'started')
+
+    def __init__(self, index: int, process, conn):
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.ready = False
+        self.job: Optional[Tuple[int, Future]] = None
+        self.started = 0.0
+
+
+class OCRPool:
+    """
+    Bounded-queue pool of OCR worker processes.
+
+    Args:
+        reader_factory: Picklable callable returning a reader (run in each worker)
+        workers: Number of worker processes
+        queue_size: Jobs allowed to wait for a free worker
+        queue_timeout_seconds: Longest a job may wait before it is rejected
+        job_timeout_seconds: Longest a job may run before its worker is replaced
+        torch_threads: Intra-op threads per worker (0 = cores // workers)
+        start_method: multiprocessing start method
+    """
+
+    def __init__(self, reader_factory: Callable[[], Any], workers: int = 2, queue_size: int = 8,
+                 queue_timeout_seconds: float = 30.0, job_timeout_seconds: float = 60.0,
+                 torch_threads: int = 0, start_method: str = 'spawn'):
+        self.reader_factory = reader_factory
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.job_timeout_seconds = job_timeout_seconds
+        self.torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // self.workers)
+        self._context = multiprocessing.get_context(start_method)
+        self._lock = threading.Lock()
+        self._pending: Deque[Tuple[int, Any, Dict, Future, float]] = deque()
+        self._workers: List[_Worker] = []
+        self._job_ids = itertools.count()
+        self._wake_recv, self._wake_send = self._context.Pipe(duplex=False)
+        self._dispatcher: Optional[threading.Thread] = None
+        self._stopping = False
+        self.start_error: Optional[str] = None
+        self._started_at = 0.0
+        self._busy_seconds = 0.0
+        self._counts = {'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0,
+                        'timed_out': 0, 'restarts': 0}
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # Lifecycle
+    # ═══════════════════════════════════════════════════════════════════════
+    def start(self) -> 'OCRPool':
+        with self._lock:
+            if self._dispatcher is not None:
+                return self
+            self._started_at = time.monotonic()
+            for index in range(self.workers):
+                self._workers.append(self._spawn(index))
+            self._dispatcher = threading.Thread(target=self._run, name='ocr-pool', daemon=True)
+            self._dispatcher.start()
+        return self
+
+    def close(self) -> None:
+        """
+        Stop the workers; queued and running jobs fail with OCRBusyError.
+        """
+        with self._lock:
+            self._stopping = True
+        self._wake()
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout=5)
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except (OSError, ValueError):
+                pass
+            worker.process.join(timeout=2)
+            if worker.process.is_alive():
+                worker.process.kill()
+        for worker in self._workers:
+            if worker.job is not None:
+                _fail(worker.job[1], OCRBusyError("OCR pool shut down"))
+        while self._pending:
+            _fail(self._pending.popleft()[3], OCRBusyError("OCR pool shut down"))
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def wait_ready(self, timeout: float = 60.0) -> bool:
+        """
+        Block until every worker has loaded its reader (or failed to).
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if self.start_error or all(worker.ready for worker in self._workers):
+                    return not self.start_error
+            time.sleep(0.05)
+        return False
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # Jobs
+    # ═══════════════════════════════════════════════════════════════════════
+    def submit(self, image, **kwargs) -> Future:
+        """
+        Queue a readtext call.
+
+        Raises:
+            OCRBusyError: If the queue is full
+            RuntimeError: If the workers could not load a reader
+        """
+        if self._dispatcher is None:
+            self.start()
+        future = Future()
+        with self._lock:
+            if self.start_error:
+                raise RuntimeError(f"OCR workers failed to start: {self.start_error}")
+            if self._stopping:
+                raise OCRBusyError("OCR pool shut down")
+            if len(self._pending) >= self.queue_size + self._idle_count():
+                self._counts['rejected'] += 1
+                get_metrics().inc('ocr_pool_jobs_total', outcome='rejected')
+                raise OCRBusyError("OCR queue is full")
+            self._counts['submitted'] += 1
+            self._pending.append((next(self._job_ids), image, kwargs, future, time.monotonic()))
+        self._wake()
+        return future
+
+    def readtext(self, image, **kwargs) -> List:
+        """
+        easyocr.Reader.readtext, run in a worker process.
+
+        Raises:
+            OCRBusyError: Queue full or waited too long for a worker
+            OCRTimeoutError: The job exceeded job_timeout_seconds
+            RuntimeError: The worker failed, died, or could not load a reader
+        """
+        future = self.submit(image, **kwargs)
+        return future.result(timeout=self.queue_timeout_seconds + self.job_timeout_seconds + 5)
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # Stats
+    # ═══════════════════════════════════════════════════════════════════════
+    def stats(self) -> Dict[str, Any]:
+        """
+        Queue depth, worker states, job counts and utilization since start.
+        """
+        with self._lock:
+            now = time.monotonic()
+            busy = [worker for worker in self._workers if worker.job is not None]
+            busy_seconds = self._busy_seconds + sum(now - worker.started for worker in busy)
+            elapsed = (now - self._started_at) if self._started_at else 0.0
+            return dict(
+                self._counts,
+                workers=self.workers,
+                ready_workers=sum(1 for worker in self._workers if worker.ready),
+                busy_workers=len(busy),
+                queue_depth=len(self._pending),
+                queue_capacity=self.queue_size,
+                torch_threads=self.torch_threads,
+                utilization=busy_seconds / (elapsed * self.workers) if elapsed else 0.0,
+                start_error=self.start_error or ''
+            )
+
+    def metric_samples(self):
+        stats = self.stats()
+        samples = [(f'ocr_pool_{key}', 'gauge', {}, stats[key])
+                   for key in ('workers', 'ready_workers', 'busy_workers', 'queue_depth', 'utilization')]
+        samples.append(('ocr_pool_restarts_total', 'counter', {}, stats['restarts']))
+        return samples
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # Dispatcher thread
+    # ═══════════════════════════════════════════════════════════════════════
+    def _spawn(self, index: int) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.reader_factory, self.torch_threads),
+            name=f'ocr-worker-{index}',
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(index, process, parent_conn)
+
+    def _wake(self) -> None:
+        try:
+            self._wake_send.send_bytes(b'.')
+        except (OSError, ValueError):
+            pass
+
+    def _idle_count(self) -> int:
+        return sum(1 for worker in self._workers if worker.job is None and worker.process.is_alive())
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if self._stopping:
+                    return
+                workers = list(self._workers)
+            handles = [self._wake_recv] + [w.conn for w in workers] + [w.process.sentinel for w in workers]
+            for handle in wait(handles, timeout=0.1):
+                if handle is self._wake_recv:
+                    while self._wake_recv.poll():
+                        self._wake_recv.recv_bytes()
+                    continue
+                for worker in workers:
+                    if handle is worker.conn:
+                        self._receive(worker)
+                    elif handle is worker.process.sentinel and not worker.process.is_alive():
+                        self._replace(worker, RuntimeError("OCR worker exited unexpectedly"))
+            self._expire()
+            self._dispatch()
+
+    def _receive(self, worker: _Worker) -> None:
+        try:
+            kind, job_id, payload = worker.conn.recv()
+        except (EOFError, OSError):
+            return  # Exit is handled through the process sentinel
+        if kind == 'ready':
+            worker.ready = True
+        elif kind == 'failed':
+            with self._lock:
+                self.start_error = payload
+                pending = list(self._pending)
+                self._pending.clear()
+            for item in pending:
+                _fail(item[3], RuntimeError(f"OCR workers failed to start: {payload}"))
+        elif kind == 'done' and worker.job is not None and worker.job[0] == job_id:
+            (ok, value), seconds = payload
+            future = worker.job[1]
+            with self._lock:
+                worker.job = None
+                self._busy_seconds += seconds
+                self._counts['completed' if ok else 'failed'] += 1
+            get_metrics().inc('ocr_pool_jobs_total', outcome='completed' if ok else 'failed')
+            if ok:
+                future.set_result(value)
+            else:
+                _fail(future, RuntimeError(value))
+
+    def _replace(self, worker: _Worker, error: Exception) -> None:
+        """
+        Kill a worker (if still running), fail its job and start a fresh one.
+        """
+        while not worker.conn.closed and worker.conn.poll():
+            self._receive(worker)  # A startup failure or result sent just before exiting
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join(timeout=2)
+        worker.conn.close()
+        job = worker.job
+        with self._lock:
+            if job is not None:
+                self._busy_seconds += time.monotonic() - worker.started
+                self._counts['timed_out' if isinstance(error, OCRTimeoutError) else 'failed'] += 1
+            replacement = None
+            if not self._stopping and not self.start_error:
+                replacement = self._spawn(worker.index)
+                self._counts['restarts'] += 1
+                self._workers[self._workers.index(worker)] = replacement
+        if job is not None:
+            get_metrics().inc('ocr_pool_jobs_total',
+                              outcome='timed_out' if isinstance(error, OCRTimeoutError) else 'failed')
+            _fail(job[1], error)
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for worker in list(self._workers):
+            if worker.job is not None and now - worker.started > self.job_timeout_seconds:
+                self._replace(worker, OCRTimeoutError(
+                    f"OCR job exceeded {self.job_timeout_seconds:.0f}s"))
+        expired = []
+        with self._lock:
+            while self._pending and now - self._pending[0][4] > self.queue_timeout_seconds:
+                expired.append(self._pending.popleft())
+                self._counts['rejected'] += 1
+        for item in expired:
+            get_metrics().inc('ocr_pool_jobs_total', outcome='rejected')
+            _fail(item[3], OCRBusyError("Timed out waiting for a free OCR worker"))
+
+    def _dispatch(self) -> None:
+        with self._lock:
+            for worker in self._workers:
+                if not self._pending:
+                    return
+                if worker.job is not None or not worker.ready or not worker.process.is_alive():
+                    continue
+                job_id, image, kwargs, future, queued = self._pending.popleft()
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    worker.conn.send((job_id, image, kwargs))
+                except (OSError, ValueError) as e:
+                    _fail(future, RuntimeError(f"OCR worker unavailable: {e}"))
+                    continue
+                worker.job = (job_id, future)
+                worker.started = time.monotonic()
+                get_metrics().observe('ocr.pool_wait', worker.started - queued)
+
+
+def _fail(future: Future, error: Exception) -> None:
+    if not future.done():
+        if future.running() or future.set_running_or_notify_cancel():
+            future.set_exception(error)
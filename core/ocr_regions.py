@@ -0,0 +1,270 @@
+"""
+Region-of-interest OCR: detect once, recognize only the panels that matter.
+
+readtext recognizes every box on the package (brand, slogans, barcodes,
+addresses) and discards the geometry. RegionReader splits the work:
+
+1. detect      text boxes for the whole image (kept in RegionResult)
+2. probe       recognize only the first ~probe_aspect box-heights of each
+               box, enough to read a header such as "CONTAINS:" or the
+               start of one ("Inactive ingr"); short boxes are fully read
+               by their probe
+3. recognize   the remaining boxes of each relevant panel, from a relevant
+               header down to the next unrelated header or a large gap; long
+               boxes are read from just before the probe's end and stitched
+
+Labels without a recognizable header fall back to recognizing everything,
+so the worst case is a little more than a normal readtext (the probe
+overlaps).
+Recognizer work is counted as crop width in box-height units (the
+recognizer's cost is linear in crop width at a fixed height).
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import OCR_ROI
+from .label_sections import MUST_KEEP_SCORE, SECTION_HEADERS, header_section, is_noise
+from .metrics import inc
+
+# Panels worth recognizing: ingredients, allergens, warnings, and the Drug /
+# Supplement Facts tables that list the actives
+RELEVANT_SECTIONS = frozenset(
+    [name for name, (_, weight) in SECTION_HEADERS.items() if weight >= MUST_KEEP_SCORE] + ['facts']
+)
+
+
+@dataclass
+class TextBox:
+    """
+    One detected text box (axis-aligned bounds) and what was read from it.
+    """
+    x_min: int
+    x_max: int
+    y_min: int
+    y_max: int
+    polygon: Optional[List[List[int]]] = None  # Rotated boxes (EasyOCR's free_list)
+    text: str = ''
+    confidence: float = 0.0
+    recognized: bool = False   # Full box read (not just the probe)
+    probe: str = ''            # Text read from the start of the box
+    section: Optional[str] = None
+
+    @property
+    def height(self) -> int:
+        return max(1, self.y_max - self.y_min)
+
+    @property
+    def width(self) -> int:
+        return max(1, self.x_max - self.x_min)
+
+    def to_dict(self) -> Dict:
+        return {
+            'box': [self.x_min, self.y_min, self.x_max, self.y_max],
+            'text': self.text,
+            'confidence': round(self.confidence, 3),
+            'recognized': self.recognized,
+            'section': self.section
+        }
+
+
+@dataclass
+class RegionResult:
+    """
+    Detected boxes, the selected regions and the recognizer work spent.
+    """
+    boxes: List[TextBox] = field(default_factory=list)
+    regions: List[Tuple[int, int, int, int]] = field(default_factory=list)  # x_min, y_min, x_max, y_max
+    fallback: bool = False
+    work_units: float = 0.0        # Crop widths actually recognized, in box heights
+    full_work_units: float = 0.0   # What recognizing every box would have cost
+
+    @property
+    def text(self) -> str:
+        return join_lines([box for box in self.boxes if box.recognized and box.text])
+
+    @property
+    def work_saved(self) -> float:
+        return 1 - self.work_units / self.full_work_units if self.full_work_units else 0.0
+
+
+class RegionReader:
+    """
+    Wraps an easyocr.Reader (anything with detect/recognize) with ROI recognition.
+
+    readtext keeps easyocr's signature, so it can stand in for the reader.
+    """
+
+    def __init__(self, reader, probe_aspect: float = OCR_ROI['probe_aspect'],
+                 probe_overlap: float = OCR_ROI['probe_overlap'], max_line_gap: float = OCR_ROI['max_line_gap']):
+        self.reader = reader
+        self.probe_aspect = probe_aspect
+        self.probe_overlap = probe_overlap
+        self.max_line_gap = max_line_gap
+
+    def readtext(self, image: np.ndarray, detail: int = 1, paragraph: bool = False, **kwargs):
+        result = self.read_regions(image)
+        boxes = [box for box in result.boxes if box.recognized and box.text]
+        if detail == 0:
+            return result.text.split('\n') if paragraph else [box.text for box in boxes]
+        return [(_corners(box), box.text, box.confidence) for box in boxes]
+
+    def read_regions(self, image: np.ndarray) -> RegionResult:
+        """
+        Detect, probe and recognize the relevant panels of one image.
+        """
+        horizontal, free = self.reader.detect(image)
+        boxes = [TextBox(*_as_ints(bounds)) for bounds in horizontal[0]]
+        for polygon in free[0]:
+            xs, ys = [int(point[0]) for point in polygon], [int(point[1]) for point in polygon]
+            boxes.append(TextBox(min(xs), max(xs), min(ys), max(ys), polygon=[[x, y] for x, y in zip(xs, ys)]))
+        boxes.sort(key=lambda box: ((box.y_min + box.y_max) / 2, box.x_min))
+        result = RegionResult(boxes=boxes, full_work_units=sum(box.width / box.height for box in boxes))
+        if not boxes:
+            return result
+
+        # Probe: read the start of each box, fully reading the short ones
+        probes = []
+        for box in boxes:
+            probe_end = box.x_min + int(box.height * self.probe_aspect)
+            if box.polygon is not None or probe_end >= box.x_max:
+                probes.append((box, _bounds(box)))
+            else:
+                probes.append((box, [box.x_min, probe_end, box.y_min, box.y_max]))
+        for (box, bounds), (text, confidence) in zip(probes, self._recognize(image, probes, result)):
+            complete = bounds[1] >= box.x_max
+            box.probe, box.section, box.confidence = text, header_section(text, truncated=not complete), confidence
+            if complete:
+                box.text, box.recognized = text, True
+
+        selected = self._select_regions(boxes, result)
+        if not selected:
+            result.fallback = True
+            inc('ocr_roi_fallback_total')
+            selected = list(boxes)
+
+        # Read the rest of each long box, overlapping the probe to stitch the two
+        overlap = [box for box in selected if not box.recognized]
+        rests = [(box, [box.x_min + int(box.height * (self.probe_aspect - self.probe_overlap)),
+                        box.x_max, box.y_min, box.y_max]) for box in overlap]
+        unstitched = []
+        for (box, _), (text, confidence) in zip(rests, self._recognize(image, rests, result)):
+            stitched = _stitch(box.probe, text)
+            if stitched is None:
+                unstitched.append((box, _bounds(box)))
+                continue
+            box.text, box.confidence, box.recognized = stitched, min(box.confidence, confidence), True
+        for (box, _), (text, confidence) in zip(unstitched, self._recognize(image, unstitched, result)):
+            box.text, box.confidence, box.recognized = text, confidence, True
+
+        if not result.fallback:
+            # Only the selected panels count as label text
+            chosen = set(map(id, selected))
+            for box in boxes:
+                if id(box) not in chosen:
+                    box.recognized = False
+        inc('ocr_recognizer_work_total', result.work_units, mode='roi')
+        inc('ocr_recognizer_work_total', result.full_work_units, mode='full_equivalent')
+        return result
+
+    def _recognize(self, image: np.ndarray, jobs, result: RegionResult) -> List[Tuple[str, float]]:
+        """
+        Recognize crops (box, [x_min, x_max, y_min, y_max]) in one recognizer call, in order.
+        """
+        if not jobs:
+            return []
+        horizontal = [bounds for box, bounds in jobs if box.polygon is None]
+        free = [box.polygon for box, _ in jobs if box.polygon is not None]
+        result.work_units += sum((bounds[1] - bounds[0]) / box.height for box, bounds in jobs)
+        outputs = self.reader.recognize(image, horizontal_list=horizontal, free_list=free,
+                                        detail=1, paragraph=False)
+        # recognize returns horizontal boxes first, then free ones, each in input order
+        by_kind = {False: iter(outputs[:len(horizontal)]), True: iter(outputs[len(horizontal):])}
+        texts = []
+        for box, _ in jobs:
+            _, text, confidence = next(by_kind[box.polygon is not None], (None, '', 0.0))
+            texts.append((text, float(confidence)))
+        return texts
+
+    def _select_regions(self, boxes: List[TextBox], result: RegionResult) -> List[TextBox]:
+        """
+        Boxes belonging to relevant panels: lines left-aligned with a relevant
+        header (or continuing one of its lines), from the header down to the
+        next unrelated header, address/lot/URL line or a gap larger than
+        max_line_gap lines.
+        """
+        selected: Dict[int, TextBox] = {}
+        for start, header in enumerate(boxes):
+            if header.section not in RELEVANT_SECTIONS or id(header) in selected:
+                continue  # Not a panel header, or already inside an earlier panel
+            indent = 2 * header.height
+            bottom = header.y_max
+            region = [header]
+            for box in boxes[start + 1:]:
+                last = region[-1]
+                same_line = box.y_min < last.y_max and box.y_max > last.y_min
+                if not (abs(box.x_min - header.x_min) <= indent or
+                        same_line and 0 <= box.x_min - last.x_max <= indent):
+                    continue  # Another column
+                if box.y_min - bottom > self.max_line_gap * header.height:
+                    break
+                if box.y_min > header.y_max and (is_noise(box.probe) or
+                                                 box.section is not None and box.section not in RELEVANT_SECTIONS):
+                    break
+                region.append(box)
+                bottom = max(bottom, box.y_max)
+            for box in region:
+                selected[id(box)] = box
+            result.regions.append((min(b.x_min for b in region), header.y_min,
+                                   max(b.x_max for b in region), bottom))
+        return [box for box in boxes if id(box) in selected]
+
+
+def join_lines(boxes: Sequence[TextBox]) -> str:
+    """
+    Join box texts into lines: boxes whose vertical centres are within half
+    a box height share a line, read left to right.
+    """
+    lines: List[List[TextBox]] = []
+    for box in sorted(boxes, key=lambda b: ((b.y_min + b.y_max) / 2, b.x_min)):
+        centre = (box.y_min + box.y_max) / 2
+        if lines:
+            last = lines[-1][-1]
+            if abs(centre - (last.y_min + last.y_max) / 2) <= max(box.height, last.height) / 2:
+                lines[-1].append(box)
+                continue
+        lines.append([box])
+    return '\n'.join(' '.join(b.text for b in sorted(line, key=lambda b: b.x_min)) for line in lines)
+
+
+def _stitch(probe: str, rest: str, anchor: int = 3) -> Optional[str]:
+    """
+    Join a box's probe text and the text read from an overlapping crop.
+
+    The rest starts inside the probe, so its first characters are looked up
+    from the end of the probe; None when they are not found (the two crops
+    read the seam differently).
+    """
+    if not rest:
+        return probe
+    head = rest[:anchor]
+    index = probe.rfind(head)
+    if len(head) < anchor or index < 0:
+        return None
+    return probe[:index] + rest
+
+
+def _as_ints(bounds) -> Tuple[int, int, int, int]:
+    return tuple(int(value) for value in bounds[:4])
+
+
+def _bounds(box: TextBox) -> List[int]:
+    return [box.x_min, box.x_max, box.y_min, box.y_max]
+
+
+def _corners(box: TextBox) -> List[List[int]]:
+    if box.polygon is not None:
+        return box.polygon
+    return [[box.x_min, box.y_min], [box.x_max, box.y_min], [box.x_max, box.y_max], [box.x_min, box.y_max]]
@@ -0,0 +1,254 @@
+"""
+UI-free scan pipeline: image -> OCR text -> safety analysis.
+
+ScanEngine bundles the objects a scan needs (OCR reader, Gemini client,
+settings) and reports progress through an on_event(stage, state) callback
+instead of drawing anything. The Streamlit app, the batch CLI and
+benchmarks are thin adapters over it; nothing here imports Streamlit.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional, Union
+
+import numpy as np
+from PIL import Image
+
+from config.settings import GEMINI_STREAMING, OCR_PREPROCESS_CONFIG, OCR_QUALITY_GATE
+from .ai_analyzer import analyze_safety, analyze_safety_stream
+from .history import HISTORY_SOURCES, HistoryEntry, image_hash
+from .image_quality import rejection_feedback
+from .metrics import span
+from .ocr_engine import OCR_BUSY_TEXT, EventCallback, load_ocr_reader, run_ocr
+from .service_client import SERVICE_UNAVAILABLE_TEXT, ServiceError, ServiceUnavailableError, get_service_client
+from .warmup import get_warmup_status
+
+
+def is_ocr_failure(text: Optional[str]) -> bool:
+    """
+    True for empty OCR output or one of run_ocr's "[...]" markers.
+    """
+    return not text or text.startswith("[")
+
+
+def unreadable_label_result(ocr_text: Optional[str] = None) -> Dict:
+    """
+    Analysis shown when OCR produced no usable text.
+    
+    Args:
+        ocr_text: The OCR output, to tell an overloaded OCR pool or a photo
+            rejected by the quality gate from one OCR could not read
+    """
+    feedback = rejection_feedback(ocr_text)
+    if feedback:
+        return {
+            "status": "CAUTION",
+            "summary": "Please retake the photo.",
+            "details": [problem for problem, _ in feedback],
+            "recommendation": ' '.join(advice for _, advice in feedback),
+            "compounding_suggested": False,
+            "compounding_note": ""
+        }
+    if ocr_text == SERVICE_UNAVAILABLE_TEXT:
+        return {
+            "status": "CAUTION",
+            "summary": "The scanning service is not reachable.",
+            "details": ["The OCR service did not answer"],
+            "recommendation": "Please try again in a moment.",
+            "compounding_suggested": False,
+            "compounding_note": ""
+        }
+    if ocr_text == OCR_BUSY_TEXT:
+        return {
+            "status": "CAUTION",
+            "summary": "The scanner is busy right now.",
+            "details": ["Too many scans are in progress; this one was not started"],
+            "recommendation": "Please wait a few seconds and press Analyze again.",
+            "compounding_suggested": False,
+            "compounding_note": ""
+        }
+    return {
+        "status": "CAUTION",
+        "summary": "Could not read text from image clearly.",
+        "details": ["OCR extraction failed or returned empty"],
+        "recommendation": "Please try taking a clearer photo with better lighting.",
+        "compounding_suggested": False,
+        "compounding_note": ""
+    }
+
+
+@dataclass
+class ScanConfig:
+    """
+    Per-engine settings (defaults come from config.settings).
+    """
+    preprocess: Dict[str, Any] = field(default_factory=lambda: dict(OCR_PREPROCESS_CONFIG))
+    quality_gate: Dict[str, Any] = field(default_factory=lambda: dict(OCR_QUALITY_GATE))
+    streaming: bool = GEMINI_STREAMING
+
+
+@dataclass
+class ScanResult:
+    """
+    Outcome of one scan.
+    """
+    text: str
+    ocr_timings: Dict[str, float]
+    analysis: Dict
+    total_ms: float = 0.0
+    reopened: bool = False  # Served from the scan history
+
+    @property
+    def ocr_ok(self) -> bool:
+        return not is_ocr_failure(self.text)
+
+
+class ScanEngine:
+    """
+    OCR and analysis with explicit dependencies.
+
+    Args:
+        reader: EasyOCR-compatible reader (defaults to the shared one, loaded on first miss)
+        client: genai.Client (defaults to the shared pooled client)
+        config: ScanConfig
+        on_event: Progress callback, called with (stage, 'start' | 'end') for
+            'ocr.load_reader', 'ocr.readtext' and 'analysis'
+        service: ServiceClient (defaults to the one for SCAN_SERVICE_URL, if set);
+            OCR goes to it unless a reader is given, analysis unless a client is
+        history: ScanHistory to record scans in and reopen them from (default
+            none: only the app passes get_scan_history(), so scripts and
+            benchmarks neither replay stored results nor write a database)
+        history_owner: Owner key recorded with this engine's scans (see
+            ScanHistory.recent)
+    """
+
+    def __init__(self, reader=None, client=None, config: Optional[ScanConfig] = None,
+                 on_event: Optional[EventCallback] = None, service=None, history=None,
+                 history_owner: str = ''):
+        self.reader = reader
+        self.client = client
+        self.config = config or ScanConfig()
+        self.on_event = on_event
+        self.service = service if service is not None else get_service_client()
+        self.history = history or None
+        self.history_owner = history_owner
+
+    def get_reader(self):
+        """
+        The reader to use, loading the shared one if none was given.
+        """
+        return self.reader if self.reader is not None else load_ocr_reader()
+
+    def ocr(self, image: Union[Image.Image, np.ndarray]):
+        """
+        Returns:
+            (text or "[...]" error marker, per-stage timings in ms)
+        """
+        status = get_warmup_status()
+        status.note_request()
+        if self.reader is None and self.service is not None:
+            text, timings = self._remote_ocr(image)
+        else:
+            text, timings = run_ocr(image, self.get_reader, self.config.preprocess, self.on_event,
+                                    self.config.quality_gate)
+        status.record_scan(not is_ocr_failure(text))
+        return text, timings
+
+    def _remote_ocr(self, image: Union[Image.Image, np.ndarray]):
+        self._notify('ocr.readtext', 'start')
+        try:
+            return self.service.ocr(image, self.config.preprocess)
+        except ServiceUnavailableError:
+            return SERVICE_UNAVAILABLE_TEXT, {}
+        except ServiceError as e:
+            return f"[OCR Error: {e}]", {}
+        finally:
+            self._notify('ocr.readtext', 'end')
+
+    def analyze(self, user_profile: Dict[str, str], text: str) -> Dict:
+        previous = self._history_by_text(user_profile, text)
+        if previous is not None:
+            return previous
+        self._notify('analysis', 'start')
+        try:
+            return analyze_safety(user_profile, text, client=self.client, service=self._analysis_service())
+        finally:
+            self._notify('analysis', 'end')
+
+    def analyze_stream(self, user_profile: Dict[str, str], text: str) -> Iterator[Dict]:
+        """
+        Partial results as they stream in; the last item is the final result.
+        """
+        previous = self._history_by_text(user_profile, text)
+        if previous is not None:
+            yield previous
+            return
+        self._notify('analysis', 'start')
+        try:
+            yield from analyze_safety_stream(user_profile, text, client=self.client,
+                                             service=self._analysis_service())
+        finally:
+            self._notify('analysis', 'end')
+
+    def _analysis_service(self):
+        return self.service if self.client is None else None
+
+    def scan(self, image: Union[Image.Image, np.ndarray], user_profile: Dict[str, str]) -> ScanResult:
+        """
+        OCR an image and analyze its text (blocking, no streaming).
+
+        A photo already in the scan history (same profile, model and prompt)
+        is answered from there without OCR or analysis.
+        """
+        start = time.perf_counter()
+        digest = image_hash(image) if self.history is not None else None
+        previous = self.reopen(digest, user_profile)
+        if previous is not None:
+            return ScanResult(previous.ocr_text, previous.timings, previous.reopened_result(),
+                              (time.perf_counter() - start) * 1000, reopened=True)
+        text, timings = self.ocr(image)
+        analysis = unreadable_label_result(text) if is_ocr_failure(text) else self.analyze(user_profile, text)
+        self.remember(digest, user_profile, text, timings, analysis)
+        return ScanResult(text, timings, analysis, (time.perf_counter() - start) * 1000)
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # Scan history
+    # ═══════════════════════════════════════════════════════════════════════
+    def reopen(self, image_digest: Optional[str], user_profile: Dict[str, str]) -> Optional[HistoryEntry]:
+        """
+        The recorded scan of this photo (see core.history.image_hash), if any.
+        """
+        if self.history is None or image_digest is None:
+            return None
+        with span('history.lookup'):
+            return self.history.find_by_image(image_digest, user_profile)
+
+    def remember(self, image_digest: Optional[str], user_profile: Dict[str, str], text: str,
+                 timings: Optional[Dict[str, float]], analysis: Optional[Dict]) -> bool:
+        """
+        Queue a finished scan for the history (OCR failures and rule
+        fallbacks are skipped).
+
+        Returns:
+            True if it was queued
+        """
+        if (self.history is None or not analysis or is_ocr_failure(text)
+                or analysis.get('source') not in HISTORY_SOURCES):
+            return False
+        return self.history.record(HistoryEntry.for_scan(image_digest, user_profile, text, analysis, timings,
+                                                         owner=self.history_owner))
+
+    def _history_by_text(self, user_profile: Dict[str, str], text: str) -> Optional[Dict]:
+        """
+        Result recorded for the same label text (another photo of the product).
+        """
+        if self.history is None:
+            return None
+        with span('history.lookup'):
+            previous = self.history.find_by_text(text, user_profile)
+        return previous.reopened_result() if previous is not None else None
+
+    def _notify(self, stage: str, state: str) -> None:
+        if self.on_event is not None:
+            self.on_event(stage, state)
+
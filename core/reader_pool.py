@@ -0,0 +1,319 @@
+"""
+In-process pool of OCR reader replicas for concurrent CPU inference.
+
+An EasyOCR reader is not safe to call from several threads at once, so a
+single shared reader has to serialize every scan. ReaderPool holds up to K
+independent replicas; each readtext checks one out, runs on it alone and
+checks it back in:
+
+- K is derived from a memory budget and the core count (plan_replicas), and
+  lowered once the memory of the replicas actually built has been measured;
+- replicas are built on demand, so an idle app holds only one;
+- callers are served first come, first served, and one waiting longer
+  than checkout_timeout_seconds gets OCRBusyError;
+- a replica whose readtext raised is discarded and rebuilt on demand, and
+  reload() retires every replica built before it (e.g. after new models
+  were installed) as soon as it is checked in.
+
+ReaderPool.readtext matches easyocr.Reader.readtext, so the pool can be used
+anywhere a reader is expected (see load_ocr_reader).
+"""
+
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from .metrics import get_metrics
+from .ocr_pool import OCRBusyError
+
+logger = logging.getLogger(__name__)
+
+
+def plan_replicas(memory_budget_mb: float, replica_memory_mb: float, cores: Optional[int] = None) -> int:
+    """
+    Replicas that fit the memory budget, at most one per core (at least one).
+    """
+    cores = cores or os.cpu_count() or 1
+    return max(1, min(cores, int(memory_budget_mb // max(1.0, replica_memory_mb))))
+
+
+def _rss_mb() -> Optional[float]:
+    """
+    Resident set size of this process in MB (Linux only, else None).
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _Replica:
+    __slots__ = ('index', 'reader', 'version', 'uses')
+
+    def __init__(self, index: int, reader: Any, version: int):
+        self.index = index
+        self.reader = reader
+        self.version = version
+        self.uses = 0
+
+
+class ReaderPool:
+    """
+    Thread-safe checkout/checkin pool of reader replicas.
+
+    Args:
+        reader_factory: Callable building one reader
+        replicas: Most replicas to hold (0 = plan_replicas from the budget)
+        memory_budget_mb: Memory all replicas together may use
+        replica_memory_mb: Estimated memory per replica until one has been measured
+        checkout_timeout_seconds: Longest a caller waits for a free replica
+        cores: CPU cores to plan for (defaults to os.cpu_count())
+    """
+
+    def __init__(self, reader_factory: Callable[[], Any], replicas: int = 0, memory_budget_mb: float = 1500.0,
+                 replica_memory_mb: float = 450.0, checkout_timeout_seconds: float = 30.0,
+                 cores: Optional[int] = None):
+        self.reader_factory = reader_factory
+        self.memory_budget_mb = memory_budget_mb
+        self.replica_memory_mb = replica_memory_mb
+        self.checkout_timeout_seconds = checkout_timeout_seconds
+        self.cores = cores or os.cpu_count() or 1
+        self.max_replicas = replicas if replicas > 0 else plan_replicas(memory_budget_mb, replica_memory_mb,
+                                                                         self.cores)
+        self._sized_by_budget = replicas <= 0
+        self.version = 0
+        self.warm: Optional[Callable[[Any], Any]] = None
+        self.first_replica_mb: Optional[float] = None
+        self._cond = threading.Condition()
+        self._idle: List[_Replica] = []
+        self._waiters: Deque[object] = deque()
+        self._size = 0  # Replicas built, being built or checked out
+        self._busy = 0
+        self._indexes = itertools.count()
+        self._counts = {'checkouts': 0, 'waits': 0, 'timeouts': 0, 'built': 0, 'failed': 0, 'retired': 0}
+
+    @property
+    def threads_per_replica(self) -> int:
+        """
+        Intra-op threads each replica may use without oversubscribing the cores.
+        """
+        return max(1, self.cores // self.max_replicas)
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # Lifecycle
+    # ═══════════════════════════════════════════════════════════════════════
+    def start(self) -> 'ReaderPool':
+        """
+        Build the first replica, so a reader that cannot load fails here.
+        """
+        with self._cond:
+            if self._size:
+                return self
+            self._size += 1
+        self.checkin(self._build())
+        return self
+
+    def fill(self, warm: Optional[Callable[[Any], Any]] = None) -> int:
+        """
+        Build replicas up to max_replicas, e.g. in the background after start.
+
+        Args:
+            warm: Called with every replica built from now on (a dummy inference)
+
+        Returns:
+            Replicas built
+        """
+        if warm is not None:
+            self.warm = warm
+        built = 0
+        while True:
+            with self._cond:
+                if self._size >= self.max_replicas:
+                    return built
+                self._size += 1
+            self.checkin(self._build())
+            built += 1
+
+    def reload(self) -> None:
+        """
+        Retire every current replica; new ones are built from reader_factory on demand.
+        """
+        with self._cond:
+            self.version += 1
+            retired, self._idle = self._idle, []
+            self._size -= len(retired)
+            self._counts['retired'] += len(retired)
+            self._cond.notify_all()
+        logger.info("OCR reader pool reloaded (version %d); %d idle replicas retired", self.version, len(retired))
+
+    def close(self) -> None:
+        """
+        Drop the idle replicas (checked-out ones are dropped at checkin).
+        """
+        self.reload()
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # Checkout / checkin
+    # ═══════════════════════════════════════════════════════════════════════
+    def checkout(self, timeout: Optional[float] = None) -> _Replica:
+        """
+        Take an idle replica, building one if the pool is below max_replicas.
+
+        Raises:
+            OCRBusyError: No replica became free within the timeout
+            Exception: Building a new replica failed
+        """
+        timeout = self.checkout_timeout_seconds if timeout is None else timeout
+        start = time.monotonic()
+        ticket = object()
+        with self._cond:
+            self._counts['checkouts'] += 1
+            # First come, first served: a thread checking a replica in and straight
+            # out again queues behind the threads already waiting
+            self._waiters.append(ticket)
+            try:
+                while self._waiters[0] is not ticket or not (self._idle or self._size < self.max_replicas):
+                    remaining = start + timeout - time.monotonic()
+                    if remaining <= 0:
+                        self._counts['timeouts'] += 1
+                        raise OCRBusyError(f"no OCR reader free after {timeout:.0f}s")
+                    self._cond.wait(remaining)
+            finally:
+                self._waiters.remove(ticket)
+                self._cond.notify_all()
+            if self._idle:
+                replica = self._idle.pop()
+            else:
+                replica = None
+                self._size += 1
+            self._busy += 1
+            waited = time.monotonic() - start
+            if waited > 0.001:
+                self._counts['waits'] += 1
+        get_metrics().observe('ocr.reader_wait', waited)
+        if replica is None:
+            try:
+                replica = self._build()
+            except Exception:
+                with self._cond:
+                    self._busy -= 1
+                raise
+        replica.uses += 1
+        return replica
+
+    def checkin(self, replica: _Replica, failed: bool = False) -> None:
+        """
+        Return a replica; failed or outdated replicas are discarded instead.
+        """
+        with self._cond:
+            if replica.uses:
+                self._busy -= 1
+            if failed or replica.version != self.version:
+                self._size -= 1
+                self._counts['failed' if failed else 'retired'] += 1
+            else:
+                self._idle.append(replica)  # LIFO: the most recently used replica is the warmest
+            self._cond.notify_all()
+        if failed:
+            logger.warning("Discarded OCR reader replica %d after a failed readtext", replica.index)
+
+    @contextmanager
+    def replica(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        with pool.replica() as reader: ... (discarded if the block raises)
+        """
+        replica = self.checkout(timeout)
+        try:
+            yield replica.reader
+        except Exception:
+            self.checkin(replica, failed=True)
+            raise
+        self.checkin(replica)
+
+    def readtext(self, image, **kwargs) -> List:
+        """
+        easyocr.Reader.readtext on a checked-out replica.
+
+        Raises:
+            OCRBusyError: No replica became free in time
+        """
+        with self.replica() as reader:
+            return reader.readtext(image, **kwargs)
+
+    def _build(self) -> _Replica:
+        """
+        Build one replica; the caller has already counted it in _size.
+        """
+        with self._cond:
+            version = self.version
+        rss_before = _rss_mb()
+        try:
+            reader = self.reader_factory()
+            if self.warm is not None:
+                self.warm(reader)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify_all()
+            raise
+        rss_after = _rss_mb()
+        replica = _Replica(next(self._indexes), reader, version)
+        with self._cond:
+            self._counts['built'] += 1
+            if rss_before is not None and rss_after is not None:
+                self._fit_budget(rss_after - rss_before)
+        return replica
+
+    def _fit_budget(self, build_mb: float) -> None:
+        """
+        Lower max_replicas if the replicas built so far show the budget fits fewer.
+
+        The first build also pays for importing the runtime, so it is budgeted
+        separately from the per-replica cost of later ones. Caller holds _cond.
+        """
+        if not self._sized_by_budget:
+            return
+        if self.first_replica_mb is None:
+            self.first_replica_mb = build_mb
+        elif build_mb > self.replica_memory_mb:
+            self.replica_memory_mb = build_mb
+        fits = 1 + int(max(0.0, self.memory_budget_mb - self.first_replica_mb) // max(1.0, self.replica_memory_mb))
+        if fits < self.max_replicas:
+            logger.info("OCR reader pool limited to %d replicas by the %.0f MB budget (measured %.0f MB first, "
+                        "%.0f MB per extra replica)", max(fits, self._size), self.memory_budget_mb,
+                        self.first_replica_mb, self.replica_memory_mb)
+            self.max_replicas = max(fits, self._size, 1)
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # Stats
+    # ═══════════════════════════════════════════════════════════════════════
+    def stats(self) -> Dict[str, Any]:
+        """
+        Replica counts and checkout counters.
+        """
+        with self._cond:
+            return dict(
+                self._counts,
+                max_replicas=self.max_replicas,
+                replicas=self._size,
+                idle=len(self._idle),
+                busy=self._busy,
+                version=self.version,
+                threads_per_replica=self.threads_per_replica,
+                replica_memory_mb=self.replica_memory_mb,
+                first_replica_mb=self.first_replica_mb
+            )
+
+    def metric_samples(self):
+        stats = self.stats()
+        samples = [(f'ocr_readers_{key}', 'gauge', {}, stats[key])
+                   for key in ('max_replicas', 'replicas', 'idle', 'busy')]
+        for key in ('checkouts', 'waits', 'timeouts', 'built', 'failed', 'retired'):
+            samples.append((f'ocr_reader_{key}_total', 'counter', {}, stats[key]))
+        return samples
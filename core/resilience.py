@@ -0,0 +1,267 @@
+"""
+Retry, deadline, hedging and circuit breaker policy for remote calls.
+
+ResilientCaller wraps a callable that performs one attempt. Each attempt gets
+a deadline; retryable failures are retried with exponential backoff and full
+jitter; optionally a hedged duplicate is launched once an attempt runs past
+the observed latency percentile. A circuit breaker stops calls entirely while
+the remote side is unhealthy so callers can fall back to local analysis.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+RETRYABLE_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling out while the circuit breaker is open.
+    """
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when an attempt does not finish within its deadline.
+    """
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether an error is transient (timeouts, connection problems, 429/5xx).
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, 'code', None)
+    if not isinstance(code, int):
+        code = getattr(error, 'status_code', None)
+    if isinstance(code, int):
+        return code in RETRYABLE_STATUS_CODES
+    try:
+        import httpx
+        return isinstance(error, httpx.TransportError)
+    except ImportError:
+        return False
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after N consecutive failed calls; after reset_seconds one
+    trial call is let through (half-open) and its outcome closes or re-opens
+    the circuit.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go out now.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                # Let one trial through; re-arm the timer in case it never reports back
+                self._state = self.HALF_OPEN
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+
+class ResilientCaller:
+    """
+    Applies a resilience policy (see GEMINI_RESILIENCE in config/settings.py).
+
+    The wrapped callable receives the attempt's remaining deadline in seconds
+    so it can pass a matching timeout down to the HTTP layer.
+    """
+
+    def __init__(self, name: str, policy: Dict[str, Any]):
+        self.name = name
+        self.policy = dict(policy)
+        self.breaker = CircuitBreaker(
+            self.policy['breaker_failure_threshold'],
+            self.policy['breaker_reset_seconds']
+        )
+        self._latencies = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix=f"{name}-call")
+        self.stats = {'calls': 0, 'attempts': 0, 'retries': 0, 'hedges': 0, 'hedge_wins': 0,
+                      'failures': 0, 'short_circuited': 0}
+
+    def configure(self, policy: Dict[str, Any]) -> None:
+        """
+        Replace the policy and start over with a closed breaker and no history.
+        """
+        with self._lock:
+            self.policy = dict(self.policy, **policy)
+            self.breaker = CircuitBreaker(
+                self.policy['breaker_failure_threshold'],
+                self.policy['breaker_reset_seconds']
+            )
+            self._latencies.clear()
+            self.stats = dict.fromkeys(self.stats, 0)
+
+    def call(self, func: Callable[[float], Any]) -> Any:
+        """
+        Run func under the policy.
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+            Exception: The last error once retries are exhausted or on a
+                non-retryable error
+        """
+        if not self.breaker.allow():
+            self._bump('short_circuited')
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        self._bump('calls')
+
+        max_attempts = max(1, int(self.policy['max_attempts']))
+        for attempt in range(max_attempts):
+            if attempt:
+                self._bump('retries')
+                time.sleep(self._backoff(attempt))
+            try:
+                result = self._attempt(func)
+            except Exception as error:
+                if not is_retryable(error):
+                    raise
+                if attempt == max_attempts - 1:
+                    self._bump('failures')
+                    self.breaker.record_failure()
+                    raise
+                continue
+            self.breaker.record_success()
+            return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Counters plus breaker state and current hedge threshold.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        stats['breaker_state'] = self.breaker.state
+        stats['breaker_opened'] = self.breaker.times_opened
+        stats['hedge_after_seconds'] = self._hedge_delay()
+        return stats
+
+    def record_outcome(self, error: Optional[BaseException] = None) -> None:
+        """
+        Feed the breaker the result of a call made outside call() (e.g. a stream).
+        """
+        if error is None:
+            self.breaker.record_success()
+        elif is_retryable(error):
+            self._bump('failures')
+            self.breaker.record_failure()
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Internals
+    # ─────────────────────────────────────────────────────────────────────
+    def _bump(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += amount
+
+    def _backoff(self, attempt: int) -> float:
+        ceiling = min(self.policy['backoff_max_seconds'],
+                      self.policy['backoff_base_seconds'] * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)  # Full jitter
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.policy.get('hedge_enabled'):
+            return None
+        with self._lock:
+            samples = sorted(self._latencies)
+        floor = self.policy['hedge_min_delay_seconds']
+        if len(samples) < 20:
+            return floor
+        index = min(len(samples) - 1, int(len(samples) * self.policy['hedge_percentile']))
+        return max(floor, samples[index])
+
+    def _attempt(self, func: Callable[[float], Any]) -> Any:
+        deadline = self.policy['attempt_timeout_seconds']
+        start = time.monotonic()
+        self._bump('attempts')
+        futures = [self._executor.submit(self._run, func, start + deadline)]
+        pending = set(futures)
+        try:
+            hedge_delay = self._hedge_delay()
+            if hedge_delay is not None and hedge_delay < deadline:
+                done, _ = wait(futures, timeout=hedge_delay)
+                if not done:
+                    self._bump('hedges')
+                    futures.append(self._executor.submit(self._run, func, start + deadline))
+                    pending.add(futures[-1])
+
+            last_error = None
+            while pending:
+                remaining = deadline - (time.monotonic() - start)
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        result = future.result()
+                    except Exception as error:
+                        last_error = error
+                        continue
+                    if future is not futures[0]:
+                        self._bump('hedge_wins')
+                    with self._lock:
+                        self._latencies.append(time.monotonic() - start)
+                    return result
+
+            if last_error is not None and not pending:
+                raise last_error
+            raise DeadlineExceeded(f"{self.name} attempt exceeded {deadline:.1f}s deadline")
+        finally:
+            # Losers and late starters: a call still queued must not run after nobody waits for it
+            for future in pending:
+                future.cancel()
+
+    def _run(self, func: Callable[[float], Any], end: float) -> Any:
+        """
+        Call func with what is left of the attempt deadline (queueing in the
+        executor counts against it).
+        """
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"{self.name} attempt started after its deadline")
+        return func(remaining)
@@ -0,0 +1,117 @@
+"""
+Process-wide cache of expensive shared resources (OCR reader, Gemini client).
+
+Replaces st.cache_resource for code that must run without Streamlit: each
+resource is built once per process by its factory, under a per-name lock so
+concurrent first users wait for one build instead of starting several. A
+failed build is remembered (the resource is None and error() returns the
+exception) until the resource is dropped, so a missing model is not
+reloaded on every scan.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class ResourceCache:
+    """
+    Thread-safe, lazily built named singletons.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._values: Dict[str, Any] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._load_seconds: Dict[str, float] = {}
+
+    def get(self, name: str, factory: Callable[[], Any]) -> Optional[Any]:
+        """
+        Return the named resource, building it with factory on first use.
+
+        Returns:
+            The resource, or None if its factory raised
+        """
+        if name in self._values:
+            return self._values[name]
+        with self._lock:
+            build_lock = self._build_locks.setdefault(name, threading.Lock())
+        with build_lock:
+            if name not in self._values:
+                start = time.perf_counter()
+                try:
+                    value = factory()
+                except Exception as e:
+                    value = None
+                    self._errors[name] = e
+                self._load_seconds[name] = time.perf_counter() - start
+                self._values[name] = value
+        return self._values[name]
+
+    def peek(self, name: str) -> Optional[Any]:
+        """
+        Return the resource if it has been built, without building it.
+        """
+        return self._values.get(name)
+
+    def loaded(self, name: str) -> bool:
+        """
+        True once a build has finished (successfully or not).
+        """
+        return name in self._values
+
+    def put(self, name: str, value: Any) -> None:
+        """
+        Install a resource built elsewhere (e.g. a stub in benchmarks).
+        """
+        with self._lock:
+            self._values[name] = value
+            self._errors.pop(name, None)
+
+    def error(self, name: str) -> Optional[Exception]:
+        """
+        The exception from the last failed build, if any.
+        """
+        return self._errors.get(name)
+
+    def drop(self, name: str) -> None:
+        """
+        Forget a resource (closing it if it has close()) so the next get rebuilds it.
+        """
+        with self._lock:
+            value = self._values.pop(name, None)
+            self._errors.pop(name, None)
+            self._load_seconds.pop(name, None)
+        close = getattr(value, 'close', None)
+        if callable(close):
+            try:
+                close()
+            except Exception:
+                pass
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Per-resource load state and build time, for display.
+        """
+        with self._lock:
+            names = sorted(self._values)
+            return [
+                {
+                    'name': name,
+                    'available': self._values[name] is not None,
+                    'load_seconds': self._load_seconds.get(name, 0.0),
+                    'error': str(self._errors[name]) if name in self._errors else ''
+                }
+                for name in names
+            ]
+
+
+_resources = ResourceCache()
+
+
+def get_resources() -> ResourceCache:
+    """
+    Return the process-wide resource cache.
+    """
+    return _resources
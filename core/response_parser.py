@@ -0,0 +1,146 @@
+"""
+Validation and repair of Gemini analysis responses.
+
+Responses are requested with a JSON schema (see ANALYSIS_RESPONSE_SCHEMA), but
+fenced, prose-wrapped or truncated replies still happen. parse_analysis_response
+repairs what it can and validates into an AnalysisResult, so a recoverable
+reply no longer turns into a generic CAUTION result and a rescan.
+"""
+
+import json
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List
+from .json_stream import parse_partial_json, strip_code_fences
+
+VALID_STATUSES = ('SAFE', 'CAUTION', 'DANGER')
+DEFAULT_RECOMMENDATION = "Please consult a pharmacist before using this product."
+
+
+class ResponseParseError(ValueError):
+    """
+    Raised when a response cannot be repaired into a valid analysis result.
+    """
+
+
+@dataclass
+class AnalysisResult:
+    """
+    Typed analysis result matching the status/summary/details/... structure.
+    """
+    status: str
+    summary: str
+    details: List[str] = field(default_factory=list)
+    recommendation: str = DEFAULT_RECOMMENDATION
+    compounding_suggested: bool = False
+    compounding_note: str = ""
+    repaired: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Any, repaired: bool = False) -> 'AnalysisResult':
+        """
+        Validate and coerce a parsed JSON value.
+
+        Raises:
+            ResponseParseError: If status is missing or invalid
+        """
+        if not isinstance(data, dict):
+            raise ResponseParseError(f"Expected a JSON object, got {type(data).__name__}")
+
+        status = str(data.get('status', '')).strip().upper()
+        if status not in VALID_STATUSES:
+            raise ResponseParseError(f"Invalid or missing status: {data.get('status')!r}")
+
+        details = data.get('details', [])
+        if isinstance(details, str):
+            details = [details]
+        elif not isinstance(details, list):
+            details = []
+
+        missing = [key for key in ('summary', 'recommendation') if not data.get(key)]
+        compounding = data.get('compounding_suggested', False)
+        if isinstance(compounding, str):
+            compounding = compounding.strip().lower() == 'true'
+
+        return cls(
+            status=status,
+            summary=str(data.get('summary') or f"Analysis result: {status}"),
+            details=[str(detail) for detail in details if detail],
+            recommendation=str(data.get('recommendation') or DEFAULT_RECOMMENDATION),
+            compounding_suggested=bool(compounding),
+            compounding_note=str(data.get('compounding_note') or ""),
+            repaired=repaired or bool(missing)
+        )
+
+    def to_dict(self) -> Dict:
+        result = asdict(self)
+        if not self.repaired:
+            del result['repaired']
+        return result
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Parse outcome counters (parsed cleanly / repaired / failed)
+# ═══════════════════════════════════════════════════════════════════════════
+_stats_lock = threading.Lock()
+_parse_stats = {'parsed': 0, 'repaired': 0, 'failed': 0}
+
+
+def _count(outcome: str) -> None:
+    with _stats_lock:
+        _parse_stats[outcome] += 1
+
+
+def get_parse_stats() -> Dict[str, float]:
+    """
+    Snapshot of parse outcome counters and the failure rate.
+    """
+    with _stats_lock:
+        stats = dict(_parse_stats)
+    total = sum(stats.values())
+    stats['failure_rate'] = stats['failed'] / total if total else 0.0
+    return stats
+
+
+def parse_analysis_response(response_text: str) -> AnalysisResult:
+    """
+    Parse a Gemini reply into a validated AnalysisResult.
+
+    Tries, in order: strict JSON, the JSON object embedded in surrounding
+    prose or code fences, and repair of a truncated document.
+
+    Args:
+        response_text: Raw response from Gemini
+
+    Returns:
+        AnalysisResult (repaired=True if anything had to be fixed up)
+
+    Raises:
+        ResponseParseError: If no valid result can be recovered
+    """
+    text = strip_code_fences(response_text or '')
+    try:
+        result = AnalysisResult.from_dict(json.loads(text))
+        _count('repaired' if result.repaired else 'parsed')
+        return result
+    except (ValueError, ResponseParseError):
+        pass
+
+    # Embedded object: prose before/after, or fences mid-text
+    start, end = text.find('{'), text.rfind('}')
+    if start != -1 and end > start:
+        try:
+            result = AnalysisResult.from_dict(json.loads(text[start:end + 1]), repaired=True)
+            _count('repaired')
+            return result
+        except (ValueError, ResponseParseError):
+            pass
+
+    # Truncated reply (e.g. max_output_tokens hit mid-string)
+    try:
+        result = AnalysisResult.from_dict(parse_partial_json(text), repaired=True)
+        _count('repaired')
+        return result
+    except ResponseParseError as e:
+        _count('failed')
+        raise ResponseParseError(f"Unrecoverable response: {e}") from e
@@ -0,0 +1,340 @@
+"""
+Data-driven keyword rule engine used for demo-mode analysis.
+
+Rules live in a JSON file (config/rules.json). Every label trigger term of
+every rule is compiled into one Aho-Corasick automaton, so a label is scanned
+in a single pass regardless of how many rules exist, and every triggered rule
+is reported along with the positions it matched.
+"""
+
+import json
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from config.settings import DEMO_RULES_PATH
+
+STATUS_SEVERITY = {'SAFE': 0, 'CAUTION': 1, 'DANGER': 2}
+
+
+class AhoCorasick:
+    """
+    Multi-pattern string matcher (Aho-Corasick automaton).
+
+    Patterns are matched case-insensitively. With whole_words=True a match
+    must start at a word boundary and end at one, optionally after a plural
+    "s"/"es" suffix ("peanut" matches "peanuts" but not "peanutty"). A
+    pattern ending in "*" only needs to start a word ("color*" matches
+    "colored" and "coloring"); patterns holds it without the "*".
+    """
+
+    def __init__(self, patterns: List[str], whole_words: bool = True):
+        self.prefix = [p.endswith('*') for p in patterns]
+        self.patterns = [p.rstrip('*').lower() for p in patterns]
+        self.whole_words = whole_words
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for index, pattern in enumerate(self.patterns):
+            if pattern:
+                self._insert(pattern, index)
+        self._build_failure_links()
+
+    def _insert(self, pattern: str, index: int) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(index)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                # Inherit outputs so each state lists every pattern ending there
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        Scan text once and yield every pattern occurrence.
+
+        Args:
+            text: Text to search
+
+        Yields:
+            (start, end, pattern_index) tuples, end exclusive
+        """
+        text = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                end = position + 1
+                start = end - len(self.patterns[index])
+                if not self.whole_words or _at_word_boundaries(text, start, end, self.prefix[index]):
+                    yield start, end, index
+
+
+def _at_word_boundaries(text: str, start: int, end: int, prefix: bool = False) -> bool:
+    if start > 0 and text[start - 1].isalnum():
+        return False
+    if prefix:
+        return True
+    for suffix in ('', 's', 'es'):
+        stop = end + len(suffix)
+        if text[end:stop] == suffix and (stop >= len(text) or not text[stop].isalnum()):
+            return True
+    return False
+
+
+@dataclass
+class Rule:
+    """
+    One allergen, interaction or condition rule loaded from the rules file.
+    """
+    id: str
+    category: str
+    status: str
+    profile_field: str
+    profile_terms: List[str]
+    label_terms: List[str]
+    summary: str
+    details: List[str]
+    recommendation: str
+    compounding_suggested: bool = False
+    compounding_note: str = ''
+    priority: int = 0
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Rule':
+        return cls(
+            id=data['id'],
+            category=data.get('category', 'general'),
+            status=data.get('status', 'CAUTION'),
+            profile_field=data['profile_field'],
+            profile_terms=list(data['profile_terms']),
+            label_terms=list(data['label_terms']),
+            summary=data['summary'],
+            details=list(data.get('details', [])),
+            recommendation=data['recommendation'],
+            compounding_suggested=bool(data.get('compounding_suggested', False)),
+            compounding_note=data.get('compounding_note', ''),
+            priority=int(data.get('priority', 0))
+        )
+
+
+@dataclass
+class RuleMatch:
+    """
+    A triggered rule with every label position that triggered it.
+    """
+    rule: Rule
+    matches: List[Dict] = field(default_factory=list)
+
+    @property
+    def first_term(self) -> str:
+        return self.matches[0]['term'] if self.matches else ''
+
+
+class RuleEngine:
+    """
+    Evaluates a user profile and label text against a compiled rule set.
+    """
+
+    def __init__(self, rules: List[Rule], default_response: Dict):
+        self.rules = rules
+        self.default_response = default_response
+
+        # Label side: one automaton over every trigger term of every rule
+        self._label_terms = []
+        self._label_term_rules = []
+        term_index = {}
+        for rule_index, rule in enumerate(rules):
+            for term in rule.label_terms:
+                key = term.lower()
+                if key not in term_index:
+                    term_index[key] = len(self._label_terms)
+                    self._label_terms.append(key)
+                    self._label_term_rules.append([])
+                self._label_term_rules[term_index[key]].append(rule_index)
+        self._label_automaton = AhoCorasick(self._label_terms, whole_words=True)
+
+        # Profile side: substring match of profile terms, grouped by field
+        self._profile_automata = {}
+        for profile_field in {rule.profile_field for rule in rules}:
+            terms, owners = [], []
+            for rule_index, rule in enumerate(rules):
+                if rule.profile_field == profile_field:
+                    for term in rule.profile_terms:
+                        terms.append(term)
+                        owners.append(rule_index)
+            self._profile_automata[profile_field] = (AhoCorasick(terms, whole_words=False), owners)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'RuleEngine':
+        """
+        Load and compile rules from a JSON file.
+
+        Args:
+            path: Path to the rules file
+
+        Returns:
+            Compiled RuleEngine
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        rules = [Rule.from_dict(item) for item in data['rules']]
+        return cls(rules, data['default_response'])
+
+    def active_rules(self, user_profile: Dict[str, str]) -> set:
+        """
+        Indexes of rules whose profile terms appear in the user's profile.
+        """
+        active = set()
+        for profile_field, (automaton, owners) in self._profile_automata.items():
+            value = user_profile.get(profile_field) or ''
+            for _, _, term_index in automaton.iter_matches(value):
+                active.add(owners[term_index])
+        return active
+
+    def match(self, user_profile: Dict[str, str], scanned_text: str,
+              extra_terms: Iterable[Tuple[str, int, int]] = ()) -> List[RuleMatch]:
+        """
+        Find every rule triggered by this profile and label.
+
+        Args:
+            user_profile: User's medical profile
+            scanned_text: Scanned product text
+            extra_terms: (term, start, end) spans of scanned_text known to read
+                as term (e.g. "Red4O" -> "red 40"); matched as if the label said term
+
+        Returns:
+            RuleMatch list ordered by severity, then priority
+        """
+        active = self.active_rules(user_profile)
+        if not active:
+            return []
+
+        found = list(self._label_automaton.iter_matches(scanned_text))
+        for term, start, end in extra_terms:
+            found.extend((start, end, term_index) for term_start, term_end, term_index
+                         in self._label_automaton.iter_matches(term)
+                         if term_start == 0 and term_end == len(term))
+        found.sort()
+
+        triggered = {}
+        for start, end, term_index in found:
+            for rule_index in self._label_term_rules[term_index]:
+                if rule_index in active:
+                    if rule_index not in triggered:
+                        triggered[rule_index] = RuleMatch(self.rules[rule_index])
+                    triggered[rule_index].matches.append({
+                        'term': self._label_automaton.patterns[term_index],
+                        'start': start,
+                        'end': end
+                    })
+
+        return sorted(
+            triggered.values(),
+            key=lambda m: (-STATUS_SEVERITY.get(m.rule.status, 1), -m.rule.priority, m.rule.id)
+        )
+
+    def evaluate(self, user_profile: Dict[str, str], scanned_text: str,
+                 extra_terms: Iterable[Tuple[str, int, int]] = ()) -> Dict:
+        """
+        Build an analysis result dict from the triggered rules.
+
+        The most severe rule supplies the summary and recommendation; the
+        other triggered rules are appended to details.
+
+        Args:
+            user_profile: User's medical profile
+            scanned_text: Scanned product text
+            extra_terms: (term, start, end) readings of spans, as for match
+
+        Returns:
+            Analysis result dict (status, summary, details, recommendation,
+            compounding_suggested, compounding_note, triggered_rules)
+        """
+        matches = self.match(user_profile, scanned_text, extra_terms)
+        if not matches:
+            result = dict(self.default_response)
+            result['details'] = list(result.get('details', []))
+            result['triggered_rules'] = []
+            return result
+
+        primary = matches[0]
+        fields = _TemplateFields(user_profile, primary.first_term)
+        details = [line.format_map(fields) for line in primary.rule.details]
+        for extra in matches[1:]:
+            extra_fields = _TemplateFields(user_profile, extra.first_term)
+            details.append(extra.rule.summary.format_map(extra_fields))
+
+        compounding = next((m for m in matches if m.rule.compounding_suggested), None)
+        return {
+            "status": primary.rule.status,
+            "summary": primary.rule.summary.format_map(fields),
+            "details": details,
+            "recommendation": primary.rule.recommendation.format_map(fields),
+            "compounding_suggested": compounding is not None,
+            "compounding_note": compounding.rule.compounding_note if compounding else "",
+            "triggered_rules": [
+                {
+                    'id': m.rule.id,
+                    'category': m.rule.category,
+                    'status': m.rule.status,
+                    'matches': m.matches
+                }
+                for m in matches
+            ]
+        }
+
+
+class _TemplateFields(dict):
+    """
+    str.format_map source exposing profile fields and the matched term.
+    """
+
+    def __init__(self, user_profile: Dict[str, str], match: str):
+        super().__init__(
+            prescriptions=user_profile.get('prescriptions', ''),
+            allergies=user_profile.get('allergies', ''),
+            conditions=user_profile.get('conditions', ''),
+            match=match
+        )
+
+    def __missing__(self, key):
+        return '{' + key + '}'
+
+
+_engine: Optional[RuleEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_rule_engine() -> RuleEngine:
+    """
+    Return the process-wide rule engine compiled from DEMO_RULES_PATH.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RuleEngine.from_file(DEMO_RULES_PATH)
+    return _engine
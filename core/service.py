@@ -0,0 +1,226 @@
+"""
+Standalone scan service: one process holds the OCR models (or OCR pool) and
+the Gemini client and serves every UI replica over HTTP or a Unix socket.
+
+Endpoints (JSON responses):
+
+    GET  /healthz    process is up
+    GET  /readyz     200 once the OCR warm-up finished, 503 before (warm-up snapshot)
+    GET  /metrics    Prometheus text (when METRICS_ENABLED)
+    POST /ocr        image -> {"text", "timings"}
+    POST /analyze    {"profile", "text"} -> analysis; ?stream=1 streams NDJSON partials
+    POST /scan       image + X-Profile header -> {"text", "ocr_timings", "analysis", "total_ms"}
+
+Images are raw uint8 pixels (Content-Type application/octet-stream with an
+X-Image-Shape: "height,width[,channels]" header, as ServiceClient sends
+them) or an encoded image file (Content-Type image/*).
+
+Started with scan_service.py; see core/service_client.py for the client.
+"""
+
+import io
+import json
+import logging
+import os
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+from PIL import Image
+
+from config.settings import SCAN_SERVICE
+from .metrics import get_metrics, inc, span
+from .ocr_engine import OCR_READER_RESOURCE
+from .pipeline import ScanEngine
+from .resources import get_resources
+from .service_client import configure_service
+from .warmup import get_warmup_status, start_ocr_warmup
+
+logger = logging.getLogger(__name__)
+
+
+class _RequestError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ScanServiceHandler(BaseHTTPRequestHandler):
+    """
+    Request handler; one thread per connection, connections kept alive.
+    """
+    protocol_version = 'HTTP/1.1'
+    server_version = 'ContraScanService/1.0'
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == '/healthz':
+            self._send_json(200, {'status': 'ok', 'pid': os.getpid()})
+        elif path == '/readyz':
+            status = get_warmup_status()
+            self._send_json(200 if status.ready else 503, status.snapshot())
+        elif path == '/metrics':
+            payload = get_metrics().render_prometheus().encode('utf-8')
+            self._send(200, payload, 'text/plain; version=0.0.4; charset=utf-8')
+        else:
+            self._send_json(404, {'error': f"unknown path {path}"})
+
+    def do_POST(self):
+        parts = urlsplit(self.path)
+        try:
+            body = self._read_body()
+            if parts.path == '/ocr':
+                inc('service_requests_total', endpoint='ocr')
+                with span('service.ocr'):
+                    text, timings = self.server.engine.ocr(_decode_image(self.headers, body))
+                self._send_json(200, {'text': text, 'timings': timings})
+            elif parts.path == '/analyze':
+                inc('service_requests_total', endpoint='analyze')
+                request = _decode_json(body)
+                profile, text = request.get('profile') or {}, request.get('text') or ''
+                if parse_qs(parts.query).get('stream', ['0'])[0] == '1':
+                    self._send_stream(self.server.engine.analyze_stream(profile, text))
+                else:
+                    with span('service.analyze'):
+                        self._send_json(200, self.server.engine.analyze(profile, text))
+            elif parts.path == '/scan':
+                inc('service_requests_total', endpoint='scan')
+                profile = _decode_json(self.headers.get('X-Profile', '{}').encode('utf-8'))
+                with span('service.scan'):
+                    result = self.server.engine.scan(_decode_image(self.headers, body), profile)
+                self._send_json(200, {'text': result.text, 'ocr_timings': result.ocr_timings,
+                                      'analysis': result.analysis, 'total_ms': result.total_ms})
+            else:
+                self._send_json(404, {'error': f"unknown path {parts.path}"})
+        except _RequestError as e:
+            self._send_json(e.status, {'error': str(e)})
+        except Exception as e:
+            logger.exception("Scan service request %s failed", parts.path)
+            self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+
+    def _read_body(self) -> bytes:
+        length = self.headers.get('Content-Length')
+        if length is None:
+            raise _RequestError(411, "Content-Length required")
+        length = int(length)
+        if length > SCAN_SERVICE['max_request_bytes']:
+            self.close_connection = True  # The unread body would corrupt the next request
+            raise _RequestError(413, f"request body over {SCAN_SERVICE['max_request_bytes']} bytes")
+        return self.rfile.read(length)
+
+    def _send(self, status: int, payload: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode('utf-8'), 'application/json')
+
+    def _send_stream(self, items: Iterable[Dict]) -> None:
+        """
+        Newline-delimited JSON, one chunk per item as it is produced.
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for item in items:
+                self._write_chunk(item)
+        except Exception as e:
+            # Headers are out; report the failure as the last line instead
+            logger.exception("Scan service stream failed")
+            self._write_chunk({'error': f"{type(e).__name__}: {e}"})
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _write_chunk(self, item: Dict) -> None:
+        line = json.dumps(item, ensure_ascii=False).encode('utf-8') + b'\n'
+        self.wfile.write(f"{len(line):x}\r\n".encode('ascii') + line + b'\r\n')
+        self.wfile.flush()
+
+    def address_string(self) -> str:
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def _decode_image(headers, body: bytes):
+    content_type = headers.get('Content-Type', '')
+    if content_type.startswith('image/'):
+        try:
+            return Image.open(io.BytesIO(body))  # Decoded (reduced) by preprocess_image
+        except Exception as e:
+            raise _RequestError(400, f"cannot decode image: {e}")
+    try:
+        shape = tuple(int(size) for size in headers.get('X-Image-Shape', '').split(','))
+        return np.frombuffer(body, dtype=np.uint8).reshape(shape)
+    except ValueError as e:
+        raise _RequestError(400, f"bad raw image (X-Image-Shape {headers.get('X-Image-Shape')!r}): {e}")
+
+
+def _decode_json(body: bytes) -> Dict:
+    try:
+        payload = json.loads(body or b'{}')
+    except ValueError as e:
+        raise _RequestError(400, f"invalid JSON: {e}")
+    if not isinstance(payload, dict):
+        raise _RequestError(400, "expected a JSON object")
+    return payload
+
+
+class _ServiceMixin:
+    daemon_threads = True
+    engine: ScanEngine
+
+
+class ScanHTTPServer(_ServiceMixin, ThreadingHTTPServer):
+    pass
+
+
+class ScanUnixServer(_ServiceMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)  # Left over from a previous run
+        super().server_bind()
+
+
+def make_server(host: str = SCAN_SERVICE['host'], port: int = SCAN_SERVICE['port'],
+                socket_path: Optional[str] = None):
+    """
+    Build the service (not yet serving) and start the OCR warm-up.
+
+    Returns:
+        ScanHTTPServer, or ScanUnixServer when socket_path is given
+    """
+    configure_service(None)  # Run everything locally, never forward to ourselves
+    if socket_path:
+        server = ScanUnixServer(socket_path, ScanServiceHandler)
+    else:
+        server = ScanHTTPServer((host, port), ScanServiceHandler)
+    server.engine = ScanEngine()  # load_ocr_reader's pools are safe to share across request threads
+    start_ocr_warmup()
+    return server
+
+
+def serve(host: str = SCAN_SERVICE['host'], port: int = SCAN_SERVICE['port'],
+          socket_path: Optional[str] = None) -> None:
+    """
+    Run the service until interrupted, then release the OCR reader / pool.
+    """
+    server = make_server(host, port, socket_path)
+    address = socket_path or f"http://{server.server_address[0]}:{server.server_address[1]}"
+    logger.info("Scan service listening on %s", address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+        get_resources().drop(OCR_READER_RESOURCE)
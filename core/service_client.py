@@ -0,0 +1,241 @@
+"""
+Client for the standalone scan service (scan_service.py, core/service.py).
+
+With SCAN_SERVICE_URL set, ScanEngine, extract_text_from_image and
+analyze_safety send their work here instead of loading models in the
+calling process. Images are shrunk locally first (reduce_image: decode,
+rotate, downscale, grayscale) and sent as raw pixels, so a 12 MP photo
+crosses the wire as ~2 MB and the service does not decode JPEGs.
+
+Connections are kept alive, one per calling thread.
+"""
+
+import http.client
+import json
+import socket
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import numpy as np
+from PIL import Image
+
+from config.settings import OCR_PREPROCESS_CONFIG, SCAN_SERVICE, SCAN_SERVICE_URL
+from .image_preprocessing import reduce_image
+
+SERVICE_UNAVAILABLE_TEXT = "[OCR service unavailable]"
+
+
+class ServiceUnavailableError(ConnectionError):
+    """
+    The scan service could not be reached (or dropped the connection).
+    """
+
+
+class ServiceError(RuntimeError):
+    """
+    The scan service answered with an error status.
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"scan service returned {status}: {message}")
+        self.status = status
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class ServiceClient:
+    """
+    HTTP client for one scan service.
+
+    Args:
+        url: http://host:port or unix:///path/to.sock
+        timeout_seconds: Limit for one request
+    """
+
+    def __init__(self, url: str, timeout_seconds: float = SCAN_SERVICE['timeout_seconds']):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'unix'):
+            raise ValueError(f"Unsupported scan service URL {url!r} (expected http:// or unix://)")
+        self.url = url
+        self.timeout_seconds = timeout_seconds
+        self._scheme, self._netloc, self._path = parts.scheme, parts.netloc, parts.path
+        self._local = threading.local()
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # Endpoints
+    # ═══════════════════════════════════════════════════════════════════════
+    def health(self) -> Dict:
+        return self._json('GET', '/healthz')
+
+    def ready(self) -> Tuple[bool, Dict]:
+        """
+        Returns:
+            (ready, the service's warm-up snapshot)
+        """
+        status, payload = self._call('GET', '/readyz')
+        return status == 200, payload
+
+    def ocr(self, image: Union[Image.Image, np.ndarray], preprocess_config: Optional[Dict] = None):
+        """
+        Returns:
+            (text or "[...]" error marker, per-stage timings in ms) like run_ocr
+        """
+        body, headers, timings = _encode_image(image, preprocess_config)
+        start = time.perf_counter()
+        payload = self._json('POST', '/ocr', body, headers)
+        timings.update(payload.get('timings', {}))
+        timings['service_roundtrip'] = (time.perf_counter() - start) * 1000
+        return payload['text'], timings
+
+    def analyze(self, user_profile: Dict[str, str], text: str) -> Dict:
+        return self._json('POST', '/analyze', *_encode_json({'profile': user_profile, 'text': text}))
+
+    def analyze_stream(self, user_profile: Dict[str, str], text: str) -> Iterator[Dict]:
+        """
+        Partial results as the service streams them; the last item is the final result.
+        """
+        body, headers = _encode_json({'profile': user_profile, 'text': text})
+        response = self._send('POST', '/analyze?stream=1', body, headers)
+        if response.status != 200:
+            self._raise_for(response)
+        try:
+            for line in iter(response.readline, b''):
+                if line.strip():
+                    yield json.loads(line)
+        except (OSError, http.client.HTTPException) as e:
+            self._drop_connection()
+            raise ServiceUnavailableError(f"scan service stream broke: {e}") from e
+
+    def scan(self, image: Union[Image.Image, np.ndarray], user_profile: Dict[str, str],
+             preprocess_config: Optional[Dict] = None) -> Dict:
+        """
+        OCR and analysis in one round trip.
+
+        Returns:
+            {"text", "ocr_timings", "analysis", "total_ms"}
+        """
+        body, headers, timings = _encode_image(image, preprocess_config)
+        headers['X-Profile'] = json.dumps(user_profile)
+        payload = self._json('POST', '/scan', body, headers)
+        payload['ocr_timings'] = {**timings, **payload.get('ocr_timings', {})}
+        return payload
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # Transport
+    # ═══════════════════════════════════════════════════════════════════════
+    def _json(self, method: str, path: str, body: Optional[bytes] = None,
+              headers: Optional[Dict[str, str]] = None) -> Dict:
+        status, payload = self._call(method, path, body, headers)
+        if status != 200:
+            raise ServiceError(status, payload.get('error', ''))
+        return payload
+
+    def _call(self, method: str, path: str, body: Optional[bytes] = None,
+              headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict]:
+        response = self._send(method, path, body, headers)
+        try:
+            data = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self._drop_connection()
+            raise ServiceUnavailableError(f"scan service dropped the response: {e}") from e
+        try:
+            return response.status, json.loads(data) if data else {}
+        except ValueError:
+            return response.status, {'error': data[:200].decode('utf-8', 'replace')}
+
+    def _send(self, method: str, path: str, body: Optional[bytes], headers: Optional[Dict[str, str]]):
+        # A kept-alive connection may have been closed by the server; retry once on a fresh one
+        for attempt in range(2):
+            reused = getattr(self._local, 'connection', None) is not None
+            connection = self._connection()
+            try:
+                connection.request(method, path, body=body, headers=headers or {})
+                return connection.getresponse()
+            except (OSError, http.client.HTTPException) as e:
+                self._drop_connection()
+                if not reused or attempt:
+                    raise ServiceUnavailableError(f"scan service at {self.url} unreachable: {e}") from e
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            if self._scheme == 'unix':
+                connection = _UnixHTTPConnection(self._path, self.timeout_seconds)
+            else:
+                connection = http.client.HTTPConnection(self._netloc, timeout=self.timeout_seconds)
+            self._local.connection = connection
+        return connection
+
+    def _drop_connection(self) -> None:
+        connection = getattr(self._local, 'connection', None)
+        self._local.connection = None
+        if connection is not None:
+            connection.close()
+
+    def _raise_for(self, response) -> None:
+        data = response.read()
+        try:
+            message = json.loads(data).get('error', '')
+        except ValueError:
+            message = data[:200].decode('utf-8', 'replace')
+        raise ServiceError(response.status, message)
+
+
+def _encode_image(image: Union[Image.Image, np.ndarray], preprocess_config: Optional[Dict]):
+    """
+    Shrink an image and pack its pixels for /ocr and /scan.
+
+    Returns:
+        (body, headers, client-side timings in ms)
+    """
+    timings: Dict[str, float] = {}
+    reduced = np.ascontiguousarray(reduce_image(image, preprocess_config or OCR_PREPROCESS_CONFIG, timings))
+    headers = {
+        'Content-Type': 'application/octet-stream',
+        'X-Image-Shape': ','.join(str(size) for size in reduced.shape)
+    }
+    return reduced.tobytes(), headers, timings
+
+
+def _encode_json(payload: Dict) -> Tuple[bytes, Dict[str, str]]:
+    return json.dumps(payload).encode('utf-8'), {'Content-Type': 'application/json'}
+
+
+_url = SCAN_SERVICE_URL
+_client: Optional[ServiceClient] = None
+_client_lock = threading.Lock()
+
+
+def configure_service(url: Optional[str]) -> None:
+    """
+    Point this process at a scan service (or, with None / "", at local models).
+
+    The service itself calls this with None so it never forwards to itself.
+    """
+    global _url, _client
+    with _client_lock:
+        _url, _client = url or '', None
+
+
+def get_service_client() -> Optional[ServiceClient]:
+    """
+    Return the process-wide client, or None when no service is configured.
+    """
+    global _client
+    if not _url:
+        return None
+    with _client_lock:
+        if _client is None and _url:
+            _client = ServiceClient(_url)
+        return _client
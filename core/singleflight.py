@@ -0,0 +1,157 @@
+"""
+In-flight deduplication of identical concurrent requests ("single flight").
+
+When many sessions scan the same product at once, the first request for a
+key (the leader) computes the result and every request for that key arriving
+meanwhile (followers) waits for it instead of running its own readtext or
+Gemini call. Once the leader finishes, the key is released; later requests
+are served by the result caches the leader filled.
+
+OCR is keyed by the OCR cache key (normalized pixels + OCR settings),
+analysis by the analysis cache key (normalized profile + label text + model
+and prompt version).
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.settings import SINGLE_FLIGHT_ENABLED
+from .metrics import get_metrics
+
+
+class _Call:
+    """
+    One in-flight computation and its outcome.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Group of keyed computations that concurrent callers share.
+
+    Args:
+        name: Label for stats and metrics ("ocr", "analysis")
+        enabled: When False every caller computes for itself
+    """
+
+    def __init__(self, name: str, enabled: bool = SINGLE_FLIGHT_ENABLED):
+        self.name = name
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.flights = 0
+        self.coalesced = 0
+        self.max_followers = 0
+
+    def do(self, key: str, func: Callable[[], Any],
+           on_wait: Optional[Callable[[str], None]] = None) -> Tuple[Any, bool]:
+        """
+        Run func, or wait for the identical call already running.
+
+        Args:
+            key: Identity of the computation
+            func: Computes the value (run by the leader only)
+            on_wait: Called with 'start' / 'end' around a follower's wait
+
+        Returns:
+            (value, shared); shared is True when another caller computed it.
+            A leader's exception is raised in every caller.
+        """
+        call, leader = self.claim(key)
+        if not leader:
+            if on_wait is None:
+                return self.wait(call), True
+            on_wait('start')
+            try:
+                return self.wait(call), True
+            finally:
+                on_wait('end')
+        try:
+            value = func()
+        except BaseException as e:
+            self.release(key, call, error=e)
+            raise
+        self.release(key, call, value)
+        return value, False
+
+    def claim(self, key: str) -> Tuple[_Call, bool]:
+        """
+        Join the call for key, starting one if none is running.
+
+        The leader (second item True) must call release() exactly once,
+        followers call wait(). Used directly where the work is a generator.
+        """
+        with self._lock:
+            call = self._calls.get(key) if self.enabled else None
+            if call is not None:
+                call.followers += 1
+                self.coalesced += 1
+                self.max_followers = max(self.max_followers, call.followers)
+                return call, False
+            call = _Call()
+            if self.enabled:
+                self._calls[key] = call
+            self.flights += 1
+            return call, True
+
+    def wait(self, call: _Call) -> Any:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.value
+
+    def release(self, key: str, call: _Call, value: Any = None, error: Optional[BaseException] = None) -> None:
+        call.value, call.error = value, error
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'name': self.name,
+                'enabled': self.enabled,
+                'flights': self.flights,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+                'max_followers': self.max_followers
+            }
+
+
+_groups: List[SingleFlight] = []
+
+
+def single_flight(name: str) -> SingleFlight:
+    """
+    Create a process-wide group whose counts are exported as metrics.
+    """
+    group = SingleFlight(name)
+    _groups.append(group)
+    return group
+
+
+def get_coalescing_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Stats of every process-wide group, by name.
+    """
+    return {group.name: group.stats() for group in _groups}
+
+
+def _metric_samples():
+    samples = []
+    for stats in get_coalescing_stats().values():
+        labels = {'group': stats['name']}
+        samples.append(('singleflight_flights_total', 'counter', labels, stats['flights']))
+        samples.append(('singleflight_coalesced_total', 'counter', labels, stats['coalesced']))
+        samples.append(('singleflight_in_flight', 'gauge', labels, stats['in_flight']))
+    return samples
+
+
+get_metrics().register_collector(_metric_samples)
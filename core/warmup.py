@@ -0,0 +1,213 @@
+"""
+Background OCR warm-up and cold-start accounting.
+
+start_ocr_warmup() loads the OCR reader (or starts the OCR pool) in a daemon
+thread and runs one small dummy inference, so model loading, torch init and
+first-call allocations happen before the first user presses "Analyze".
+A scan arriving mid-warm-up waits on the same load instead of starting a
+second one (the resource cache builds each resource once). With in-process
+reader replicas, the state turns ready after the first one is warm and the
+remaining replicas are built and warmed afterwards in the same thread.
+
+The warm-up status also records the cold start: time from warm-up start (or,
+without warm-up, from the first scan request) to the first successful OCR.
+
+With SCAN_SERVICE_URL set nothing is loaded here; the warm-up thread polls
+the service's /readyz instead and mirrors its state.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from config.settings import SCAN_SERVICE
+from .metrics import get_metrics
+from .ocr_engine import get_ocr_reader_error, load_ocr_reader
+from .ocr_pool import OCRPool
+from .reader_pool import ReaderPool
+from .service_client import ServiceClient, ServiceError, ServiceUnavailableError, get_service_client
+
+logger = logging.getLogger(__name__)
+
+WARMUP_TEXT = "Ingredients: water 123"
+
+STATE_IDLE = 'idle'
+STATE_LOADING = 'loading'
+STATE_WARMING = 'warming'
+STATE_READY = 'ready'
+STATE_FAILED = 'failed'
+
+
+class WarmupStatus:
+    """
+    Thread-safe record of the warm-up and the first successful scan.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = STATE_IDLE
+        self.error = ''
+        self.started_at: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self.inference_seconds: Optional[float] = None
+        self.first_scan_seconds: Optional[float] = None
+
+    def set(self, **fields: Any) -> None:
+        with self._lock:
+            for key, value in fields.items():
+                setattr(self, key, value)
+
+    @property
+    def ready(self) -> bool:
+        return self.state == STATE_READY
+
+    def note_request(self) -> None:
+        """
+        Start the cold-start clock at the first scan if no warm-up started it.
+        """
+        if self.started_at is None:
+            with self._lock:
+                if self.started_at is None:
+                    self.started_at = time.monotonic()
+
+    def record_scan(self, ok: bool) -> None:
+        """
+        Note a finished OCR; the first successful one fixes the cold-start time.
+        """
+        if not ok or self.first_scan_seconds is not None:
+            return
+        with self._lock:
+            if self.first_scan_seconds is None and self.started_at is not None:
+                self.first_scan_seconds = time.monotonic() - self.started_at
+                get_metrics().observe('ocr.cold_start', self.first_scan_seconds)
+            if self.state == STATE_IDLE:
+                self.state = STATE_READY  # Loaded on demand (no warm-up)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self.state,
+                'error': self.error,
+                'elapsed_seconds': time.monotonic() - self.started_at if self.started_at else 0.0,
+                'load_seconds': self.load_seconds,
+                'inference_seconds': self.inference_seconds,
+                'cold_start_seconds': self.first_scan_seconds
+            }
+
+    def metric_samples(self):
+        snapshot = self.snapshot()
+        samples = [('ocr_ready', 'gauge', {}, 1 if snapshot['state'] == STATE_READY else 0)]
+        for key in ('load_seconds', 'inference_seconds', 'cold_start_seconds'):
+            if snapshot[key] is not None:
+                samples.append((f'ocr_warmup_{key}', 'gauge', {}, snapshot[key]))
+        return samples
+
+
+_status = WarmupStatus()
+_thread: Optional[threading.Thread] = None
+_thread_lock = threading.Lock()
+get_metrics().register_collector(_status.metric_samples)
+
+
+def get_warmup_status() -> WarmupStatus:
+    """
+    Return the process-wide warm-up status.
+    """
+    return _status
+
+
+def start_ocr_warmup() -> WarmupStatus:
+    """
+    Start the background warm-up (idempotent per process).
+
+    Returns:
+        The warm-up status, for polling
+    """
+    global _thread
+    with _thread_lock:
+        if _thread is None:
+            _status.set(state=STATE_LOADING, started_at=time.monotonic())
+            _thread = threading.Thread(target=_warm_up, name='ocr-warmup', daemon=True)
+            _thread.start()
+    return _status
+
+
+def warmup_image() -> np.ndarray:
+    """
+    Small grayscale image with one line of text, for the dummy inference.
+    """
+    image = Image.new('L', (360, 48), 255)
+    ImageDraw.Draw(image).text((8, 12), WARMUP_TEXT, fill=0)
+    return np.asarray(image)
+
+
+def _warm_up() -> None:
+    service = get_service_client()
+    if service is not None:
+        _wait_for_service(service)
+        return
+
+    start = time.perf_counter()
+    reader = load_ocr_reader()
+    load_seconds = time.perf_counter() - start
+    get_metrics().observe('ocr.warmup_load', load_seconds)
+    if reader is None:
+        _status.set(state=STATE_FAILED, error=str(get_ocr_reader_error() or "OCR engine unavailable"),
+                    load_seconds=load_seconds)
+        return
+
+    _status.set(state=STATE_WARMING, load_seconds=load_seconds)
+    start = time.perf_counter()
+    try:
+        image = warmup_image()
+        if isinstance(reader, OCRPool):
+            # Each worker loads its own model; give every one a first inference
+            if not reader.wait_ready(timeout=reader.job_timeout_seconds * 5):
+                raise RuntimeError(reader.start_error or "OCR workers did not start in time")
+            futures = [reader.submit(image, detail=0, paragraph=True) for _ in range(reader.workers)]
+            for future in futures:
+                future.result()
+        else:
+            reader.readtext(image, detail=0, paragraph=True)
+    except Exception as e:
+        _status.set(state=STATE_FAILED, error=f"{type(e).__name__}: {e}")
+        return
+    inference_seconds = time.perf_counter() - start
+    get_metrics().observe('ocr.warmup_inference', inference_seconds)
+    _status.set(state=STATE_READY, inference_seconds=inference_seconds)
+
+    if isinstance(reader, ReaderPool):
+        # Scans can start on the first replica; build and warm the rest meanwhile
+        try:
+            reader.fill(lambda replica: replica.readtext(image, detail=0, paragraph=True))
+        except Exception as e:
+            logger.warning("Could not build extra OCR reader replicas: %s", e)
+
+
+def _wait_for_service(service: ServiceClient) -> None:
+    """
+    Poll the scan service until its own warm-up finishes (or it stays unreachable).
+    """
+    deadline = time.monotonic() + SCAN_SERVICE['timeout_seconds']
+    while True:
+        try:
+            ready, snapshot = service.ready()
+        except (ServiceUnavailableError, ServiceError) as e:
+            if time.monotonic() > deadline:
+                _status.set(state=STATE_FAILED, error=str(e))
+                return
+        else:
+            deadline = time.monotonic() + SCAN_SERVICE['timeout_seconds']
+            fields = {key: snapshot.get(key) for key in ('load_seconds', 'inference_seconds')}
+            if ready:
+                _status.set(state=STATE_READY, **fields)
+                return
+            if snapshot.get('state') == STATE_FAILED:
+                _status.set(state=STATE_FAILED, error=f"scan service: {snapshot.get('error', '')}", **fields)
+                return
+            _status.set(state=snapshot.get('state', STATE_LOADING), **fields)
+        time.sleep(SCAN_SERVICE['ready_poll_seconds'])
@@ -0,0 +1,44 @@
+"""
+Standalone scan service: loads the OCR models (or OCR pool) and the Gemini
+client once and serves OCR and safety analysis to every Streamlit replica
+and batch job over HTTP or a Unix socket.
+
+Usage:
+    python scan_service.py                                # http://127.0.0.1:8600
+    python scan_service.py --host 0.0.0.0 --port 9000
+    python scan_service.py --socket /tmp/contra-scan.sock
+
+Point the UI (or batch_scan.py) at it with SCAN_SERVICE_URL, e.g.
+SCAN_SERVICE_URL=unix:///tmp/contra-scan.sock streamlit run app.py. The UI
+process then never imports EasyOCR or torch; /readyz answers 200 once the
+service's OCR warm-up has finished. Endpoints are listed in core/service.py.
+"""
+
+import argparse
+import logging
+import sys
+from typing import List, Optional
+
+from config.settings import SCAN_SERVICE
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve OCR and safety analysis to Contra-Scan UIs.")
+    parser.add_argument('--host', default=SCAN_SERVICE['host'],
+                        help=f"Address to listen on (default: {SCAN_SERVICE['host']})")
+    parser.add_argument('--port', type=int, default=SCAN_SERVICE['port'],
+                        help=f"TCP port (default: {SCAN_SERVICE['port']})")
+    parser.add_argument('--socket', default=SCAN_SERVICE['socket_path'],
+                        help="Listen on this Unix socket instead of TCP")
+    parser.add_argument('--log-level', default='INFO', help="Logging level (default: INFO)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), format='%(asctime)s %(name)s %(levelname)s %(message)s')
+
+    from core.service import serve
+    serve(args.host, args.port, args.socket)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
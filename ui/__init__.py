@@ -4,9 +4,13 @@ UI components for Contra-Scan.
 
 from .styles import get_custom_css
 from .sidebar import render_medical_profile_sidebar
-from .scanner import render_scanner_interface
+from .scanner import render_scanner_interface, render_ocr_readiness
+from .admin import render_metrics_panel
+from .history import render_scan_history
+from .session import init_session_state, get_scan_engine, scan_label_text, reopen_scan
 from .results import (
     render_status_card,
+    render_status_card_streaming,
     render_empty_results_placeholder,
     render_scanned_text_debug
 )
@@ -15,7 +19,15 @@ __all__ = [
     'get_custom_css',
     'render_medical_profile_sidebar',
     'render_scanner_interface',
+    'render_ocr_readiness',
+    'render_metrics_panel',
+    'render_scan_history',
+    'init_session_state',
+    'get_scan_engine',
+    'scan_label_text',
+    'reopen_scan',
     'render_status_card',
+    'render_status_card_streaming',
     'render_empty_results_placeholder',
     'render_scanned_text_debug'
 ]
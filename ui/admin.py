@@ -0,0 +1,69 @@
+"""
+Sidebar admin panel for in-process performance metrics.
+"""
+
+import streamlit as st
+from core.metrics import get_metrics
+
+
+def render_metrics_panel() -> None:
+    """
+    Show per-stage timings and counters in a collapsed sidebar expander.
+    
+    Renders nothing when metrics are disabled (METRICS_ENABLED).
+    """
+    registry = get_metrics()
+    if not registry.enabled:
+        return
+    
+    with st.sidebar:
+        st.markdown("---")
+        with st.expander("📈 Performance Metrics", expanded=False):
+            stages = registry.stage_summary()
+            if stages:
+                st.markdown("**Stage timings (ms)**")
+                st.dataframe(
+                    [
+                        {
+                            'stage': row['stage'],
+                            'n': row['count'],
+                            'p50': round(row['p50_ms'], 1),
+                            'p95': round(row['p95_ms'], 1),
+                            'p99': round(row['p99_ms'], 1)
+                        }
+                        for row in stages
+                    ],
+                    hide_index=True,
+                    use_container_width=True
+                )
+            else:
+                st.caption("No scans recorded yet.")
+            
+            samples = registry.samples()
+            if samples:
+                st.markdown("**Counters**")
+                st.dataframe(
+                    [
+                        {
+                            'metric': name + (
+                                '{' + ','.join(f"{k}={v}" for k, v in sorted(labels.items())) + '}'
+                                if labels else ''
+                            ),
+                            'value': value
+                        }
+                        for name, _, labels, value in samples
+                    ],
+                    hide_index=True,
+                    use_container_width=True
+                )
+            
+            st.download_button(
+                "⬇️ Prometheus export",
+                data=registry.render_prometheus(),
+                file_name="contrascan_metrics.prom",
+                mime="text/plain",
+                use_container_width=True
+            )
+            if st.button("Reset metrics", use_container_width=True):
+                registry.reset()
+                st.rerun()
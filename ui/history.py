@@ -0,0 +1,45 @@
+"""
+Sidebar scan history: reopen past results without rescanning.
+"""
+
+import time
+import streamlit as st
+from typing import Dict
+from config.settings import SCAN_HISTORY
+from core.history import get_scan_history
+from .session import history_owner, show_history_entry
+
+STATUS_ICONS = {'SAFE': '🟢', 'CAUTION': '🟡', 'DANGER': '🔴'}
+
+
+def render_scan_history(user_profile: Dict[str, str]) -> None:
+    """
+    List this session's recent scans with the current profile in a sidebar expander.
+
+    Clicking one shows its stored result (no OCR or AI call). Renders
+    nothing when the history is disabled (empty SCAN_HISTORY_PATH).
+
+    Args:
+        user_profile: Profile from the sidebar; only its scans are listed
+    """
+    history = get_scan_history()
+    if history is None:
+        return
+
+    with st.sidebar:
+        st.markdown("---")
+        with st.expander("🕘 Scan History", expanded=False):
+            entries = history.recent(user_profile, history_owner(), limit=SCAN_HISTORY['sidebar_entries'])
+            if not entries:
+                st.caption("No scans with this profile yet.")
+                return
+            for index, entry in enumerate(entries):
+                first_line = entry.ocr_text.strip().split('\n', 1)[0][:40]
+                label = (f"{STATUS_ICONS.get(entry.status, '⚪')} "
+                         f"{time.strftime('%b %d %H:%M', time.localtime(entry.created))} · {first_line}")
+                if st.button(label, key=f"history_{entry.id or 'queued'}_{index}",
+                             help=entry.summary, use_container_width=True):
+                    show_history_entry(entry)
+            if st.button("Clear my scans with this profile", use_container_width=True):
+                history.clear(user_profile, history_owner())
+                st.rerun()
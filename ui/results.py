@@ -2,8 +2,17 @@
 Results display components.
 """
 
+import time
 import streamlit as st
-from typing import Dict
+from typing import Dict, Iterator, Optional
+
+SOURCE_LABELS = {
+    'local_kb': "⚡ Answered instantly from the local interaction knowledge base",
+    'gemini': "🤖 Analyzed by Google Gemini",
+    'demo_rules': "🎮 Demo keyword rules",
+    'offline_rules': "📴 AI unavailable - checked against local interaction rules only",
+    'fallback': "⚠️ Fallback result - analysis did not complete"
+}
 
 
 def render_status_card(result: Dict) -> None:
@@ -13,8 +22,58 @@ def render_status_card(result: Dict) -> None:
     Args:
         result: Analysis result dictionary
     """
-    status = result.get('status', 'CAUTION')
+    _render_status_banner(result.get('status', 'CAUTION'))
+    _render_summary(result)
+    _render_details(result)
+    _render_recommendation(result)
+    _render_footer(result)
+
+
+def render_status_card_streaming(result_stream: Iterator[Dict]) -> Dict:
+    """
+    Render the status card progressively from analyze_safety_stream.
+    
+    The banner appears as soon as the status is known; summary, details and
+    recommendation fill in as they stream.
+    
+    Args:
+        result_stream: Iterator of partial analysis results (last is final)
+        
+    Returns:
+        The final analysis result dict
+    """
+    banner_slot = st.empty()
+    summary_slot = st.empty()
+    details_slot = st.empty()
+    recommendation_slot = st.empty()
+    footer_slot = st.empty()
+    
+    with banner_slot.container():
+        _render_pending_banner()
     
+    result = {}
+    for result in result_stream:
+        with banner_slot.container():
+            if result.get('status'):
+                _render_status_banner(result['status'])
+            else:
+                _render_pending_banner()
+        if result.get('summary'):
+            with summary_slot.container():
+                _render_summary(result)
+        if result.get('details'):
+            with details_slot.container():
+                _render_details(result)
+        if result.get('recommendation'):
+            with recommendation_slot.container():
+                _render_recommendation(result)
+    
+    with footer_slot.container():
+        _render_footer(result)
+    return result
+
+
+def _render_status_banner(status: str) -> None:
     if status == "SAFE":
         icon = "🛡️"
         status_class = "status-safe"
@@ -34,26 +93,40 @@ def render_status_card(result: Dict) -> None:
         <div class="status-text">{status_label}</div>
     </div>
     """, unsafe_allow_html=True)
-    
-    # Summary
+
+
+def _render_pending_banner() -> None:
+    st.markdown("""
+    <div class="status-card status-pending">
+        <div class="status-icon">🧠</div>
+        <div class="status-text">ANALYZING...</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+
+def _render_summary(result: Dict) -> None:
     st.markdown("### 📋 Analysis Summary")
     st.info(result.get('summary', 'No summary available'))
-    
-    # Details
+
+
+def _render_details(result: Dict) -> None:
     details = result.get('details', [])
     if details:
         st.markdown("### 🔍 Details")
         for detail in details:
             st.markdown(f"- {detail}")
-    
-    # Recommendation
+
+
+def _render_recommendation(result: Dict) -> None:
     st.markdown(f"""
     <div class="recommendation-box">
         <h4>💡 Pharmacist's Recommendation</h4>
         <p>{result.get('recommendation', 'Consult a healthcare professional.')}</p>
     </div>
     """, unsafe_allow_html=True)
-    
+
+
+def _render_footer(result: Dict) -> None:
     # PCCA Compounding Hook (The winning feature!)
     if result.get('compounding_suggested', False):
         st.markdown(f"""
@@ -64,6 +137,32 @@ def render_status_card(result: Dict) -> None:
             <p><strong>Find a PCCA-member pharmacy near you for custom formulations!</strong></p>
         </div>
         """, unsafe_allow_html=True)
+    
+    # Which path produced this verdict
+    source = result.get('source')
+    if source in SOURCE_LABELS:
+        st.caption(SOURCE_LABELS[source])
+    
+    scanned_at = result.get('from_history')
+    if scanned_at:
+        st.caption(
+            f"🕘 Reopened from your scan history (scanned "
+            f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(scanned_at))}) - no OCR or AI call needed"
+        )
+    
+    label_tokens = result.get('label_tokens')
+    if label_tokens and label_tokens.get('saved', 0) > 0:
+        st.caption(
+            f"✂️ Label trimmed to relevant sections: ~{label_tokens['sent']} tokens sent, "
+            f"~{label_tokens['saved']} saved"
+        )
+    
+    metrics = result.get('stream_metrics')
+    if metrics:
+        st.caption(
+            f"⏱️ First verdict in {metrics['first_verdict_ms']:.0f} ms, "
+            f"complete in {metrics['total_ms']:.0f} ms"
+        )
 
 
 def render_empty_results_placeholder() -> None:
@@ -85,12 +184,32 @@ def render_empty_results_placeholder() -> None:
     """, unsafe_allow_html=True)
 
 
-def render_scanned_text_debug(scanned_text: str) -> None:
+def render_scanned_text_debug(
+    scanned_text: str,
+    timings: Optional[Dict[str, float]] = None,
+    cache_stats: Optional[Dict] = None
+) -> None:
     """
     Show OCR text in expander for debugging.
     
     Args:
         scanned_text: The extracted text from OCR
+        timings: Optional per-stage OCR timings in milliseconds
+        cache_stats: Optional OCR cache stats (see ResultCache.stats)
     """
     with st.expander("🔤 View Scanned Text (Debug)"):
         st.code(scanned_text or "No text scanned yet")
+        if timings:
+            st.markdown("**⏱️ OCR stage timings**")
+            st.table({
+                'stage': list(timings.keys()),
+                'ms': [round(ms, 1) for ms in timings.values()]
+            })
+        if cache_stats:
+            st.caption(
+                f"OCR cache: {cache_stats['hit_rate']:.0%} hit rate "
+                f"({cache_stats['hits']} hits / {cache_stats['misses']} misses), "
+                f"{cache_stats['entries']} entries, "
+                f"{cache_stats['bytes'] / 1024:.1f} KB in memory, "
+                f"{cache_stats['disk_bytes'] / 1024:.1f} KB on disk"
+            )
@@ -2,17 +2,28 @@
 Product scanner interface component.
 """
 
+import io
 import streamlit as st
 from PIL import Image
-from typing import Optional
+from typing import Optional, Tuple
+from core.image_preprocessing import reduce_image
+from core.metrics import span
+from core.warmup import STATE_FAILED, STATE_IDLE, STATE_READY, get_warmup_status
 
 
-def render_scanner_interface() -> Optional[Image.Image]:
+PREVIEW_MAX_EDGE = 800  # Preview is decoded at reduced size, like the OCR input
+
+
+def render_scanner_interface() -> Optional[Tuple[Image.Image, bytes]]:
     """
     Render the product scanner interface (camera + file upload).
     
+    The returned image is opened but not decoded, so preprocessing can ask
+    the JPEG decoder for a reduced-size decode; the preview is decoded
+    separately at reduced size.
+    
     Returns:
-        PIL.Image or None: Captured/uploaded image
+        (PIL.Image, encoded file bytes) of the captured/uploaded image, or None
     """
     st.markdown("### 📸 Scan Product Label")
     st.markdown("Point your camera at a medication bottle, food label, or supplement.")
@@ -33,15 +44,49 @@ def render_scanner_interface() -> Optional[Image.Image]:
     )
     
     # Process image
-    image_to_process = None
-    if camera_image is not None:
-        image_to_process = Image.open(camera_image)
-    elif uploaded_file is not None:
-        image_to_process = Image.open(uploaded_file)
-    
-    if image_to_process is not None:
-        # Show captured image
-        st.image(image_to_process, caption="Captured Label", use_container_width=True)
-        return image_to_process
+    source = camera_image if camera_image is not None else uploaded_file
+    if source is None:
+        return None
+    with span('image.open'):
+        data = source.getvalue()
+        image_to_process = Image.open(io.BytesIO(data))
     
-    return None
+    # Show captured image
+    st.image(_preview(data), caption="Captured Label", use_container_width=True)
+    return image_to_process, data
+
+
+def _preview(data: bytes) -> Image.Image:
+    """
+    The photo decoded at preview size (reduced-size JPEG decode), upright.
+    """
+    return reduce_image(Image.open(io.BytesIO(data)), {'max_long_edge': PREVIEW_MAX_EDGE, 'grayscale': False})
+
+
+def render_ocr_readiness() -> None:
+    """
+    Show whether the OCR engine is loaded, polling every 2 s until it is.
+    """
+    if get_warmup_status().state in (STATE_READY, STATE_FAILED, STATE_IDLE):
+        _render_ocr_readiness()
+    else:
+        st.fragment(_poll_ocr_readiness, run_every=2)()
+
+
+def _poll_ocr_readiness() -> None:
+    if get_warmup_status().state in (STATE_READY, STATE_FAILED):
+        st.rerun()  # Full rerun stops the polling fragment
+    _render_ocr_readiness()
+
+
+def _render_ocr_readiness() -> None:
+    snapshot = get_warmup_status().snapshot()
+    state = snapshot['state']
+    if state == STATE_READY:
+        if snapshot['load_seconds'] is not None:
+            st.caption(f"🟢 OCR engine ready (loaded in {snapshot['load_seconds']:.1f}s)")
+    elif state == STATE_FAILED:
+        st.caption(f"🔴 OCR engine unavailable: {snapshot['error']}")
+    elif state != STATE_IDLE:
+        st.caption(f"🟡 OCR engine warming up ({snapshot['elapsed_seconds']:.0f}s)... "
+                   "You can take a photo meanwhile.")
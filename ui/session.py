@@ -0,0 +1,109 @@
+"""
+Streamlit adapter over the UI-free scan pipeline (core.pipeline).
+
+Holds per-session state and turns pipeline progress events into spinners
+and error messages; all scanning work happens in core.
+"""
+
+import uuid
+import streamlit as st
+from PIL import Image
+from typing import Dict, Optional
+from core.history import HistoryEntry, get_scan_history
+from core.ocr_engine import get_ocr_reader_error
+from core.pipeline import ScanEngine
+
+SPINNER_TEXT = {
+    'ocr.load_reader': "🔧 Loading OCR engine (first time only)...",
+    'ocr.readtext': "🔍 Scanning text from image...",
+    'analysis': "🧠 AI analyzing for safety concerns..."
+}
+
+
+def init_session_state() -> None:
+    """
+    Create the session keys the app reads on every rerun.
+    """
+    for key in ('analysis_result', 'scanned_text', 'ocr_timings'):
+        if key not in st.session_state:
+            st.session_state[key] = None
+    history_owner()
+
+
+def history_owner() -> str:
+    """
+    This session's owner key in the scan history (a random id, so sessions
+    only list and clear their own scans).
+    """
+    if 'history_owner' not in st.session_state:
+        st.session_state.history_owner = uuid.uuid4().hex
+    return st.session_state.history_owner
+
+
+class _SpinnerEvents:
+    """
+    Pipeline on_event callback showing a spinner while a stage runs.
+    """
+
+    def __init__(self, show_analysis: bool = True):
+        self.show_analysis = show_analysis
+        self._active = {}
+
+    def __call__(self, stage: str, state: str) -> None:
+        if stage == 'analysis' and not self.show_analysis:
+            return
+        if state == 'start' and stage in SPINNER_TEXT:
+            spinner = st.spinner(SPINNER_TEXT[stage])
+            spinner.__enter__()
+            self._active[stage] = spinner
+        elif state == 'end' and stage in self._active:
+            self._active.pop(stage).__exit__(None, None, None)
+
+
+def get_scan_engine() -> ScanEngine:
+    """
+    Pipeline for this rerun, reporting progress with Streamlit spinners.
+    
+    Streamed analyses render their own progress, so they get no spinner.
+    """
+    engine = ScanEngine(history=get_scan_history(), history_owner=history_owner())
+    engine.on_event = _SpinnerEvents(show_analysis=not engine.config.streaming)
+    return engine
+
+
+def scan_label_text(engine: ScanEngine, image: Image.Image) -> str:
+    """
+    Run OCR, storing the text and stage timings in session state.
+
+    Returns:
+        Extracted text (or a "[...]" error marker)
+    """
+    text, timings = engine.ocr(image)
+    if text == "[OCR Engine unavailable]" and get_ocr_reader_error() is not None:
+        st.error(f"Failed to load OCR engine: {get_ocr_reader_error()}")
+    st.session_state.scanned_text = text
+    st.session_state.ocr_timings = timings
+    return text
+
+
+def show_history_entry(entry: HistoryEntry) -> None:
+    """
+    Put a recorded scan in session state, as if it had just been scanned.
+    """
+    st.session_state.analysis_result = entry.reopened_result()
+    st.session_state.scanned_text = entry.ocr_text
+    st.session_state.ocr_timings = entry.timings
+
+
+def reopen_scan(engine: ScanEngine, image_digest: Optional[str], user_profile: Dict[str, str]) -> bool:
+    """
+    Show the recorded result for this photo and profile, if there is one.
+
+    Returns:
+        True if the scan was reopened from history (nothing left to compute)
+    """
+    entry = engine.reopen(image_digest, user_profile)
+    if entry is None:
+        return False
+    show_history_entry(entry)
+    return True
@@ -81,6 +81,11 @@ def get_custom_css() -> str:
         box-shadow: 0 0 30px rgba(255, 152, 0, 0.4);
     }
     
+    .status-pending {
+        background: linear-gradient(135deg, #263238 0%, #37474F 100%);
+        border: 2px dashed #1E88E5;
+    }
+    
     .status-icon {
         font-size: 5rem;
         margin-bottom: 1rem;